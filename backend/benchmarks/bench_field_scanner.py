@@ -0,0 +1,148 @@
+# backend/benchmarks/bench_field_scanner.py
+#
+# Throughput of the shared field scanner against the previous per-field
+# regex loops, on synthetic term sheet text.
+#
+#   cd backend && python -m benchmarks.bench_field_scanner --mb 1 5 20
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils import field_scanner
+
+SAMPLE = """TERM SHEET
+Company Name: Acme Robotics Pvt Ltd
+Investor: Blue Ocean Ventures
+Investment Amount: Rs. 5,00,00,000
+Pre-Money Valuation: INR 20,00,00,000
+Post-Money Valuation: INR 25,00,00,000
+Date: 12 December 2025
+Tenure: 36 months
+Interest: 11.5 %
+"""
+
+FILLER = "The parties agree that the terms set out herein are indicative only.\n"
+
+# =========================================================
+# Previous implementations (baseline)
+# =========================================================
+LEGACY_DATE = [
+    r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",
+    r"\b\w+\s\d{1,2},\s\d{4}\b",
+    r"\b\d{1,2}\s\w+\s\d{4}\b",
+]
+LEGACY_AMOUNT = [r"(rs\.?\s?\d[\d,\.]*)", r"(₹\s?\d[\d,\.]*)", r"(inr\s?\d[\d,\.]*)"]
+LEGACY_INTEREST = r"(\d+(\.\d+)?\s?%)"
+LEGACY_TENURE = r"(\b\d+\s?(months?|years?)\b)"
+
+LEGACY_PATTERNS = {
+    name: [label + value] for name, label, value in field_scanner.LABELED_FIELDS
+}
+
+
+def legacy_extract_regex(text):
+    extracted = {}
+    for key, regs in LEGACY_PATTERNS.items():
+        for reg in regs:
+            m = re.search(reg, text, re.I)
+            if m:
+                extracted[key] = m.group(1).strip()
+                break
+    return extracted
+
+
+def legacy_scan_lines(text):
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    fields = dict.fromkeys(field_scanner.LINE_FIELDS)
+    for line in lines:
+        if line.lower().startswith("company") or "company name" in line.lower():
+            fields["company_name"] = line
+            break
+    for line in lines:
+        for p in LEGACY_AMOUNT:
+            m = re.search(p, line, re.I)
+            if m:
+                fields["amount"] = m.group(0)
+                break
+        if fields["amount"]:
+            break
+    for line in lines:
+        for p in LEGACY_DATE:
+            m = re.search(p, line, re.I)
+            if m:
+                fields["date"] = m.group(0)
+                break
+        if fields["date"]:
+            break
+    for line in lines:
+        m = re.search(LEGACY_TENURE, line, re.I)
+        if m:
+            fields["tenure"] = m.group(0)
+            break
+    for line in lines:
+        m = re.search(LEGACY_INTEREST, line)
+        if m:
+            fields["interest_rate"] = m.group(0)
+            break
+    return fields
+
+
+# =========================================================
+# Harness
+# =========================================================
+def make_text(mb: float, fields_at_end: bool) -> str:
+    """Filler text of roughly `mb` MB with the labelled block at the start or end."""
+    filler = FILLER * max(1, int(mb * 1024 * 1024 / len(FILLER)))
+    return filler + SAMPLE if fields_at_end else SAMPLE + filler
+
+
+def throughput(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / (1024 * 1024) / best
+
+
+def run(sizes, repeat):
+    rows = []
+    for mb in sizes:
+        for at_end in (False, True):
+            text = make_text(mb, at_end)
+            assert legacy_extract_regex(text) == field_scanner.scan_labeled(text)
+            assert legacy_scan_lines(text) == field_scanner.scan_lines(text)
+            rows.append({
+                "mb": mb,
+                "fields": "end" if at_end else "start",
+                "labeled_legacy": throughput(legacy_extract_regex, text, repeat),
+                "labeled_scanner": throughput(field_scanner.scan_labeled, text, repeat),
+                "lines_legacy": throughput(legacy_scan_lines, text, repeat),
+                "lines_scanner": throughput(field_scanner.scan_lines, text, repeat),
+            })
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--mb", type=float, nargs="+", default=[1, 5, 20])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'MB':>6} {'fields':>6} | {'labeled MB/s':>24} | {'lines MB/s':>24}")
+    print(f"{'':>6} {'':>6} | {'legacy':>11} {'scanner':>12} | {'legacy':>11} {'scanner':>12}")
+    for r in run(args.mb, args.repeat):
+        print(
+            f"{r['mb']:>6} {r['fields']:>6} | "
+            f"{r['labeled_legacy']:>11.1f} {r['labeled_scanner']:>12.1f} | "
+            f"{r['lines_legacy']:>11.1f} {r['lines_scanner']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# backend/benchmarks/corpus.py
+#
+# Synthetic term sheet PDFs for every document type in master_schemas.json.
+# Page 1 carries the labelled fields (and the classifier keywords for the
+# type); the remaining pages are boilerplate so page count can be scaled.
+#
+#   cd backend && python -m benchmarks.corpus --pages 1 10 100 500
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SCHEMA_PATH = BACKEND_DIR / "schemas" / "master_schemas.json"
+KEYWORDS_PATH = BACKEND_DIR / "schemas" / "classifier_keywords.json"
+DEFAULT_DIR = Path(__file__).resolve().parent / ".corpus"
+DEFAULT_PAGES = [1, 10, 100, 500]
+
+TITLES = {
+    "startup_equity": "Series A Equity Term Sheet",
+    "structured_note": "Autocallable Structured Note - Indicative Terms",
+    "venture_debt": "Venture Debt Facility - Summary of Terms",
+    "bank_loan": "Term Loan Facility Agreement - Term Sheet",
+    "m_and_a": "Share Purchase - Heads of Terms",
+    "real_estate": "Property Sale and Lease - Term Sheet",
+    "unknown": "Memorandum",
+}
+
+BOILERPLATE = [
+    "This term sheet is indicative only and does not constitute an offer or commitment.",
+    "The parties shall negotiate in good faith the definitive documentation.",
+    "Each party shall bear its own costs in connection with this transaction.",
+    "All information contained herein is confidential and may not be disclosed.",
+    "This document shall be governed by the laws of the applicable jurisdiction.",
+    "Nothing in this document shall create a partnership or agency relationship.",
+    "Any notice under this document shall be in writing and delivered by hand.",
+    "The terms set out herein remain subject to satisfactory due diligence.",
+]
+
+LINES_PER_PAGE = 48
+MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December"]
+
+
+# =========================================================
+# Content
+# =========================================================
+def load_schemas() -> dict:
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fake_value(field: str, rnd: random.Random) -> str:
+    name = field.lower()
+    if "isin" in name:
+        return "XS" + "".join(rnd.choice("0123456789") for _ in range(10))
+    if "date" in name:
+        return f"{rnd.randint(1, 28)} {rnd.choice(MONTHS)} {rnd.randint(2025, 2032)}"
+    if any(k in name for k in ("amount", "price", "fee", "valuation")):
+        return f"Rs. {rnd.randint(1, 99)},{rnd.randint(10, 99)},00,000"
+    if any(k in name for k in ("rate", "coupon", "barrier", "level", "equity", "coverage")):
+        return f"{rnd.randint(1, 95)}.{rnd.randint(0, 9)} %"
+    if "tenor" in name or "terms" in name:
+        return f"{rnd.choice([12, 24, 36, 60])} months"
+    return f"Sample {field} {rnd.randint(100, 999)}"
+
+
+def first_page_lines(doc_type: str, schemas: dict, keywords: dict, rnd: random.Random) -> list:
+    schema = schemas[doc_type]
+    lines = [TITLES.get(doc_type, doc_type), ""]
+
+    kw = list(keywords.get(doc_type, {}))
+    if kw:
+        lines.append("Key terms: " + ", ".join(kw))
+        lines.append("")
+
+    for field in schema["required_fields"] + schema["optional_fields"]:
+        lines.append(f"{field}: {fake_value(field, rnd)}")
+
+    # Lines the compare service looks for, on every type
+    lines += [
+        "",
+        f"Company Name: Sample Holdings {rnd.randint(1, 99)} Pvt Ltd",
+        f"Tenure: {rnd.choice([12, 24, 36, 60])} months",
+        f"Interest: {rnd.randint(5, 15)}.{rnd.randint(0, 9)} %",
+    ]
+    return lines
+
+
+def filler_lines(page_no: int, rnd: random.Random) -> list:
+    lines = [f"Page {page_no}", ""]
+    for i in range(LINES_PER_PAGE):
+        lines.append(f"{page_no}.{i + 1} {rnd.choice(BOILERPLATE)}")
+    return lines
+
+
+# =========================================================
+# PDF writer
+# =========================================================
+def write_pdf(path: Path, pages: list):
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()  # A4-ish default (595 x 842)
+        page.insert_text((40, 50), "\n".join(lines), fontsize=9)
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+
+def build(doc_type: str, pages: int, out_dir: Path = DEFAULT_DIR, seed: int = 0,
+          schemas: dict | None = None, keywords: dict | None = None) -> Path:
+    """Writes (or reuses) <out_dir>/<doc_type>_<pages>p.pdf and returns its path."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{doc_type}_{pages}p.pdf"
+    if path.exists():
+        return path
+
+    schemas = schemas or load_schemas()
+    if keywords is None:
+        with open(KEYWORDS_PATH, "r", encoding="utf-8") as f:
+            keywords = json.load(f)
+
+    rnd = random.Random(f"{seed}:{doc_type}:{pages}")
+    content = [first_page_lines(doc_type, schemas, keywords, rnd)]
+    content += [filler_lines(n, rnd) for n in range(2, pages + 1)]
+
+    tmp = path.with_suffix(".tmp")
+    write_pdf(tmp, content)
+    tmp.replace(path)
+    return path
+
+
+def generate(page_counts=DEFAULT_PAGES, doc_types=None, out_dir: Path = DEFAULT_DIR, seed: int = 0) -> list:
+    """Returns [(doc_type, pages, path)] for every requested combination."""
+    schemas = load_schemas()
+    with open(KEYWORDS_PATH, "r", encoding="utf-8") as f:
+        keywords = json.load(f)
+
+    corpus = []
+    for doc_type in doc_types or list(schemas):
+        for pages in page_counts:
+            path = build(doc_type, pages, out_dir, seed, schemas, keywords)
+            corpus.append((doc_type, pages, path))
+    return corpus
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate synthetic term sheet PDFs")
+    ap.add_argument("--pages", type=int, nargs="+", default=DEFAULT_PAGES)
+    ap.add_argument("--types", nargs="+", default=None)
+    ap.add_argument("--out", type=Path, default=DEFAULT_DIR)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    for doc_type, pages, path in generate(args.pages, args.types, args.out, args.seed):
+        print(f"{doc_type:>16} {pages:>4}p  {path.stat().st_size / 1024:>9.1f} KB  {path}")
+
+
+if __name__ == "__main__":
+    main()
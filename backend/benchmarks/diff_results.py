@@ -0,0 +1,83 @@
+# backend/benchmarks/diff_results.py
+#
+# Compares two run_benchmarks result files case by case and flags
+# regressions. Exits with status 1 when any case got slower than the
+# threshold, so it can gate a release.
+#
+#   cd backend && python -m benchmarks.diff_results results/old.json results/new.json --threshold 10
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def key(row: dict) -> tuple:
+    return row["case"], row["doc_type"], row["pages"]
+
+
+def diff(old: dict, new: dict, metric: str = "median_ms", threshold: float = 10.0) -> list:
+    """
+    Returns one row per case present in both runs, with the relative change
+    in `metric` (positive = slower) and a status of regressed/improved/same.
+    """
+    before = {key(r): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        prev = before.get(key(r))
+        if prev is None or not prev.get(metric):
+            continue
+        change = (r[metric] - prev[metric]) / prev[metric] * 100
+        if change > threshold:
+            status = "regressed"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "same"
+        rows.append({
+            "case": r["case"],
+            "doc_type": r["doc_type"],
+            "pages": r["pages"],
+            "old": prev[metric],
+            "new": r[metric],
+            "change_pct": round(change, 1),
+            "status": status,
+        })
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Diff two benchmark result files")
+    ap.add_argument("old", type=Path)
+    ap.add_argument("new", type=Path)
+    ap.add_argument("--metric", default="median_ms", choices=["min_ms", "median_ms", "mean_ms", "max_ms"])
+    ap.add_argument("--threshold", type=float, default=10.0, help="percent change treated as noise")
+    ap.add_argument("--all", action="store_true", help="also print unchanged cases")
+    args = ap.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    print(f"old: {old['env'].get('git')} {old['env'].get('timestamp')}  "
+          f"new: {new['env'].get('git')} {new['env'].get('timestamp')}  ({args.metric})")
+
+    rows = diff(old, new, args.metric, args.threshold)
+    for r in rows:
+        if r["status"] == "same" and not args.all:
+            continue
+        print(
+            f"{r['status']:>9} {r['case']:>13} {r['doc_type']:>16} {r['pages']:>4}p  "
+            f"{r['old']:>10.2f} -> {r['new']:>10.2f} ms  ({r['change_pct']:+.1f}%)"
+        )
+
+    regressed = sum(r["status"] == "regressed" for r in rows)
+    improved = sum(r["status"] == "improved" for r in rows)
+    print(f"\n{len(rows)} cases compared: {regressed} regressed, {improved} improved")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
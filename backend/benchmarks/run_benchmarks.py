@@ -0,0 +1,186 @@
+# backend/benchmarks/run_benchmarks.py
+#
+# Timings for the parsing/validation hot paths over the synthetic corpus:
+# extract_text_from_pdf, classify_doc, extract_regex, validate_fields and
+# termsheet_compare_service.compare_termsheets. Results are written as JSON
+# under benchmarks/results/ so releases can be compared with
+# benchmarks.diff_results.
+#
+#   cd backend && python -m benchmarks.run_benchmarks --pages 1 10 100 500
+#
+# LLM-backed paths (classify_doc on ambiguous text, validate_fields with
+# --deep-check) are only meaningful against the local stand-in:
+#   python -m loadtest.fake_gemini --port 8765 &
+#   GEMINI_API_KEY=x GEMINI_BASE_URL=http://127.0.0.1:8765/v1 python -m benchmarks.run_benchmarks --deep-check
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# The compare service imports the Mongo client; file-to-file compares never
+# touch it, and motor does not connect until first use.
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+from starlette.datastructures import UploadFile
+
+from benchmarks import corpus
+from services import parser_service, termsheet_compare_service, validator_service
+from utils import pdf_utils
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+CASES = ["extract_text", "classify", "extract_regex", "validate", "compare"]
+
+
+# =========================================================
+# Timing
+# =========================================================
+def measure(fn, repeat: int, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def upload_file(path: Path) -> UploadFile:
+    return UploadFile(file=io.BytesIO(path.read_bytes()), filename=path.name)
+
+
+# =========================================================
+# Cases (one corpus document each)
+# =========================================================
+def run_document(doc_type: str, pages: int, path: Path, args, loop) -> list:
+    text = parser_service.extract_text_from_pdf(str(path))
+    detected = parser_service.classify_doc(text)
+    fields = parser_service.extract_regex(text, detected)
+
+    base = {
+        "doc_type": doc_type,
+        "pages": pages,
+        "bytes": path.stat().st_size,
+        "chars": len(text),
+    }
+    cases = {
+        "extract_text": lambda: parser_service.extract_text_from_pdf(str(path)),
+        "classify": lambda: parser_service.classify_doc(text),
+        "extract_regex": lambda: parser_service.extract_regex(text, detected),
+        "validate": lambda: loop.run_until_complete(
+            validator_service.validate_fields(fields, detected, deep_check=args.deep_check)
+        ),
+    }
+    if pages <= args.compare_max_pages:
+        def compare():
+            # Time extraction, not the per-content-hash result cache
+            termsheet_compare_service.clear_cache()
+            return loop.run_until_complete(
+                termsheet_compare_service.compare_termsheets(upload_file(path), upload_file(path))
+            )
+        cases["compare"] = compare
+
+    rows = []
+    for case, fn in cases.items():
+        if case not in args.cases:
+            continue
+        row = {"case": case, **base, **measure(fn, args.repeat)}
+        if case == "classify":
+            row["detected"] = detected
+        rows.append(row)
+    return rows
+
+
+# =========================================================
+# Results
+# =========================================================
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment(args) -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "label": args.label,
+        "parser_version": parser_service.PARSER_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pdf_parallel_min_pages": pdf_utils.PARALLEL_MIN_PAGES,
+        "deep_check": args.deep_check,
+        "repeat": args.repeat,
+    }
+
+
+def save(results: dict, out: Path | None) -> Path:
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = f"{stamp}-{results['env']['git'] or 'local'}"
+        if results["env"]["label"]:
+            name += f"-{results['env']['label']}"
+        out = RESULTS_DIR / f"{name}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the parsing/validation hot paths")
+    ap.add_argument("--pages", type=int, nargs="+", default=corpus.DEFAULT_PAGES)
+    ap.add_argument("--types", nargs="+", default=None, help="document types (default: all in master_schemas.json)")
+    ap.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--compare-max-pages", type=int, default=100,
+                    help="skip compare_termsheets above this page count")
+    ap.add_argument("--deep-check", action="store_true", help="validate_fields with the Gemini deep check")
+    ap.add_argument("--corpus-dir", type=Path, default=corpus.DEFAULT_DIR)
+    ap.add_argument("--label", default=None, help="tag added to the result file name")
+    ap.add_argument("--out", type=Path, default=None)
+    args = ap.parse_args()
+
+    documents = corpus.generate(args.pages, args.types, args.corpus_dir)
+    loop = asyncio.new_event_loop()
+    rows = []
+    try:
+        for doc_type, pages, path in documents:
+            for row in run_document(doc_type, pages, path, args, loop):
+                rows.append(row)
+                print(
+                    f"{row['case']:>13} {doc_type:>16} {pages:>4}p  "
+                    f"min {row['min_ms']:>10.2f} ms  median {row['median_ms']:>10.2f} ms"
+                )
+    finally:
+        loop.close()
+        pdf_utils.shutdown()
+
+    out = save({"env": environment(args), "results": rows}, args.out)
+    print(f"\nSaved {len(rows)} results to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,213 @@
-from .mongodb_config import db
-
-async def init_collections():
-    await db.create_collection("users", capped=False)
-    await db.create_collection("uploads", capped=False)
-    await db.create_collection("validation_results", capped=False)
-    await db.create_collection("reports", capped=False)
-    await db.create_collection("chatbot_logs", capped=False)
+# backend/database/collections_init.py
+#
+# Creates the collections and the indexes the routes' queries rely on.
+# Safe to run on every startup: existing collections/indexes are left alone.
+#
+#   cd backend && python -m database.collections_init            # create
+#   cd backend && python -m database.collections_init --verify   # explain every query
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from utils.logger import log
+from . import mongodb_config
+
+SLOW_INDEX_MS = float(os.getenv("INDEX_SLOW_MS", "1000"))
+
+COLLECTIONS = ["users", "uploads", "validation_results", "reports", "chatbot_logs", "stats",
+               "stats_pending", "revalidation_jobs"]
+
+# collection -> [(keys, options)]
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ],
+    "uploads": [
+        ([("status", ASCENDING), ("_id", DESCENDING)], {"name": "status_id"}),
+        ([("document_type", ASCENDING), ("_id", DESCENDING)], {"name": "document_type_id"}),
+        # blob_store.gc() counts live records per content hash
+        ([("content_hash", ASCENDING)], {"name": "content_hash"}),
+    ],
+    "validation_results": [
+        ([("upload_id", ASCENDING)], {"name": "upload_id"}),
+        # One memoized result per (fingerprint, upload); results stored
+        # after a Gemini failure carry no fingerprint
+        ([("fingerprint", ASCENDING), ("upload_id", ASCENDING)], {
+            "name": "fingerprint_upload_unique",
+            "unique": True,
+            "partialFilterExpression": {"fingerprint": {"$exists": True}},
+        }),
+        ([("created_at", DESCENDING)], {"name": "created_at"}),
+        ([("status", ASCENDING), ("_id", DESCENDING)], {"name": "status_id"}),
+        ([("document_type", ASCENDING), ("_id", DESCENDING)], {"name": "document_type_id"}),
+    ],
+    "chatbot_logs": [
+        # Older chat logs have no normalized_query, so uniqueness is partial
+        ([("normalized_query", ASCENDING)], {
+            "name": "normalized_query_unique",
+            "unique": True,
+            "partialFilterExpression": {"normalized_query": {"$exists": True}},
+        }),
+        ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    ],
+    "revalidation_jobs": [
+        # Lease lookup: queued jobs, or running ones with a stale heartbeat
+        ([("state", ASCENDING), ("heartbeat", ASCENDING)], {"name": "state_heartbeat"}),
+        ([("created_at", DESCENDING)], {"name": "created_at"}),
+    ],
+}
+
+# (collection, index) -> older index it supersedes, dropped once the new one exists
+REPLACED_INDEXES = {
+    ("validation_results", "fingerprint_upload_unique"): "fingerprint_upload",
+}
+
+# Every query shape the routes/services issue: (name, collection, filter, sort)
+QUERY_PATTERNS = [
+    ("signup duplicate check", "users", {"email": "a@b.c"}, None),
+    ("login", "users", {"email": "a@b.c", "password": "x"}, None),
+    ("resume pending uploads", "uploads", {"status": {"$in": ["queued", "processing"]}}, None),
+    ("uploads page", "uploads", {}, [("_id", -1)]),
+    ("uploads by type", "uploads", {"document_type": "bank_loan"}, [("_id", -1)]),
+    ("uploads by status", "uploads", {"status": "parsed"}, [("_id", -1)]),
+    ("blob gc live records", "uploads", {"content_hash": {"$in": ["0" * 64]}}, None),
+    ("validations by upload", "validation_results", {"upload_id": "0" * 24}, None),
+    ("validation memo (same upload)", "validation_results", {"fingerprint": "f", "upload_id": "0" * 24}, None),
+    ("validation memo (any upload)", "validation_results", {"fingerprint": "f"}, None),
+    ("revalidation upsert", "validation_results", {"upload_id": "0" * 24, "revalidation": True}, None),
+    ("revalidation batch", "uploads", {"status": "parsed", "_id": {"$gt": ObjectId("0" * 24)}}, [("_id", 1)]),
+    ("validations page", "validation_results", {"revalidation": {"$ne": True}}, [("_id", -1)]),
+    ("validations by type", "validation_results",
+     {"document_type": "bank_loan", "revalidation": {"$ne": True}}, [("_id", -1)]),
+    ("validations by status", "validation_results",
+     {"status": "Failed ❌", "revalidation": {"$ne": True}}, [("_id", -1)]),
+    ("revalidation snapshots page", "validation_results", {"revalidation": True}, [("_id", -1)]),
+    ("export date range", "validation_results",
+     {"_id": {"$gte": ObjectId("0" * 24), "$lt": ObjectId("f" * 24)}, "revalidation": {"$ne": True}},
+     [("_id", -1)]),
+    ("revalidation lease lookup", "revalidation_jobs",
+     {"$or": [{"state": "queued"}, {"state": "running", "heartbeat": {"$not": {"$gte": datetime(2000, 1, 1)}}}]},
+     None),
+    ("revalidation jobs list", "revalidation_jobs", {}, [("created_at", -1)]),
+    ("stats counters", "stats", {"_id": "validation_counters"}, None),
+    ("stats by_day rebuild", "validation_results",
+     {"revalidation": {"$ne": True}, "$or": [{"created_at": {"$lt": datetime(2000, 1, 1)}}, {"created_at": None}]},
+     None),
+    ("stats held increments", "stats_pending", {}, [("_id", 1)]),
+    ("chatbot cache lookup", "chatbot_logs", {"normalized_query": "q"}, None),
+]
+
+
+# =========================================================
+# Bootstrap
+# =========================================================
+async def init_collections(db=None) -> dict:
+    """
+    Creates missing collections and indexes. Returns build times in ms per
+    index; builds slower than INDEX_SLOW_MS are logged.
+    """
+    db = db if db is not None else mongodb_config.db
+
+    existing = set(await db.list_collection_names())
+    for name in COLLECTIONS:
+        if name not in existing:
+            try:
+                await db.create_collection(name)
+                log(f"Created collection {name}")
+            except CollectionInvalid:
+                # Another worker created it between the listing and here
+                pass
+
+    timings = {}
+    for collection, specs in INDEXES.items():
+        for keys, options in specs:
+            start = time.perf_counter()
+            try:
+                await db[collection].create_index(keys, **options)
+            except OperationFailure as e:
+                # e.g. same name with different options, or duplicate emails
+                log(f"⚠️ Index {collection}.{options['name']} not created: {e}")
+                continue
+            ms = round((time.perf_counter() - start) * 1000, 1)
+            timings[f"{collection}.{options['name']}"] = ms
+            if ms > SLOW_INDEX_MS:
+                log(f"⚠️ Slow index build: {collection}.{options['name']} took {ms} ms")
+
+            old = REPLACED_INDEXES.get((collection, options["name"]))
+            if old and old in await db[collection].index_information():
+                await db[collection].drop_index(old)
+                log(f"Dropped index {collection}.{old} (replaced by {options['name']})")
+    return timings
+
+
+# =========================================================
+# Coverage check
+# =========================================================
+def _stages(plan: dict) -> list:
+    stages = [plan.get("stage")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages += _stages(child)
+    return stages
+
+
+async def verify_coverage(db=None) -> list:
+    """
+    Explains every entry in QUERY_PATTERNS and reports the winning plan.
+    A query is covered when its plan contains no COLLSCAN (the unfiltered
+    pages walk the _id index).
+    """
+    db = db if db is not None else mongodb_config.db
+    report = []
+    for name, collection, query, sort in QUERY_PATTERNS:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        try:
+            explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+            plan = explain["queryPlanner"]["winningPlan"]
+            stages = _stages(plan.get("queryPlan", plan))
+            report.append({
+                "query": name,
+                "collection": collection,
+                "covered": "COLLSCAN" not in stages,
+                "stages": stages,
+            })
+        except Exception as e:
+            report.append({"query": name, "collection": collection, "covered": None, "error": str(e)})
+    return report
+
+
+async def _main(verify: bool) -> int:
+    timings = await init_collections()
+    for index, ms in timings.items():
+        print(f"{index:<45} {ms:>9.1f} ms")
+    if not verify:
+        return 0
+
+    print()
+    uncovered = 0
+    for row in await verify_coverage():
+        if row["covered"] is None:
+            mark = "??"
+            detail = row["error"]
+        else:
+            mark = "ok" if row["covered"] else "XX"
+            detail = " <- ".join(row["stages"])
+        uncovered += row["covered"] is False
+        print(f"[{mark}] {row['collection']:<20} {row['query']:<28} {detail}")
+    return 1 if uncovered else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Create collections/indexes and check index coverage")
+    ap.add_argument("--verify", action="store_true", help="explain every route query after bootstrapping")
+    args = ap.parse_args()
+    raise SystemExit(asyncio.run(_main(args.verify)))
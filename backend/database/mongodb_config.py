@@ -15,7 +15,16 @@ if not MONGO_URI:
     raise ValueError("⚠️ MONGODB_URI not found in .env file!")
 
 # Create async MongoDB client
-client = AsyncIOMotorClient(MONGO_URI)
+# "mongomock://" selects an in-memory stand-in (load tests / local runs
+# without a server; state lives only as long as the process).
+if MONGO_URI.startswith("mongomock://"):
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise ValueError("⚠️ MONGODB_URI=mongomock:// requires the mongomock-motor package")
+    client = AsyncMongoMockClient()
+else:
+    client = AsyncIOMotorClient(MONGO_URI)
 
 # Select the database
 db = client["term_sheet_validation"]
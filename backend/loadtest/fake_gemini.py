@@ -0,0 +1,147 @@
+# backend/loadtest/fake_gemini.py
+#
+# Local stand-in for the Gemini REST API (generateContent and
+# streamGenerateContent?alt=sse) with configurable latency and error rate.
+# Point the backend at it with GEMINI_BASE_URL=http://127.0.0.1:8765/v1
+#
+#   cd backend && python -m loadtest.fake_gemini --port 8765 --latency-ms 800
+
+import argparse
+import asyncio
+import json
+import random
+import re
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CATEGORIES = ["startup_equity", "structured_note", "bank_loan", "venture_debt", "m_and_a", "real_estate"]
+
+
+class FakeConfig:
+    def __init__(self, latency_ms=300.0, jitter_ms=100.0, error_rate=0.0,
+                 chunk_delay_ms=50.0, chunk_words=4, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.chunk_delay_ms = chunk_delay_ms
+        self.chunk_words = chunk_words
+        self.random = random.Random(seed)
+
+
+# =========================================================
+# Canned replies, shaped like what each backend prompt expects
+# =========================================================
+def reply_for(prompt: str, rnd: random.Random) -> str:
+    doc_type = rnd.choice(CATEGORIES)
+
+    if "JSON array" in prompt:
+        count = len(re.findall(r"=== DOCUMENT \d+ ===", prompt)) or 1
+        return json.dumps([
+            {"id": i, "document_type": doc_type, "fields": {"Borrower": f"Fake Borrower {i}"}}
+            for i in range(1, count + 1)
+        ])
+    if "Fields per category" in prompt:
+        return json.dumps({"document_type": doc_type, "fields": {"Borrower": "Fake Borrower"}})
+    if prompt.lstrip().startswith("Classify"):
+        return doc_type
+    if "Extract the following fields" in prompt:
+        return json.dumps({"Issuer": "Fake Issuer", "ISIN": "XS0000000000"})
+    if "validating a financial term sheet" in prompt:
+        return json.dumps({"validated_fields": {}, "issues": [], "score": rnd.randint(60, 100),
+                           "summary": "Fake deep validation."})
+
+    words = ("This is a simulated answer from the local Gemini stand-in about "
+             + prompt[:80]).split()
+    return " ".join(words * 3)
+
+
+def candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+# =========================================================
+# App
+# =========================================================
+def create_app(config: FakeConfig | None = None) -> FastAPI:
+    config = config or FakeConfig()
+    app = FastAPI(title="Fake Gemini")
+    app.state.config = config
+    app.state.stats = {"requests": 0, "errors": 0, "streams": 0,
+                       "streams_completed": 0, "streams_cancelled": 0}
+
+    async def simulate_latency():
+        delay = config.latency_ms + config.random.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+    def should_fail() -> bool:
+        return config.random.random() < config.error_rate
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    @app.post("/v1/models/{model_method}")
+    @app.post("/v1beta/models/{model_method}")
+    async def models(model_method: str, request: Request):
+        stats = app.state.stats
+        stats["requests"] += 1
+        model, _, method = model_method.partition(":")
+        body = await request.json()
+        prompt = "".join(p.get("text", "") for p in body["contents"][0]["parts"])
+
+        await simulate_latency()
+        if should_fail():
+            stats["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": {"code": 503, "message": "Simulated overload"}})
+
+        text = reply_for(prompt, config.random)
+
+        if method == "generateContent":
+            return candidate(text)
+
+        if method == "streamGenerateContent":
+            stats["streams"] += 1
+            words = text.split(" ")
+            step = max(1, config.chunk_words)
+
+            async def events():
+                try:
+                    for i in range(0, len(words), step):
+                        chunk = " ".join(words[i:i + step]) + (" " if i + step < len(words) else "")
+                        yield f"data: {json.dumps(candidate(chunk))}\r\n\r\n"
+                        await asyncio.sleep(config.chunk_delay_ms / 1000)
+                    stats["streams_completed"] += 1
+                except asyncio.CancelledError:
+                    stats["streams_cancelled"] += 1
+                    raise
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse(status_code=404, content={"error": {"message": f"Unknown method {method}"}})
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    ap = argparse.ArgumentParser(description="Local Gemini stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--jitter-ms", type=float, default=100.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--chunk-delay-ms", type=float, default=50.0)
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        chunk_delay_ms=args.chunk_delay_ms, seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
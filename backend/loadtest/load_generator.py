@@ -0,0 +1,197 @@
+# backend/loadtest/load_generator.py
+#
+# Async load generator for the upload -> parse -> validate -> export flow.
+# Each virtual user loops: POST /api/upload, poll /api/jobs/{id} until the
+# parse finishes, POST /api/validate/{id}, GET /api/export/{validation_id}.
+# Reports throughput and p50/p90/p99 latency per endpoint.
+#
+#   cd backend && python -m loadtest.load_generator --base-url http://127.0.0.1:8001 \
+#       --users 20 --duration 60 --pages 1 10
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks import corpus
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = defaultdict(list)     # endpoint -> [ms]
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.flows = {"completed": 0, "failed": 0}
+        self.started = time.perf_counter()
+
+    def add(self, endpoint: str, ms: float, status):
+        self.latency[endpoint].append(ms)
+        self.status[endpoint][str(status)] += 1
+
+    async def call(self, endpoint: str, request):
+        start = time.perf_counter()
+        try:
+            resp = await request
+        except httpx.HTTPError as e:
+            self.add(endpoint, (time.perf_counter() - start) * 1000, type(e).__name__)
+            return None
+        self.add(endpoint, (time.perf_counter() - start) * 1000, resp.status_code)
+        return resp
+
+
+def percentile(samples, pct: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[idx], 2)
+
+
+# =========================================================
+# Virtual user
+# =========================================================
+async def run_flow(client: httpx.AsyncClient, rec: Recorder, pdf: Path, args) -> bool:
+    with open(pdf, "rb") as f:
+        content = f.read()
+    if args.unique:
+        # Trailing comment after %%EOF: still a valid PDF, but a new content
+        # hash, so the extraction cache does not short-circuit the parse.
+        content += f"\n% loadtest {uuid.uuid4().hex}\n".encode()
+
+    resp = await rec.call("POST /api/upload", client.post(
+        "/api/upload", files={"file": (pdf.name, content, "application/pdf")}
+    ))
+    if resp is None or resp.status_code != 200:
+        return False
+    upload_id = resp.json()["upload_id"]
+
+    # Parse runs on the worker pool; time the whole wait as its own row.
+    wait_start = time.perf_counter()
+    deadline = wait_start + args.job_timeout
+    state = None
+    while time.perf_counter() < deadline:
+        resp = await rec.call("GET /api/jobs/{id}", client.get(f"/api/jobs/{upload_id}"))
+        if resp is not None and resp.status_code == 200:
+            state = resp.json().get("state")
+            if state in ("completed", "failed"):
+                break
+        await asyncio.sleep(args.poll_interval)
+    rec.add("job (upload -> parsed)", (time.perf_counter() - wait_start) * 1000, state or "timeout")
+    if state != "completed":
+        return False
+
+    resp = await rec.call("POST /api/validate/{id}", client.post(f"/api/validate/{upload_id}"))
+    if resp is None or resp.status_code != 200:
+        return False
+    validation_id = resp.json()["validation_id"]
+
+    resp = await rec.call("GET /api/export/{id}", client.get(f"/api/export/{validation_id}"))
+    return resp is not None and resp.status_code == 200
+
+
+async def user(idx: int, client: httpx.AsyncClient, rec: Recorder, pdfs: list, stop_at: float, args):
+    await asyncio.sleep(args.ramp_up * idx / max(args.users, 1))
+    rnd = random.Random(idx)
+    done = 0
+    while time.perf_counter() < stop_at and (not args.iterations or done < args.iterations):
+        ok = await run_flow(client, rec, rnd.choice(pdfs), args)
+        rec.flows["completed" if ok else "failed"] += 1
+        done += 1
+        if args.think_ms:
+            await asyncio.sleep(args.think_ms / 1000)
+
+
+async def run(args) -> dict:
+    docs = corpus.generate(args.pages, args.types, args.corpus_dir)
+    pdfs = [path for _, _, path in docs]
+
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.request_timeout)
+    rec = Recorder()
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        stop_at = time.perf_counter() + args.duration
+        await asyncio.gather(*(user(i, client, rec, pdfs, stop_at, args) for i in range(args.users)))
+
+        stats_resp = await rec.call("GET /api/jobs", client.get("/api/jobs"))
+        pool = stats_resp.json() if stats_resp is not None and stats_resp.status_code == 200 else None
+
+    return report(rec, args, pool)
+
+
+# =========================================================
+# Report
+# =========================================================
+def report(rec: Recorder, args, pool) -> dict:
+    elapsed = time.perf_counter() - rec.started
+    endpoints = {}
+    for name, samples in rec.latency.items():
+        endpoints[name] = {
+            "count": len(samples),
+            "per_sec": round(len(samples) / elapsed, 2),
+            "status": dict(rec.status[name]),
+            "mean_ms": round(statistics.fmean(samples), 2),
+            "p50_ms": percentile(samples, 50),
+            "p90_ms": percentile(samples, 90),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": round(max(samples), 2),
+        }
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "users": args.users,
+            "duration_s": args.duration,
+            "pages": args.pages,
+            "unique": args.unique,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "flows": rec.flows,
+        "flows_per_sec": round(rec.flows["completed"] / elapsed, 3),
+        "endpoints": endpoints,
+        "pool": pool,
+    }
+
+
+def print_report(result: dict):
+    print(f"\n{result['flows']['completed']} flows completed, {result['flows']['failed']} failed "
+          f"in {result['elapsed_s']} s ({result['flows_per_sec']} flows/s)\n")
+    print(f"{'endpoint':<26} {'count':>6} {'req/s':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  status")
+    for name, e in result["endpoints"].items():
+        print(f"{name:<26} {e['count']:>6} {e['per_sec']:>7} {e['p50_ms']:>9} {e['p90_ms']:>9} "
+              f"{e['p99_ms']:>9} {e['max_ms']:>9}  {e['status']}")
+    if result["pool"]:
+        print(f"\npool: {json.dumps(result['pool'])}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load generator for upload/validate/export")
+    ap.add_argument("--base-url", default="http://127.0.0.1:8001")
+    ap.add_argument("--users", type=int, default=10)
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds")
+    ap.add_argument("--iterations", type=int, default=0, help="flows per user (0 = until duration)")
+    ap.add_argument("--ramp-up", type=float, default=0.0, help="seconds to start all users")
+    ap.add_argument("--think-ms", type=float, default=0.0)
+    ap.add_argument("--poll-interval", type=float, default=0.25)
+    ap.add_argument("--job-timeout", type=float, default=120.0)
+    ap.add_argument("--request-timeout", type=float, default=120.0)
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 10])
+    ap.add_argument("--types", nargs="+", default=None)
+    ap.add_argument("--unique", action="store_true", help="make every upload byte-unique (no cache hits)")
+    ap.add_argument("--corpus-dir", type=Path, default=corpus.DEFAULT_DIR)
+    ap.add_argument("--out", type=Path, default=None, help="also write the report as JSON")
+    args = ap.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
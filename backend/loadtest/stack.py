@@ -0,0 +1,78 @@
+# backend/loadtest/stack.py
+#
+# Runs the backend in load-test mode: the local Gemini stand-in on one port
+# and the API on another, backed by an in-memory MongoDB (or a local
+# mongod via --mongo-uri). Nothing leaves the machine.
+#
+#   cd backend && python -m loadtest.stack --port 8001 --latency-ms 800 --error-rate 0.02
+#   python -m loadtest.load_generator --base-url http://127.0.0.1:8001 --users 20 --duration 60
+
+import argparse
+import os
+import threading
+import time
+
+import uvicorn
+
+from loadtest import fake_gemini
+
+
+def start_fake_gemini(config: fake_gemini.FakeConfig, host: str, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        fake_gemini.create_app(config), host=host, port=port, log_level="warning",
+    ))
+    thread = threading.Thread(target=server.run, name="fake-gemini", daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError(f"Fake Gemini failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Backend + local Gemini/MongoDB stand-ins")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--gemini-port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=300.0)
+    ap.add_argument("--jitter-ms", type=float, default=100.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--chunk-delay-ms", type=float, default=50.0)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--mongo-uri", default="mongomock://",
+                    help="mongomock:// (in-memory) or a local mongodb:// URI")
+    ap.add_argument("--upload-workers", type=int, default=None, help="sets UPLOAD_WORKERS")
+    ap.add_argument("--upload-pool", choices=["thread", "process"], default=None, help="sets UPLOAD_POOL")
+    args = ap.parse_args()
+
+    # Must be in place before the app (and its config modules) is imported.
+    os.environ["MONGODB_URI"] = args.mongo_uri
+    os.environ["GEMINI_API_KEY"] = "loadtest"
+    os.environ["GEMINI_BASE_URL"] = f"http://{args.host}:{args.gemini_port}/v1"
+    if args.upload_workers:
+        os.environ["UPLOAD_WORKERS"] = str(args.upload_workers)
+    if args.upload_pool:
+        os.environ["UPLOAD_POOL"] = args.upload_pool
+
+    config = fake_gemini.FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        chunk_delay_ms=args.chunk_delay_ms, seed=args.seed,
+    )
+    fake = start_fake_gemini(config, args.host, args.gemini_port)
+    print(f"Fake Gemini on {os.environ['GEMINI_BASE_URL']} "
+          f"(latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate})")
+    print(f"MongoDB: {args.mongo_uri}")
+
+    from main import app
+
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    finally:
+        fake.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
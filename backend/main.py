@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -11,8 +12,44 @@ from routes.chatbot_routes import router as chatbot_router
 from routes.auth_routes import router as auth_router
 from routes.data_routes import router as data_router
 from routes.compare_routes import router as compare_router   # ⭐ NEW
+from routes.job_routes import router as job_router
+from routes.revalidation_routes import router as revalidation_router
+from database.collections_init import init_collections
+from services import job_service, llm_client, revalidation_service, s3_service, stats_service
+from utils import pdf_utils
 
-app = FastAPI(title="AI Term Sheet Validation System")
+# ⭐ LIFESPAN (startup / shutdown)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await llm_client.start()
+    try:
+        await init_collections()
+    except Exception as e:
+        print(f"⚠️ Could not initialise collections/indexes: {e}")
+    try:
+        await stats_service.ensure_counters()
+    except Exception as e:
+        print(f"⚠️ Could not seed stats counters: {e}")
+    try:
+        await job_service.resume_pending()
+    except Exception as e:
+        print(f"⚠️ Could not resume pending upload jobs: {e}")
+    try:
+        await s3_service.resume_pending()
+    except Exception as e:
+        print(f"⚠️ Could not queue S3 replication: {e}")
+    try:
+        await revalidation_service.resume_pending()
+    except Exception as e:
+        print(f"⚠️ Could not resume revalidation jobs: {e}")
+    yield
+    await revalidation_service.shutdown()
+    await s3_service.shutdown()
+    job_service.shutdown()
+    pdf_utils.shutdown()
+    await llm_client.stop()
+
+app = FastAPI(title="AI Term Sheet Validation System", lifespan=lifespan)
 
 # ⭐ CORS SETTINGS
 app.add_middleware(
@@ -32,6 +69,8 @@ app.include_router(chatbot_router, prefix="/api")
 app.include_router(auth_router, prefix="/api")
 app.include_router(data_router, prefix="/api")
 app.include_router(compare_router, prefix="/api")   # ⭐ NEW Compare Feature
+app.include_router(job_router, prefix="/api")
+app.include_router(revalidation_router, prefix="/api")
 
 # ⭐ STATIC FILES (Reports + Uploads)
 reports_dir = os.path.join(os.path.dirname(__file__), "reports")
@@ -1,7 +1,11 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class ChatbotLog(BaseModel):
     query: str
+    normalized_query: str
     response: str
+    hits: int = 0
     created_at: datetime = datetime.utcnow()
+    expires_at: Optional[datetime] = None
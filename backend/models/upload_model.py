@@ -4,7 +4,11 @@ from typing import Optional
 
 class UploadModel(BaseModel):
     filename: str
-    s3_url: Optional[str] = None
+    path: Optional[str] = None
+    content_hash: Optional[str] = None
+    size: Optional[int] = None
+    s3_url: Optional[str] = None       # set once the background replication finishes
+    s3_key: Optional[str] = None
     status: str = "uploaded"
     extracted_fields: Optional[dict] = {}
     uploaded_at: datetime = datetime.utcnow()
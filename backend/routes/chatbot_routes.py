@@ -1,8 +1,10 @@
 # backend/routes/chatbot_routes.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from services import chatbot_service
+import json
+from services import chatbot_cache, chatbot_service
 
 # ✅ define router — REQUIRED by FastAPI
 router = APIRouter()
@@ -20,3 +22,47 @@ async def chatbot_response(query: Query):
         return {"answer": response}
     except Exception as e:
         return {"error": str(e)}
+
+@router.post("/chatbot/stream")
+async def chatbot_stream(query: Query, request: Request):
+    """
+    Streaming variant of /chatbot over Server-Sent Events.
+
+    Each chunk is sent as `data: {"text": ...}`, followed by `event: done`
+    (or `event: error`). Chunks are pulled from Gemini only as fast as the
+    client reads them, and a disconnected client closes the upstream stream.
+    """
+    async def events():
+        chunks = chatbot_service.respond_stream(query.query)
+        try:
+            async for chunk in chunks:
+                if await request.is_disconnected():
+                    break
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            else:
+                yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/chatbot/cache/stats")
+async def chatbot_cache_stats():
+    """Cache hit rate and p50/p99 answer latency."""
+    return chatbot_cache.stats()
+
+@router.delete("/chatbot/cache")
+async def purge_chatbot_cache(query: str | None = None):
+    """
+    Admin: purge one cached question (?query=...) or the whole cache.
+    """
+    try:
+        return await chatbot_cache.purge(query)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to purge cache: {str(e)}")
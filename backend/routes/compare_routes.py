@@ -1,5 +1,6 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from services.termsheet_compare_service import compare_termsheets
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from services import blob_store
+from services.termsheet_compare_service import UploadNotFoundError, compare_termsheets
 
 router = APIRouter(
     prefix="/compare",
@@ -8,11 +9,23 @@ router = APIRouter(
 
 @router.post("/termsheets")
 async def compare_two_termsheets(
-    ideal_file: UploadFile = File(...),
-    input_file: UploadFile = File(...)
+    ideal_file: UploadFile | None = File(None),
+    input_file: UploadFile | None = File(None),
+    ideal_upload_id: str | None = Form(None),
+    input_upload_id: str | None = Form(None),
 ):
+    """
+    Compares two term sheets. Each side is either a PDF file or the
+    upload_id of a stored upload, whose extracted text is reused.
+    """
     try:
-        result = await compare_termsheets(ideal_file, input_file)
+        result = await compare_termsheets(ideal_file, input_file, ideal_upload_id, input_upload_id)
         return {"status": "success", "comparison": result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except blob_store.BlobTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
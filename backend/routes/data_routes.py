@@ -1,65 +1,130 @@
 # backend/routes/data_routes.py
 
-from fastapi import APIRouter, HTTPException
-from database.mongodb_config import db
+from datetime import datetime
 from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database.mongodb_config import db
+from services import blob_store, stats_service
+from utils import query_utils
 
 router = APIRouter()
 
+# List views leave out the heavy per-document payloads unless ?fields= asks for them
+UPLOAD_LIST_PROJECTION = {"extracted_fields": 0}
+VALIDATION_LIST_PROJECTION = {"validated_fields": 0}
+
+
+async def _list(collection, default_projection, cursor, limit, fields,
+                document_type, status, since, until, format, extra=None):
+    query = query_utils.build_filter(cursor, document_type, status, since, until)
+    query.update(extra or {})
+    projection = query_utils.build_projection(fields, default_projection)
+
+    if format == "ndjson":
+        return StreamingResponse(
+            query_utils.stream_ndjson(collection, query, projection, limit),
+            media_type="application/x-ndjson",
+        )
+    return await query_utils.paginate(collection, query, projection, limit or query_utils.DEFAULT_LIMIT)
+
+
 @router.get("/uploads")
-async def get_all_uploads():
-    """Get all uploaded files"""
+async def get_all_uploads(
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    fields: str | None = None,
+    document_type: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """
+    Uploads, newest first, one page at a time. Pass back `next_cursor` as
+    `cursor` for the next page; format=ndjson streams every match instead.
+    """
     try:
-        uploads = await db["uploads"].find({}).to_list(length=None)
-        
-        # Convert ObjectId to string for JSON serialization
-        for upload in uploads:
-            if "_id" in upload:
-                upload["_id"] = str(upload["_id"])
-            if "upload_id" in upload and isinstance(upload["upload_id"], ObjectId):
-                upload["upload_id"] = str(upload["upload_id"])
-        
-        return uploads
+        return await _list(
+            db["uploads"], UPLOAD_LIST_PROJECTION, cursor, limit, fields,
+            document_type, status, since, until, format,
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch uploads: {str(e)}")
 
+@router.delete("/uploads/{upload_id}")
+async def delete_upload(upload_id: str):
+    """
+    Removes an upload record and releases its blob reference; the PDF is
+    reclaimed by blob_store.gc() once no other upload shares it. Its
+    validation results are kept for stats and reports.
+    """
+    try:
+        oid = ObjectId(upload_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    try:
+        doc = await db["uploads"].find_one_and_delete(
+            {"_id": oid, "status": {"$nin": ["queued", "processing"]}}, {"content_hash": 1}
+        )
+        if not doc:
+            if await db["uploads"].count_documents({"_id": oid}, limit=1):
+                raise HTTPException(status_code=409, detail="Upload is still being processed")
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if doc.get("content_hash"):
+            await blob_store.release(doc["content_hash"])
+        return {"deleted": upload_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete upload: {str(e)}")
+
 @router.get("/validations")
-async def get_all_validations():
-    """Get all validation results"""
+async def get_all_validations(
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    fields: str | None = None,
+    document_type: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    revalidation: bool = False,
+):
+    """
+    Validation results, paginated and filtered like /uploads.
+    revalidation=true lists the bulk revalidation snapshots instead.
+    """
     try:
-        validations = await db["validation_results"].find({}).to_list(length=None)
-        
-        # Convert ObjectId to string for JSON serialization
-        for validation in validations:
-            if "_id" in validation:
-                validation["_id"] = str(validation["_id"])
-            if "upload_id" in validation and isinstance(validation["upload_id"], ObjectId):
-                validation["upload_id"] = str(validation["upload_id"])
-        
-        return validations
+        return await _list(
+            db["validation_results"], VALIDATION_LIST_PROJECTION, cursor, limit, fields,
+            document_type, status, since, until, format,
+            query_utils.results_filter(revalidation),
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch validations: {str(e)}")
 
 @router.get("/stats")
-async def get_stats():
-    """Get dashboard statistics"""
+async def get_stats(days: int | None = Query(30, ge=1, le=stats_service.STATS_RETENTION_DAYS)):
+    """
+    Dashboard statistics from the materialized counters (O(1)), with
+    breakdowns by status, document type and day (last `days` days).
+    """
     try:
-        uploads = await db["uploads"].count_documents({})
-        validations = await db["validation_results"].count_documents({})
-        
-        # Calculate success rate
-        validation_docs = await db["validation_results"].find({}).to_list(length=None)
-        successful = sum(1 for v in validation_docs if v.get("status") in ["Valid", "Approved"])
-        success_rate = round((successful / validations * 100)) if validations > 0 else 0
-        
-        # Count total issues
-        total_issues = sum(len(v.get("issues", [])) for v in validation_docs)
-        
-        return {
-            "totalUploads": uploads,
-            "totalValidations": validations,
-            "successRate": success_rate,
-            "totalIssues": total_issues,
-        }
+        return await stats_service.get_stats(days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
+
+@router.post("/stats/rebuild")
+async def rebuild_stats():
+    """Recompute the counters from validation_results (aggregation pipeline)."""
+    try:
+        await stats_service.rebuild()
+        return await stats_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild stats: {str(e)}")
@@ -1,12 +1,38 @@
 # backend/routes/export_routes.py
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from services import report_service
-import os
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from services import export_service, report_service
+from utils import query_utils
 
 router = APIRouter()
 
+# Declared before /export/{validation_id} so "batch" is not taken for an ID
+@router.get("/export/batch")
+async def export_batch(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|zip)$"),
+    document_type: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int | None = Query(None, ge=1),
+    revalidation: bool = False,
+):
+    """
+    Streams every validation result matching the filter, newest first:
+    NDJSON, CSV (one row per result) or a ZIP of per-report JSON files.
+    revalidation=true exports the bulk revalidation snapshots instead.
+    """
+    query = query_utils.build_filter(None, document_type, status, since, until)
+    query.update(query_utils.results_filter(revalidation))
+    stream, media_type, filename = export_service.export(format, query, limit)
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.get("/export/{validation_id}")
 async def export_report(validation_id: str):
     result = await report_service.generate_report(validation_id)
@@ -18,20 +44,38 @@ async def export_report(validation_id: str):
 
     return {
         "message": "Report generated successfully",
-        "report_link": result.get("report_link", "/reports/")
+        "report_link": result.get("report_link", "/reports/"),
+        "etag": result.get("etag"),
+        "version": result.get("version"),
+        "regenerated": result.get("regenerated"),
     }
 
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in tags
+
 @router.get("/download/{validation_id}")
-async def download_report(validation_id: str):
-    """Download the generated report as JSON file"""
-    report_path = os.path.join("reports", f"{validation_id}.json")
-    
-    # Check if file exists
-    if not os.path.exists(report_path):
+async def download_report(validation_id: str, request: Request):
+    """
+    Download the generated report as JSON file. Sends an ETag; a matching
+    If-None-Match gets 304 Not Modified without a body.
+    """
+    report = await report_service.get_report(validation_id)
+    if report is None:
         raise HTTPException(status_code=404, detail="Report not found. Generate report first.")
-    
+
+    report_path, etag = report
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     return FileResponse(
         path=report_path,
         filename=f"validation_report_{validation_id}.json",
-        media_type="application/json"
+        media_type="application/json",
+        headers=headers,
     )
@@ -0,0 +1,49 @@
+# backend/routes/job_routes.py
+
+from fastapi import APIRouter, HTTPException
+from database.mongodb_config import db
+from bson import ObjectId
+from services import job_service
+
+router = APIRouter()
+
+@router.get("/jobs")
+async def get_pool_stats():
+    """Worker pool size, queue depth and job counts by state."""
+    return job_service.pool_stats()
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """
+    Reports state, per-stage progress and errors for an upload job.
+    Falls back to the upload record for jobs no longer held in memory.
+    """
+    job = job_service.get_job(job_id)
+    if job:
+        return job
+
+    try:
+        upload = await db["uploads"].find_one(
+            {"_id": ObjectId(job_id)}, {"status": 1, "filename": 1, "error": 1}
+        )
+    except Exception:
+        upload = None
+
+    if not upload:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    state = {
+        "parsed": "completed",
+        "failed": "failed",
+        "queued": "queued",
+        "processing": "running",
+    }.get(upload.get("status"), upload.get("status"))
+
+    return {
+        "job_id": job_id,
+        "upload_id": job_id,
+        "filename": upload.get("filename"),
+        "state": state,
+        "stages": {},
+        "error": upload.get("error"),
+    }
@@ -0,0 +1,42 @@
+# backend/routes/revalidation_routes.py
+
+from fastapi import APIRouter, HTTPException
+from services import revalidation_service
+
+router = APIRouter()
+
+@router.post("/revalidate")
+async def start_revalidation(document_type: str | None = None):
+    """
+    Re-scores every parsed upload (optionally one document type) against
+    the current schemas in the background. Poll /api/revalidate/{job_id}.
+    """
+    job = await revalidation_service.create_job(document_type)
+    revalidation_service.start(job["_id"])
+    return revalidation_service.progress(job)
+
+@router.get("/revalidate")
+async def list_revalidations(limit: int = 20):
+    return {"items": await revalidation_service.list_jobs(limit)}
+
+@router.get("/revalidate/{job_id}")
+async def get_revalidation(job_id: str):
+    """Progress (processed/total, docs/s, ETA) and status counts for a job."""
+    job = await revalidation_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Revalidation job not found")
+    return revalidation_service.progress(job)
+
+@router.post("/revalidate/{job_id}/resume")
+async def resume_revalidation(job_id: str):
+    """Continues a failed or interrupted job from its last checkpoint."""
+    if not await revalidation_service.resume(job_id):
+        raise HTTPException(status_code=409, detail="Job not found, finished or running in another worker")
+    return revalidation_service.progress(await revalidation_service.get_job(job_id))
+
+@router.post("/revalidate/{job_id}/cancel")
+async def cancel_revalidation(job_id: str):
+    """Stops the job after the batch in progress."""
+    if not await revalidation_service.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job not found or not running")
+    return revalidation_service.progress(await revalidation_service.get_job(job_id))
@@ -1,10 +1,10 @@
 # backend/routes/upload_routes.py
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
 from database.mongodb_config import db
-from services import parser_service
-import aiofiles
+from services import blob_store, bulk_upload_service, extraction_cache, job_service, s3_service
 import os
-import uuid
 
 router = APIRouter()
 
@@ -13,41 +13,92 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/upload")
 async def upload_term_sheet(file: UploadFile = File(...)):
-    try:
-        # Save the uploaded file
-        unique_filename = f"uploaded_{uuid.uuid4().hex}.pdf"
-        save_path = os.path.join(UPLOAD_DIR, unique_filename)
-
-        async with aiofiles.open(save_path, "wb") as buffer:
-            content = await file.read()
-            await buffer.write(content)
-
-        # Extract fields using parser
-        print(f"\n📄 Extracting fields from: {save_path}")
-        extracted = parser_service.extract_fields(save_path)
-
-        print("\n🧩 Extracted fields output:")
-        print(extracted)
+    """
+    Saves the PDF, records the upload and queues parsing on the worker pool.
+    Poll /api/jobs/{upload_id} for progress.
+    """
+    if job_service.pending_count() >= job_service.UPLOAD_QUEUE_MAX:
+        raise HTTPException(status_code=503, detail="Upload queue is full, retry shortly")
 
-        # Fallback safeguard
-        if not extracted or "error" in extracted:
-            extracted = {"warning": "No structured fields extracted"}
+    try:
+        # Stream to content-addressed storage (hashed while writing)
+        blob = await blob_store.save_upload(file)
 
         doc = {
             "filename": file.filename,
-            "path": save_path,
-            "status": "parsed",
-            "extracted_fields": extracted,
+            "path": blob.path,
+            "content_hash": blob.sha256,
+            "size": blob.size,
+            "status": "queued",
+            "extracted_fields": {},
         }
 
-        result = await db["uploads"].insert_one(doc)
+        # Take the queue slot before anything is recorded: a full queue
+        # (QueueFullError -> 503) leaves no upload behind. The unreferenced
+        # blob is reclaimed by blob_store.gc().
+        oid = ObjectId()
+        upload_id = str(oid)
+        job_service.create_job(upload_id, file.filename)
+
+        inserted = False
+        try:
+            await db["uploads"].insert_one({"_id": oid, **doc})
+            inserted = True
+            await blob_store.add_ref(blob)
+            # Parse in the background
+            job_service.submit(upload_id, blob.path, blob.sha256)
+        except Exception:
+            # Leave nothing for resume_pending() to pick up behind the client's back
+            job_service.discard_job(upload_id)
+            if inserted:
+                await db["uploads"].delete_one({"_id": oid})
+                await blob_store.release(blob.sha256)
+            raise
+        s3_service.schedule_upload(oid, blob.path, blob.sha256)
+        print(f"\n📄 Queued extraction for: {blob.path}" + (" (duplicate blob)" if blob.deduplicated else ""))
 
         return {
             "message": "File uploaded successfully ✅",
-            "upload_id": str(result.inserted_id),
-            "saved_to": save_path
+            "upload_id": upload_id,
+            "job_id": upload_id,
+            "status": "queued",
+            "status_url": f"/api/jobs/{upload_id}",
+            "saved_to": blob.path,
+            "content_hash": blob.sha256,
         }
 
+    except blob_store.BlobTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except job_service.QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"\n❌ Upload failed: {e}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
+
+
+@router.post("/upload/bulk")
+async def bulk_upload(files: list[UploadFile] = File(...)):
+    """
+    Ingests many PDFs, or ZIP archives of PDFs, in one request.
+    Streams NDJSON: one line per file as it finishes
+    ({filename, upload_id, status, document_type, error}), then a summary.
+    """
+    try:
+        items, archives, rejected = await bulk_upload_service.stage(files, UPLOAD_DIR)
+    except bulk_upload_service.TooManyFilesError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        print(f"\n❌ Bulk upload failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk upload failed: {e}")
+
+    print(f"\n📦 Bulk upload: {len(items)} PDFs from {len(files)} files")
+    return StreamingResponse(
+        bulk_upload_service.ingest(items, archives, rejected),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/upload/cache/stats")
+async def extraction_cache_stats():
+    """Hit/miss counters for the content-addressed extraction cache."""
+    return extraction_cache.stats()
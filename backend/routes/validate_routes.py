@@ -3,17 +3,80 @@
 from fastapi import APIRouter, HTTPException
 from database.mongodb_config import db
 from bson import ObjectId
-from services import validator_service
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from services import stats_service, validator_service
+from datetime import datetime
 import json
 
 # ✅ MUST BE AT TOP LEVEL
 router = APIRouter()
 
+# Outcome fields copied from a validation result with the same fingerprint
+OUTCOME_FIELDS = ["document_type", "validated_fields", "issues", "score", "summary",
+                  "status", "schema_version", "rules_version", "checks"]
+
+
+def _response(vdoc: dict, validation_id, cached: bool) -> dict:
+    return {
+        "message": "AI validation completed ✅",
+        "validation_id": str(validation_id),
+        "document_type": vdoc["document_type"],
+        "score": vdoc["score"],
+        "status": vdoc["status"],
+        "summary": vdoc["summary"],
+        "schema_version": vdoc.get("schema_version"),
+        "checks": vdoc.get("checks"),
+        "issues": vdoc["issues"],
+        "validated_fields": vdoc["validated_fields"],
+        "cached": cached,
+    }
+
+
+async def _replace_outcome(key: dict, vdoc: dict) -> tuple:
+    """
+    force=true: overwrites the outcome of the upload's result for this
+    fingerprint (or creates it) and bumps its version so the report is
+    regenerated. Returns (previous document or None, validation_id).
+    """
+    outcome = {k: v for k, v in vdoc.items() if k not in ("created_at", "version")}
+    update = {
+        "$set": {**outcome, **key, "updated_at": datetime.utcnow()},
+        "$inc": {"version": 1},
+        "$setOnInsert": {"created_at": vdoc["created_at"]},
+    }
+    for attempt in range(2):
+        try:
+            old = await db["validation_results"].find_one_and_update(
+                key, update, upsert=True, return_document=ReturnDocument.BEFORE,
+            )
+            break
+        except DuplicateKeyError:
+            # Lost an insert race with another request; the retry updates
+            if attempt:
+                raise
+    if old is None:
+        validation_id = (await db["validation_results"].find_one(key, {"_id": 1}))["_id"]
+        return None, validation_id
+    # Same day bucket in the stats as the result being replaced
+    old.setdefault("created_at", old["_id"].generation_time.replace(tzinfo=None))
+    vdoc["created_at"] = old["created_at"]
+    return old, old["_id"]
+
+
 @router.post("/validate/{upload_id}")
-async def validate(upload_id: str):
+async def validate(upload_id: str, deep_check: bool = False, force: bool = False):
     """
     Runs validation for the uploaded term sheet.
-    Uses the universal AI validator.
+    Uses the universal AI validator; deep_check=true adds the rule checks
+    (and Gemini for whatever they cannot decide).
+
+    Outcomes are memoized by a fingerprint of the fields, document type,
+    schema/rules versions and deep_check: validating the same upload again
+    returns the stored result, and another upload with identical fields
+    reuses its outcome without re-running the validator. Each upload has
+    at most one result per fingerprint (unique index); force=true re-runs
+    the validator and replaces that result's outcome, bumping its version.
     """
 
     try:
@@ -22,6 +85,12 @@ async def validate(upload_id: str):
         if not upload:
             raise HTTPException(status_code=404, detail="Upload not found")
 
+        if upload.get("status") in ("queued", "processing"):
+            raise HTTPException(
+                status_code=409,
+                detail="Upload is still being processed"
+            )
+
         extracted = upload.get("extracted_fields", {})
         document_type = upload.get("document_type", "unknown")
 
@@ -41,12 +110,26 @@ async def validate(upload_id: str):
                     detail="Extracted fields are not valid JSON"
                 )
 
-        # 2. Run validator
-        validation_result = validator_service.validate_fields(
-            extracted_fields=extracted,
-            document_type=document_type,
-            deep_check=False
-        )
+        # 2. Memoized outcome, or run the validator
+        fingerprint = validator_service.fingerprint(extracted, document_type, deep_check)
+        key = {"fingerprint": fingerprint, "upload_id": upload_id}
+        validation_result = None
+        if not force:
+            existing = await db["validation_results"].find_one(key)
+            if existing:
+                return _response(existing, existing["_id"], cached=True)
+            validation_result = await db["validation_results"].find_one(
+                {"fingerprint": fingerprint}, {f: 1 for f in OUTCOME_FIELDS}
+            )
+        reused = validation_result is not None
+
+        if validation_result is None:
+            validation_result = await validator_service.validate_fields_once(
+                fingerprint,
+                extracted_fields=extracted,
+                document_type=document_type,
+                deep_check=deep_check
+            )
 
         # Fix: ensure dict
         if isinstance(validation_result, str):
@@ -64,21 +147,42 @@ async def validate(upload_id: str):
             "score": validation_result.get("score", 0),
             "summary": validation_result.get("summary", "No summary"),
             "status": validation_result.get("status", "Unknown"),
+            "schema_version": validation_result.get("schema_version"),
+            "rules_version": validation_result.get("rules_version"),
+            "checks": validation_result.get("checks"),
+            "created_at": datetime.utcnow(),
+            "version": 1,   # bumped on every change; report_service regenerates on mismatch
         }
 
-        result = await db["validation_results"].insert_one(vdoc)
+        # Outcomes hit by a Gemini failure are stored but never reused
+        if validation_result.get("llm_error"):
+            result = await db["validation_results"].insert_one(vdoc)
+            validation_id = result.inserted_id
+        elif force:
+            old, validation_id = await _replace_outcome(key, vdoc)
+            if old is not None:
+                await stats_service.replace_validation(old, vdoc)
+                return _response(vdoc, validation_id, cached=False)
+        else:
+            # The unique (fingerprint, upload_id) index makes concurrent
+            # identical requests, from any worker, end up with one result
+            try:
+                result = await db["validation_results"].update_one(
+                    key, {"$setOnInsert": {**vdoc, **key}}, upsert=True,
+                )
+                validation_id = result.upserted_id
+            except DuplicateKeyError:
+                validation_id = None
+            if validation_id is None:
+                existing = await db["validation_results"].find_one(key)
+                return _response(existing, existing["_id"], cached=True)
+
+        await stats_service.record_validation(vdoc)
 
         # 4. Return response
-        return {
-            "message": "AI validation completed ✅",
-            "validation_id": str(result.inserted_id),
-            "document_type": vdoc["document_type"],
-            "score": vdoc["score"],
-            "status": vdoc["status"],
-            "summary": vdoc["summary"],
-            "issues": vdoc["issues"],
-            "validated_fields": vdoc["validated_fields"],
-        }
+        return _response(vdoc, validation_id, cached=reused)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
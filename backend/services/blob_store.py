@@ -0,0 +1,334 @@
+# backend/services/blob_store.py
+#
+# Content-addressed storage for uploaded PDFs: uploads/blobs/ab/<sha256>.pdf.
+# Identical files share one blob; blob_refs counts the upload records that
+# point at each one, and gc() removes blobs nothing refers to.
+#
+#   cd backend && python -m services.blob_store gc            # dry run
+#   cd backend && python -m services.blob_store gc --delete
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import aiofiles
+from pymongo import UpdateOne
+
+from database.mongodb_config import db
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+UPLOAD_ROOT = Path(__file__).resolve().parents[1] / "uploads"
+BLOB_DIR = Path(os.getenv("BLOB_DIR", UPLOAD_ROOT / "blobs"))
+TMP_DIR = BLOB_DIR / "tmp"
+CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("UPLOAD_MAX_MB", "50")) * 1024 * 1024
+GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+GC_BATCH = int(os.getenv("BLOB_GC_BATCH", "500"))
+TOMBSTONE = ".gc"
+
+REFS = "blob_refs"
+
+
+class BlobTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class Blob:
+    sha256: str
+    path: str
+    size: int
+    deduplicated: bool
+
+
+def blob_path(sha256: str) -> Path:
+    return BLOB_DIR / sha256[:2] / f"{sha256}.pdf"
+
+
+def _tmp_path() -> Path:
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    return TMP_DIR / f"{uuid.uuid4().hex}.part"
+
+
+def _commit(tmp: Path, sha256: str, size: int) -> Blob:
+    """Moves a fully written temp file to its content address (atomic rename)."""
+    final = blob_path(sha256)
+    try:
+        # Fresh mtime keeps gc()'s grace period from racing this new
+        # reference; gc() re-checks it after tombstoning the blob
+        os.utime(final)
+        tmp.unlink(missing_ok=True)
+        return Blob(sha256, str(final), size, deduplicated=True)
+    except FileNotFoundError:
+        pass   # new content, or gc() just took the old copy away
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp, final)
+    return Blob(sha256, str(final), size, deduplicated=False)
+
+
+# =========================================================
+# Writes
+# =========================================================
+async def save_upload(file, max_bytes: int | None = None) -> Blob:
+    """
+    Streams an UploadFile to disk in CHUNK_BYTES pieces, hashing as the
+    bytes arrive; at most one chunk is held in memory. Raises
+    BlobTooLargeError as soon as max_bytes is exceeded.
+    """
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    tmp = _tmp_path()
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp, "wb") as out:
+            while chunk := await file.read(CHUNK_BYTES):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise BlobTooLargeError(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _commit(tmp, digest.hexdigest(), size)
+
+
+def store_stream(src, max_bytes: int | None = None) -> Blob:
+    """Blocking variant for file-like sources (e.g. ZIP members) on worker threads."""
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    tmp = _tmp_path()
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp, "wb") as out:
+            while chunk := src.read(CHUNK_BYTES):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise BlobTooLargeError(f"File exceeds {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _commit(tmp, digest.hexdigest(), size)
+
+
+# =========================================================
+# Reference counts
+# =========================================================
+def _ref_update(blob: Blob, delta: int) -> tuple:
+    now = datetime.utcnow()
+    return {"_id": blob.sha256}, {
+        "$inc": {"refs": delta},
+        "$set": {"path": blob.path, "size": blob.size, "last_ref_at": now},
+        "$setOnInsert": {"created_at": now},
+    }
+
+
+async def add_refs(blobs: list):
+    """
+    Records new references (one round-trip for any number). Counts are
+    advisory: gc() re-checks the uploads collection before deleting and
+    repairs drifted counts, so a failed update is logged, not raised.
+    """
+    if not blobs:
+        return
+    try:
+        if len(blobs) == 1:
+            await db[REFS].update_one(*_ref_update(blobs[0], 1), upsert=True)
+        else:
+            await db[REFS].bulk_write(
+                [UpdateOne(*_ref_update(b, 1), upsert=True) for b in blobs], ordered=False
+            )
+    except Exception as e:
+        log(f"Blob refcount update failed for {len(blobs)} blobs: {e}")
+
+
+async def add_ref(blob: Blob):
+    await add_refs([blob])
+
+
+async def release(sha256: str):
+    """
+    Drops one reference when an upload record is deleted (or rolled back);
+    the blob itself is removed by gc().
+    """
+    await db[REFS].update_one({"_id": sha256, "refs": {"$gt": 0}}, {"$inc": {"refs": -1}})
+
+
+# =========================================================
+# Garbage collection
+# =========================================================
+def _candidates():
+    """Blobs, legacy uploaded_*.pdf files and temp files, yielded as the directories are walked."""
+    if BLOB_DIR.exists():
+        for p in BLOB_DIR.glob("??/*.pdf"):
+            yield p, p.stem
+        # Tombstones a crashed gc() left behind: restored or removed like blobs
+        for p in BLOB_DIR.glob(f"??/*{TOMBSTONE}"):
+            yield p, p.name.split(".", 1)[0]
+    for p in UPLOAD_ROOT.glob("uploaded_*.pdf"):
+        yield p, None
+    if TMP_DIR.exists():
+        for p in TMP_DIR.glob("*.part"):
+            yield p, None
+
+
+async def _live_references(batch: list) -> tuple:
+    """
+    Refcounts, upload records per content hash and referenced file names,
+    looked up for one batch of candidates only.
+    """
+    shas = [sha for _, sha, _ in batch if sha is not None]
+    names = [p.name for p, sha, _ in batch if sha is None]
+
+    refs = {d["_id"]: d.get("refs", 0) async for d in db[REFS].find({"_id": {"$in": shas}}, {"refs": 1})}
+    by_hash = {
+        d["_id"]: d["n"]
+        async for d in db["uploads"].aggregate([
+            {"$match": {"content_hash": {"$in": shas}}},
+            {"$group": {"_id": "$content_hash", "n": {"$sum": 1}}},
+        ])
+    }
+    files = set()
+    if names:
+        # Legacy records store un-normalized paths, so match on the file name
+        pattern = r"(^|[/\\])(" + "|".join(re.escape(n) for n in names) + ")$"
+        async for d in db["uploads"].find({"path": {"$regex": pattern}}, {"path": 1}):
+            files.add(os.path.basename(d["path"]))
+    return refs, by_hash, files
+
+
+def _restore(tomb: Path, sha: str):
+    """Puts a tombstoned blob back, unless a fresh copy was written meanwhile."""
+    try:
+        os.link(tomb, blob_path(sha))
+    except FileExistsError:
+        pass
+    tomb.unlink(missing_ok=True)
+
+
+async def _reclaim(path: Path, sha: str, cutoff: float) -> bool:
+    """
+    Deletes an orphaned blob without racing a dedup upload of the same
+    bytes. The blob is first renamed to a tombstone, after which _commit()
+    can no longer reuse it (it writes a fresh copy instead). Refcount,
+    uploads and mtime are then read again: a blob that picked up a
+    reference or an os.utime() in between is put back.
+    """
+    tomb = path
+    if path.suffix != TOMBSTONE:
+        tomb = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}{TOMBSTONE}")
+        try:
+            os.replace(path, tomb)
+        except FileNotFoundError:
+            return False
+    try:
+        fresh = tomb.stat().st_mtime > cutoff
+    except FileNotFoundError:
+        return False
+    if (fresh
+            or await db[REFS].count_documents({"_id": sha, "refs": {"$gt": 0}}, limit=1)
+            or await db["uploads"].count_documents({"content_hash": sha}, limit=1)):
+        _restore(tomb, sha)
+        return False
+    tomb.unlink(missing_ok=True)
+    return True
+
+
+async def _collect(batch: list, delete: bool, report: dict, cutoff: float):
+    refs, live_hashes, live_files = await _live_references(batch)
+
+    for path, sha, size in batch:
+        if sha is not None and path.suffix == TOMBSTONE and (refs.get(sha, 0) > 0 or live_hashes.get(sha)):
+            if delete:
+                _restore(path, sha)
+            continue
+        if sha is not None and refs.get(sha, 0) > 0:
+            continue
+        if live_hashes.get(sha) or path.name in live_files:
+            if sha is not None:
+                # Counter drifted (e.g. records written before blob_refs existed)
+                await db[REFS].update_one(
+                    {"_id": sha}, {"$set": {"refs": live_hashes.get(sha, 1)}}, upsert=True
+                )
+                report["recounted"] += 1
+            continue
+
+        if delete and sha is not None and not await _reclaim(path, sha, cutoff):
+            continue   # referenced since the batch was read
+        report["orphans"].append(str(path))
+        report["bytes"] += size
+        if delete:
+            path.unlink(missing_ok=True)
+            if sha is not None:
+                await db[REFS].delete_one({"_id": sha, "refs": {"$lte": 0}})
+                try:
+                    path.parent.rmdir()   # only succeeds once the shard dir is empty
+                except OSError:
+                    pass
+            report["deleted"] += 1
+
+
+async def gc(delete: bool = False, grace_seconds: int = GC_GRACE_SECONDS) -> dict:
+    """
+    Finds blobs with no live references: refs <= 0 or no blob_refs entry,
+    double-checked against the uploads collection. Also covers legacy
+    uploaded_*.pdf files in uploads/ and stale temp files. Files newer than
+    grace_seconds are skipped (an upload may be between write and insert).
+    Candidates are checked GC_BATCH at a time, so memory stays flat however
+    many uploads exist. Only reports unless delete=True; deleted blobs go
+    through a tombstone and a last check first (_reclaim).
+    """
+    cutoff = time.time() - grace_seconds
+    report = {"scanned": 0, "orphans": [], "bytes": 0, "deleted": 0, "recounted": 0}
+
+    batch = []
+    for path, sha in _candidates():
+        report["scanned"] += 1
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime > cutoff:
+            continue
+        batch.append((path, sha, stat.st_size))
+        if len(batch) >= GC_BATCH:
+            await _collect(batch, delete, report, cutoff)
+            batch = []
+    if batch:
+        await _collect(batch, delete, report, cutoff)
+
+    if delete:
+        log(f"Blob GC removed {report['deleted']} files ({report['bytes']} bytes)")
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Content-addressed upload storage")
+    sub = ap.add_subparsers(dest="command", required=True)
+    g = sub.add_parser("gc", help="find (and with --delete remove) unreferenced blobs")
+    g.add_argument("--delete", action="store_true")
+    g.add_argument("--grace-seconds", type=int, default=GC_GRACE_SECONDS)
+    args = ap.parse_args()
+
+    report = asyncio.run(gc(args.delete, args.grace_seconds))
+    for path in report["orphans"]:
+        print(("deleted  " if args.delete else "orphan   ") + path)
+    print(f"\nscanned {report['scanned']}, orphans {len(report['orphans'])} "
+          f"({report['bytes'] / 1024 / 1024:.1f} MB), deleted {report['deleted']}, "
+          f"refcounts repaired {report['recounted']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# backend/services/bulk_upload_service.py
+
+import asyncio
+import json
+import os
+import uuid
+import zipfile
+
+import aiofiles
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from database.mongodb_config import db
+from services import blob_store, job_service, parser_service, s3_service
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+BULK_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", str(job_service.UPLOAD_WORKERS)))
+BULK_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "5000"))
+BULK_WRITE_BATCH = int(os.getenv("BULK_WRITE_BATCH", "200"))
+MAX_ARCHIVE_BYTES = int(os.getenv("BULK_MAX_ARCHIVE_MB", "2048")) * 1024 * 1024
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class TooManyFilesError(Exception):
+    pass
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# =========================================================
+# Staging: PDFs -> blob store, ZIPs -> temp file + member list
+# =========================================================
+def _pdf_members(archive_path: str) -> list:
+    with zipfile.ZipFile(archive_path) as zf:
+        return [
+            info.filename for info in zf.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(".pdf")
+            and not os.path.basename(info.filename).startswith(("._", "."))
+        ]
+
+
+async def _save_archive(file, upload_dir: str) -> str:
+    path = os.path.join(upload_dir, f"bulk_{uuid.uuid4().hex}.zip")
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(blob_store.CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_ARCHIVE_BYTES:
+                    raise blob_store.BlobTooLargeError(
+                        f"Archive exceeds {MAX_ARCHIVE_BYTES // (1024 * 1024)} MB limit"
+                    )
+                await out.write(chunk)
+    except BaseException:
+        _remove(path)
+        raise
+    return path
+
+
+async def stage(files, upload_dir: str) -> tuple:
+    """
+    Stores every request file before the response starts streaming: PDFs go
+    straight to the blob store, ZIP archives to a temp file whose PDF members
+    are stored as they are processed. Returns (items, archives, rejected);
+    archives are deleted once ingestion finishes.
+    """
+    items, archives, rejected = [], [], []
+
+    for file in files:
+        name = file.filename or "upload"
+        head = await file.read(len(ZIP_MAGIC))
+        await file.seek(0)
+
+        try:
+            if head == ZIP_MAGIC or name.lower().endswith(".zip"):
+                path = await _save_archive(file, upload_dir)
+                archives.append(path)
+                members = await asyncio.to_thread(_pdf_members, path)
+                items += [{"filename": m, "archive": path, "member": m} for m in members]
+            elif name.lower().endswith(".pdf") or head.startswith(b"%PDF"):
+                blob = await blob_store.save_upload(file)
+                items.append({"filename": name, "blob": blob})
+            else:
+                rejected.append({"filename": name, "status": "failed", "error": "Not a PDF or ZIP archive"})
+        except (blob_store.BlobTooLargeError, zipfile.BadZipFile) as e:
+            rejected.append({"filename": name, "status": "failed", "error": str(e)})
+
+        if len(items) > BULK_MAX_FILES:
+            cleanup(archives)
+            raise TooManyFilesError(f"At most {BULK_MAX_FILES} PDFs per bulk upload")
+
+    return items, archives, rejected
+
+
+def cleanup(archives: list):
+    """
+    Removes staged archives. Blobs already stored are left for
+    blob_store.gc(): another upload may share them.
+    """
+    for path in archives:
+        _remove(path)
+
+
+def _store_member(zf: zipfile.ZipFile, member: str) -> blob_store.Blob:
+    if zf.getinfo(member).file_size > blob_store.MAX_UPLOAD_BYTES:
+        raise blob_store.BlobTooLargeError("File too large")
+    with zf.open(member) as src:
+        return blob_store.store_stream(src)
+
+
+# =========================================================
+# Ingestion
+# =========================================================
+async def _process(item: dict, bulk_id: str, zips: dict,
+                   sem: asyncio.Semaphore, done: asyncio.Queue):
+    doc = {
+        "_id": ObjectId(),
+        "filename": item["filename"],
+        "bulk_id": bulk_id,
+        "extracted_fields": {},
+    }
+    try:
+        async with sem:
+            blob = item.get("blob")
+            if blob is None:
+                blob = await asyncio.to_thread(_store_member, zips[item["archive"]], item["member"])
+            doc.update(path=blob.path, content_hash=blob.sha256, size=blob.size, blob=blob)
+            parsed = await job_service.run_blocking(
+                parser_service.parse_document, blob.path, content_hash=blob.sha256
+            )
+        doc.update(job_service.parsed_fields(parsed))
+    except Exception as e:
+        doc.update(status="failed", error=str(e))
+    await done.put(doc)
+
+
+def _result(doc: dict) -> dict:
+    return {
+        "filename": doc["filename"],
+        "upload_id": str(doc["_id"]) if doc.get("stored") else None,
+        "status": doc["status"],
+        "document_type": doc.get("document_type"),
+        "error": doc.get("error"),
+    }
+
+
+async def _save_batch(batch: list, bulk_id: str):
+    """
+    One insert_many for the finished records in batch. Only records that
+    were actually written are marked stored, get their blob ref and are
+    queued for S3; the rest are reported failed.
+    """
+    blobs = {d["_id"]: d.pop("blob") for d in batch if "blob" in d}
+    records = [d for d in batch if "path" in d]
+    if not records:
+        return
+
+    errors = {}
+    try:
+        await db["uploads"].insert_many(records, ordered=False)
+    except BulkWriteError as e:
+        # ordered=False: everything not listed in writeErrors was inserted
+        for err in e.details.get("writeErrors", []):
+            errors[err["index"]] = err.get("errmsg", "write error")
+        log(f"Bulk upload {bulk_id}: {len(errors)} of {len(records)} records not saved")
+    except Exception as e:
+        log(f"Bulk upload {bulk_id}: insert_many of {len(records)} failed: {e}")
+        # The outcome is unknown (e.g. connection lost mid-batch): ask Mongo
+        try:
+            written = {d["_id"] async for d in db["uploads"].find(
+                {"_id": {"$in": [r["_id"] for r in records]}}, {"_id": 1})}
+        except Exception:
+            written = set()
+        errors = {i: str(e) for i, r in enumerate(records) if r["_id"] not in written}
+
+    stored = []
+    for i, d in enumerate(records):
+        if i in errors:
+            d.update(status="failed", error=f"Could not save record: {errors[i]}")
+        else:
+            d["stored"] = True
+            stored.append(d)
+    await blob_store.add_refs([blobs[d["_id"]] for d in stored])
+    for d in stored:
+        s3_service.schedule_upload(d["_id"], d["path"], d["content_hash"])
+
+
+async def ingest(items: list, archives: list, rejected: list):
+    """
+    Parses up to BULK_CONCURRENCY files at a time on the upload pool and
+    yields one NDJSON line per file as it finishes, then a summary line.
+
+    Finished records are written with insert_many: whatever has completed
+    since the last write goes out together (group commit), so a busy batch
+    costs a handful of round-trips instead of one per file.
+    """
+    bulk_id = uuid.uuid4().hex
+    sem = asyncio.Semaphore(max(1, BULK_CONCURRENCY))
+    done = asyncio.Queue()
+    zips = {path: zipfile.ZipFile(path) for path in archives if zipfile.is_zipfile(path)}
+    tasks = [
+        asyncio.create_task(_process(item, bulk_id, zips, sem, done))
+        for item in items
+    ]
+    counts = {"parsed": 0, "failed": len(rejected)}
+
+    try:
+        for r in rejected:
+            yield json.dumps(r) + "\n"
+
+        remaining = len(tasks)
+        while remaining:
+            batch = [await done.get()]
+            while len(batch) < BULK_WRITE_BATCH and not done.empty():
+                batch.append(done.get_nowait())
+            remaining -= len(batch)
+
+            await _save_batch(batch, bulk_id)
+
+            for d in batch:
+                counts["parsed" if d["status"] == "parsed" else "failed"] += 1
+                yield json.dumps(_result(d)) + "\n"
+
+        yield json.dumps({"summary": {"bulk_id": bulk_id, "files": len(items) + len(rejected), **counts}}) + "\n"
+        log(f"Bulk upload {bulk_id}: {counts}")
+
+    finally:
+        # Client gone or done: stop outstanding work and drop the archives
+        for task in tasks:
+            task.cancel()
+        for zf in zips.values():
+            zf.close()
+        for path in archives:
+            _remove(path)
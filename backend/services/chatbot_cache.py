@@ -0,0 +1,157 @@
+# backend/services/chatbot_cache.py
+
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+
+from database.mongodb_config import db
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+CACHE_SIZE = int(os.getenv("CHATBOT_CACHE_SIZE", "1000"))
+DEFAULT_TTL = int(os.getenv("CHATBOT_CACHE_TTL", str(24 * 3600)))   # seconds
+LATENCY_SAMPLES = int(os.getenv("CHATBOT_LATENCY_SAMPLES", "2000"))
+
+COLLECTION = "chatbot_logs"
+
+_memory = OrderedDict()   # key -> (response, expires_at epoch)
+_stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "stores": 0}
+_latency = {"hit": deque(maxlen=LATENCY_SAMPLES), "miss": deque(maxlen=LATENCY_SAMPLES)}
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.]+$")
+
+
+# =========================================================
+# Keys
+# =========================================================
+def normalize(query: str) -> str:
+    """
+    "  What is a Knock-in   barrier??" -> "what is a knock-in barrier"
+    """
+    q = unicodedata.normalize("NFKC", query).lower()
+    q = _SPACES.sub(" ", q).strip()
+    return _TRAILING.sub("", q)
+
+
+# =========================================================
+# Get / Set
+# =========================================================
+async def get(query: str):
+    key = normalize(query)
+    now = time.time()
+
+    entry = _memory.get(key)
+    if entry is not None:
+        response, expires_at = entry
+        if expires_at > now:
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return response
+        del _memory[key]
+
+    try:
+        doc = await db[COLLECTION].find_one_and_update(
+            {"normalized_query": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"$inc": {"hits": 1}},
+            projection={"response": 1, "expires_at": 1},
+        )
+    except Exception as e:
+        log(f"Chatbot cache lookup failed: {e}")
+        doc = None
+
+    if doc:
+        _stats["mongo_hits"] += 1
+        ttl_left = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+        _remember(key, doc["response"], now + max(ttl_left, 0))
+        return doc["response"]
+
+    _stats["misses"] += 1
+    return None
+
+
+async def put(query: str, response: str, ttl: int | None = None):
+    key = normalize(query)
+    ttl = DEFAULT_TTL if ttl is None else ttl
+    if ttl <= 0:
+        return
+
+    _stats["stores"] += 1
+    _remember(key, response, time.time() + ttl)
+
+    now = datetime.utcnow()
+    try:
+        await db[COLLECTION].update_one(
+            {"normalized_query": key},
+            {
+                "$set": {
+                    "query": query,
+                    "response": response,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                },
+                "$setOnInsert": {"hits": 0},
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        log(f"Chatbot cache write failed: {e}")
+
+
+def _remember(key: str, response: str, expires_at: float):
+    _memory[key] = (response, expires_at)
+    _memory.move_to_end(key)
+    while len(_memory) > CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+async def purge(query: str | None = None) -> dict:
+    """Drop one normalized query, or everything when query is None."""
+    if query is None:
+        memory = len(_memory)
+        _memory.clear()
+        result = await db[COLLECTION].delete_many({"normalized_query": {"$exists": True}})
+    else:
+        key = normalize(query)
+        memory = 1 if _memory.pop(key, None) else 0
+        result = await db[COLLECTION].delete_many({"normalized_query": key})
+    return {"memory_purged": memory, "stored_purged": result.deleted_count}
+
+
+# =========================================================
+# Stats
+# =========================================================
+def record_latency(ms: float, hit: bool):
+    _latency["hit" if hit else "miss"].append(ms)
+
+
+def _percentile(samples, pct: float):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[idx], 2)
+
+
+def stats() -> dict:
+    hits = _stats["memory_hits"] + _stats["mongo_hits"]
+    lookups = hits + _stats["misses"]
+    every = list(_latency["hit"]) + list(_latency["miss"])
+    return {
+        **_stats,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "memory_entries": len(_memory),
+        "latency_ms": {
+            "p50": _percentile(every, 50),
+            "p99": _percentile(every, 99),
+            "hit_p50": _percentile(_latency["hit"], 50),
+            "hit_p99": _percentile(_latency["hit"], 99),
+            "miss_p50": _percentile(_latency["miss"], 50),
+            "miss_p99": _percentile(_latency["miss"], 99),
+        },
+    }
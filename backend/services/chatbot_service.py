@@ -1,40 +1,49 @@
-import os
-import requests
-from dotenv import load_dotenv
+import time
+from services import chatbot_cache, llm_client
 
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-MODEL_NAME = "gemini-2.5-flash"
-
-GEMINI_URL = (
-    f"https://generativelanguage.googleapis.com/v1/models/"
-    f"{MODEL_NAME}:generateContent?key={GEMINI_API_KEY}"
-)
-
-async def respond(query: str):
+async def respond(query: str, ttl: int | None = None):
     """
     Sends user query to Gemini model and returns generated answer.
+    Repeated (normalized) questions are answered from the cache.
     """
-    try:
-        payload = {
-            "contents": [
-                {"parts": [{"text": query}]}
-            ]
-        }
-
-        headers = {"Content-Type": "application/json"}
-
-        response = requests.post(GEMINI_URL, json=payload, headers=headers)
-
-        if response.status_code != 200:
-            return f"Error: Gemini API Error {response.status_code}: {response.text}"
+    start = time.perf_counter()
 
-        data = response.json()
+    cached = await chatbot_cache.get(query)
+    if cached is not None:
+        chatbot_cache.record_latency((time.perf_counter() - start) * 1000, hit=True)
+        return cached
 
-        answer = data["candidates"][0]["content"]["parts"][0]["text"]
-
-        return answer.strip()
+    try:
+        answer = (await llm_client.generate(query)).strip()
+        await chatbot_cache.put(query, answer, ttl)
+        return answer
 
+    except llm_client.LLMError as e:
+        if e.status_code:
+            return f"Error: Gemini API Error {e.status_code}: {e.body}"
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"Error: {str(e)}"
+    finally:
+        if cached is None:
+            chatbot_cache.record_latency((time.perf_counter() - start) * 1000, hit=False)
+
+
+async def respond_stream(query: str, ttl: int | None = None):
+    """
+    Streams the answer chunk by chunk. A cached answer is sent as a single
+    chunk; a fully streamed answer is cached once it completes.
+    """
+    cached = await chatbot_cache.get(query)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    async for chunk in llm_client.stream(query):
+        parts.append(chunk)
+        yield chunk
+
+    answer = "".join(parts).strip()
+    if answer:
+        await chatbot_cache.put(query, answer, ttl)
@@ -0,0 +1,186 @@
+# backend/services/document_classifier.py
+
+import json
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# =========================================================
+# Config
+# =========================================================
+KEYWORDS_PATH = Path(os.getenv(
+    "CLASSIFIER_KEYWORDS_PATH",
+    Path(__file__).resolve().parents[1] / "schemas" / "classifier_keywords.json",
+))
+
+# Relative gap between the best and second-best score below which the
+# heuristic result is treated as ambiguous and left to Gemini. At 0.0 only
+# documents without any keyword are; exact ties go to the type listed first
+# in classifier_keywords.json, as the old first-match loop did.
+MIN_MARGIN = float(os.getenv("CLASSIFIER_MIN_MARGIN", "0.0"))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_token(tok: str) -> str:
+    # Cheap plural folding so "Loan" also matches "Loans"
+    return tok[:-1] if len(tok) > 3 and tok[-1] == "s" else tok
+
+
+def tokenize(text: str) -> list:
+    return [normalize_token(t) for t in TOKEN_RE.findall(text.lower())]
+
+
+# =========================================================
+# Aho-Corasick automaton over word tokens
+# =========================================================
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is word tokens rather than
+    characters, so multi-word keywords ("Purchase Price") and every
+    category are matched in a single left-to-right pass over the document.
+    """
+
+    def __init__(self, patterns):
+        # patterns: iterable of (token tuple, payload)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for tokens, payload in patterns:
+            state = 0
+            for tok in tokens:
+                nxt = self.goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][tok] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(payload)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and tok not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(tok, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, tokens):
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for tok in tokens:
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            if out[state]:
+                yield from out[state]
+
+    def scan(self, tokens, state: int = 0, on_match=None) -> int:
+        """
+        Like iter_matches, but resumable: starts from `state`, calls
+        on_match(payload) per match and returns the state to resume from.
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        for tok in tokens:
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            for payload in out[state]:
+                on_match(payload)
+        return state
+
+
+# =========================================================
+# Keyword table
+# =========================================================
+def load_keywords(path: Path = KEYWORDS_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_automaton(keywords: dict) -> KeywordAutomaton:
+    patterns = []
+    for doc_type, table in keywords.items():
+        for keyword, weight in table.items():
+            tokens = tuple(tokenize(keyword))
+            if tokens:
+                patterns.append((tokens, (doc_type, keyword, float(weight))))
+    return KeywordAutomaton(patterns)
+
+
+KEYWORDS = load_keywords()
+DOC_TYPES = list(KEYWORDS)
+AUTOMATON = build_automaton(KEYWORDS)
+
+
+# =========================================================
+# Classification
+# =========================================================
+@dataclass
+class Classification:
+    doc_type: str
+    scores: dict
+    margin: float
+    ambiguous: bool
+    matched: dict = field(default_factory=dict)
+
+
+class KeywordScorer:
+    """
+    classify() in pieces: feed() the text in order (e.g. page by page as
+    it is extracted) and call result() at the end. The automaton state
+    carries across feed() calls, so the result equals classify() on the
+    pages joined with "\n".
+    """
+
+    def __init__(self):
+        self.state = 0
+        self.matched = {t: set() for t in DOC_TYPES}
+
+    def _match(self, payload):
+        doc_type, keyword, _ = payload
+        self.matched[doc_type].add(keyword)
+
+    def feed(self, text: str) -> "KeywordScorer":
+        self.state = AUTOMATON.scan(tokenize(text), self.state, self._match)
+        return self
+
+    def result(self, min_margin: float | None = None) -> Classification:
+        min_margin = MIN_MARGIN if min_margin is None else min_margin
+        matched = self.matched
+        scores = {
+            t: round(sum(KEYWORDS[t][k] for k in kws), 4) for t, kws in matched.items()
+        }
+        # Stable sort: equal scores keep keyword-file order
+        ranked = sorted(scores, key=lambda t: scores[t], reverse=True)
+        best = ranked[0] if ranked else "unknown"
+        best_score = scores.get(best, 0)
+        second_score = scores[ranked[1]] if len(ranked) > 1 else 0
+
+        margin = round((best_score - second_score) / best_score, 4) if best_score else 0.0
+        ambiguous = best_score == 0 or margin < min_margin
+
+        return Classification(
+            doc_type=best if best_score else "unknown",
+            scores=scores,
+            margin=margin,
+            ambiguous=ambiguous,
+            matched={t: sorted(k) for t, k in matched.items() if k},
+        )
+
+
+def classify(text: str, min_margin: float | None = None) -> Classification:
+    """
+    Scores every document type over the whole text in one pass. Each
+    keyword counts once (its weight) however often it appears.
+    margin = (best - second) / best, in [0, 1].
+    """
+    return KeywordScorer().feed(text).result(min_margin)
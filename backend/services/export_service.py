@@ -0,0 +1,144 @@
+# backend/services/export_service.py
+#
+# Batch export of validation results straight from a Mongo cursor. Every
+# generator yields as soon as a batch is encoded, so memory stays at one
+# batch however many documents match.
+
+import asyncio
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+
+from database.mongodb_config import db
+from services import report_service
+from utils import query_utils
+
+# =========================================================
+# Config
+# =========================================================
+EXPORT_BATCH_SIZE = query_utils.STREAM_BATCH_SIZE
+ZIP_FLUSH_DOCS = 100
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "zip": ("application/zip", "zip"),
+}
+
+CSV_COLUMNS = ["_id", "upload_id", "document_type", "status", "score",
+               "issue_count", "issues", "summary", "created_at", "version"]
+CSV_PROJECTION = {"validated_fields": 0}
+
+
+def _cursor(query: dict, projection: dict | None = None, limit: int | None = None):
+    cursor = db["validation_results"].find(query, projection).sort("_id", -1).batch_size(EXPORT_BATCH_SIZE)
+    return cursor.limit(limit) if limit else cursor
+
+
+async def _batches(cursor, size: int):
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# =========================================================
+# NDJSON
+# =========================================================
+def stream_ndjson(query: dict, limit: int | None = None):
+    return query_utils.stream_ndjson(db["validation_results"], query, None, limit)
+
+
+# =========================================================
+# CSV
+# =========================================================
+def _csv_row(doc: dict) -> list:
+    doc = query_utils.serialize(doc)
+    issues = doc.get("issues") or []
+    return [
+        doc.get("_id"), doc.get("upload_id"), doc.get("document_type"), doc.get("status"),
+        doc.get("score"), len(issues),
+        " | ".join(i if isinstance(i, str) else json.dumps(i, default=str) for i in issues),
+        doc.get("summary"), doc.get("created_at"), doc.get("version"),
+    ]
+
+
+async def stream_csv(query: dict, limit: int | None = None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+
+    async for batch in _batches(_cursor(query, CSV_PROJECTION, limit), EXPORT_BATCH_SIZE):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(doc) for doc in batch)
+        yield buffer.getvalue()
+
+
+# =========================================================
+# ZIP of per-report JSON
+# =========================================================
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only, unseekable target for ZipFile: members are written with
+    data descriptors and whatever has been written is handed out by drain().
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._offset += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_batch(zf: zipfile.ZipFile, sink: _ChunkSink, batch: list) -> bytes:
+    for doc in batch:
+        body, _ = report_service.render(doc)
+        created = doc.get("created_at") or doc["_id"].generation_time
+        info = zipfile.ZipInfo(report_service.report_name(str(doc["_id"])),
+                               date_time=created.timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        zf.writestr(info, body)
+    return sink.drain()
+
+
+async def stream_zip(query: dict, limit: int | None = None):
+    """One report JSON per validation, compressed off the event loop."""
+    sink = _ChunkSink()
+    zf = zipfile.ZipFile(sink, "w")
+    async for batch in _batches(_cursor(query, None, limit), ZIP_FLUSH_DOCS):
+        yield await asyncio.to_thread(_zip_batch, zf, sink, batch)
+    zf.close()   # central directory
+    yield sink.drain()
+
+
+# =========================================================
+# Entry point
+# =========================================================
+def export(format: str, query: dict, limit: int | None = None) -> tuple:
+    """(async iterator, media type, download filename) for one batch export."""
+    media_type, ext = FORMATS[format]
+    streams = {"ndjson": stream_ndjson, "csv": stream_csv, "zip": stream_zip}
+    filename = f"validations_{datetime.utcnow():%Y%m%d_%H%M%S}.{ext}"
+    return streams[format](query, limit), media_type, filename
@@ -0,0 +1,152 @@
+# backend/services/extraction_cache.py
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from services import schema_registry
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+BASE_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("EXTRACTION_CACHE_DIR", BASE_DIR / "cache" / "extraction"))
+MAX_MEMORY_ENTRIES = int(os.getenv("EXTRACTION_CACHE_SIZE", "256"))
+DISK_ENABLED = os.getenv("EXTRACTION_CACHE_DISK", "1") != "0"
+
+HASH_CHUNK = 1024 * 1024
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+
+# =========================================================
+# Keys
+# =========================================================
+def hash_file(path: str) -> str:
+    """SHA-256 of the file bytes, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def schema_version() -> str:
+    """Short hash of master_schemas.json, recomputed only when the file changes."""
+    return schema_registry.version()
+
+
+def make_key(content_hash: str, parser_version: str, doc_type: str = "unknown") -> str:
+    return f"{content_hash}:{parser_version}:{schema_version()}:{doc_type}"
+
+
+def _disk_path(key: str) -> Path:
+    name = hashlib.sha256(key.encode()).hexdigest()
+    return CACHE_DIR / name[:2] / f"{name}.json"
+
+
+# =========================================================
+# Get / Put
+# =========================================================
+def get(key: str):
+    """
+    Returns a copy of the cached entry ({pages, document_type, fields}) or
+    None, so callers may mutate what they get. Memory tier first, then
+    disk; disk hits are promoted to memory.
+    """
+    return _lookup(key, count=True)
+
+
+def peek(key: str):
+    """
+    get() for lookups outside the upload pipeline (e.g. compare): same
+    result, but the hit/miss counters and the LRU order are left alone, so
+    /api/upload/cache/stats keeps describing uploads only.
+    """
+    return _lookup(key, count=False)
+
+
+def _lookup(key: str, count: bool):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            if count:
+                _memory.move_to_end(key)
+                _stats["memory_hits"] += 1
+            return copy.deepcopy(entry)
+
+    if DISK_ENABLED:
+        path = _disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            log(f"Extraction cache read error ({path}): {e}")
+            entry = None
+
+        if entry is not None:
+            if count:
+                with _lock:
+                    _stats["disk_hits"] += 1
+                    _remember(key, entry)
+            return copy.deepcopy(entry)
+
+    if count:
+        with _lock:
+            _stats["misses"] += 1
+    return None
+
+
+def put(key: str, entry: dict):
+    entry = copy.deepcopy(entry)
+    with _lock:
+        _stats["stores"] += 1
+        _remember(key, entry)
+
+    if DISK_ENABLED:
+        path = _disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp, path)
+        except Exception as e:
+            log(f"Extraction cache write error ({path}): {e}")
+
+
+def _remember(key: str, entry: dict):
+    _memory[key] = entry
+    _memory.move_to_end(key)
+    while len(_memory) > MAX_MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+# =========================================================
+# Stats
+# =========================================================
+def stats() -> dict:
+    with _lock:
+        hits = _stats["memory_hits"] + _stats["disk_hits"]
+        lookups = hits + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(_memory),
+            "memory_capacity": MAX_MEMORY_ENTRIES,
+            "disk_enabled": DISK_ENABLED,
+        }
+
+
+def clear_memory():
+    with _lock:
+        _memory.clear()
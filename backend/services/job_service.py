@@ -0,0 +1,236 @@
+# backend/services/job_service.py
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+
+from bson import ObjectId
+from database.mongodb_config import db
+from services import parser_service, s3_service
+from utils.logger import log
+
+# =========================================================
+# Config (tune to the host's cores)
+# =========================================================
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", str(os.cpu_count() or 2)))
+UPLOAD_POOL = os.getenv("UPLOAD_POOL", "thread").lower()   # "thread" | "process"
+UPLOAD_QUEUE_MAX = int(os.getenv("UPLOAD_QUEUE_MAX", "100"))
+JOB_HISTORY = int(os.getenv("UPLOAD_JOB_HISTORY", "1000"))
+
+STAGES = ["extract_text", "classify", "regex", "ai", "merge", "save"]
+
+_executor = None
+_jobs = {}
+_tasks = set()
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# =========================================================
+# Worker pool
+# =========================================================
+def get_executor():
+    global _executor
+    if _executor is None:
+        if UPLOAD_POOL == "process":
+            _executor = ProcessPoolExecutor(max_workers=UPLOAD_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=UPLOAD_WORKERS, thread_name_prefix="upload-worker"
+            )
+        log(f"Upload pool started: {UPLOAD_POOL} x {UPLOAD_WORKERS}")
+    return _executor
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking callable on the upload pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+async def resume_pending():
+    """Re-queue uploads left queued/processing by a previous run."""
+    cursor = db["uploads"].find(
+        {"status": {"$in": ["queued", "processing"]}},
+        {"path": 1, "filename": 1, "content_hash": 1},
+    )
+    resumed = 0
+    async for upload in cursor:
+        upload_id = str(upload["_id"])
+        if upload_id in _jobs or not upload.get("path"):
+            continue
+        try:
+            create_job(upload_id, upload.get("filename"))
+        except QueueFullError:
+            break
+        submit(upload_id, upload["path"], upload.get("content_hash"))
+        resumed += 1
+    if resumed:
+        log(f"Resumed {resumed} interrupted upload jobs")
+
+
+def shutdown():
+    global _executor
+    for task in list(_tasks):
+        task.cancel()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# =========================================================
+# Job registry
+# =========================================================
+def pending_count() -> int:
+    return sum(1 for j in _jobs.values() if j["state"] in ("queued", "running"))
+
+
+def _prune_finished():
+    finished = [k for k, j in _jobs.items() if j["state"] in ("completed", "failed")]
+    for job_id in finished[: max(0, len(_jobs) - JOB_HISTORY)]:
+        del _jobs[job_id]
+
+
+def create_job(job_id: str, filename: str) -> dict:
+    if pending_count() >= UPLOAD_QUEUE_MAX:
+        raise QueueFullError(f"Upload queue is full ({UPLOAD_QUEUE_MAX} pending jobs)")
+
+    _prune_finished()
+
+    job = {
+        "job_id": job_id,
+        "upload_id": job_id,
+        "filename": filename,
+        "state": "queued",
+        "stages": {s: {"state": "pending"} for s in STAGES},
+        "error": None,
+        "cached": False,
+        "created_at": datetime.utcnow().isoformat(),
+        "started_at": None,
+        "finished_at": None,
+    }
+    _jobs[job_id] = job
+    return job
+
+
+def discard_job(job_id: str):
+    """Forgets a job whose upload was never recorded."""
+    _jobs.pop(job_id, None)
+
+
+def get_job(job_id: str):
+    return _jobs.get(job_id)
+
+
+def pool_stats() -> dict:
+    states = {}
+    for job in _jobs.values():
+        states[job["state"]] = states.get(job["state"], 0) + 1
+    return {
+        "pool": UPLOAD_POOL,
+        "workers": UPLOAD_WORKERS,
+        "queue_max": UPLOAD_QUEUE_MAX,
+        "pending": pending_count(),
+        "jobs": states,
+        "llm_batching": dict(parser_service.COMBINED_BATCHER.stats),
+    }
+
+
+def _stage_callback(job: dict):
+    def on_stage(stage: str, state: str, ms: float | None = None):
+        if job["state"] == "queued":
+            job["state"] = "running"
+            job["started_at"] = datetime.utcnow().isoformat()
+        entry = job["stages"].setdefault(stage, {})
+        entry["state"] = state
+        if ms is not None:
+            entry["ms"] = ms
+    return on_stage
+
+
+def submit(job_id: str, pdf_path: str, content_hash: str | None = None):
+    """Schedule parsing of an already-saved upload; returns immediately."""
+    task = asyncio.create_task(run_upload_job(job_id, pdf_path, content_hash))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+# =========================================================
+# Upload job
+# =========================================================
+def parsed_fields(parsed) -> dict:
+    """Upload-record fields for a finished parse."""
+    extracted = {"error": parsed.error} if parsed.error else parsed.fields
+    if not extracted or "error" in extracted:
+        extracted = {"warning": "No structured fields extracted"}
+    return {
+        "status": "parsed",
+        "document_type": parsed.doc_type,
+        "content_hash": parsed.content_hash,
+        "extracted_fields": extracted,
+    }
+
+
+async def run_upload_job(upload_id: str, pdf_path: str, content_hash: str | None = None):
+    job = _jobs[upload_id]
+
+    try:
+        await db["uploads"].update_one(
+            {"_id": ObjectId(upload_id)}, {"$set": {"status": "processing"}}
+        )
+
+        # Local disk is a cache when S3 offload is on; fetch the PDF back if it is gone
+        if content_hash:
+            pdf_path = await s3_service.ensure_local(pdf_path, s3_service.upload_key(content_hash))
+
+        # Progress callbacks only work in-process; a process pool reports
+        # the stage timings once the result comes back.
+        if UPLOAD_POOL == "process":
+            job["state"] = "running"
+            job["started_at"] = datetime.utcnow().isoformat()
+            parsed = await run_blocking(
+                parser_service.parse_document, pdf_path, content_hash=content_hash
+            )
+        else:
+            parsed = await run_blocking(
+                parser_service.parse_document, pdf_path,
+                content_hash=content_hash, on_stage=_stage_callback(job),
+            )
+
+        for stage, ms in parsed.timings.items():
+            job["stages"].setdefault(stage, {}).update(state="done", ms=ms)
+        job["cached"] = parsed.cache_hit
+
+        job["stages"]["save"]["state"] = "running"
+        await db["uploads"].update_one(
+            {"_id": ObjectId(upload_id)}, {"$set": parsed_fields(parsed)}
+        )
+        job["stages"]["save"]["state"] = "done"
+
+        for entry in job["stages"].values():
+            if entry["state"] == "pending":
+                entry["state"] = "skipped"
+        job["state"] = "completed"
+
+    except asyncio.CancelledError:
+        job["state"] = "failed"
+        job["error"] = "Cancelled during shutdown"
+        raise
+    except Exception as e:
+        log(f"Upload job {upload_id} failed: {e}")
+        job["state"] = "failed"
+        job["error"] = str(e)
+        try:
+            await db["uploads"].update_one(
+                {"_id": ObjectId(upload_id)},
+                {"$set": {"status": "failed", "error": str(e)}},
+            )
+        except Exception:
+            pass
+    finally:
+        job["finished_at"] = datetime.utcnow().isoformat()
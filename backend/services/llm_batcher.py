@@ -0,0 +1,136 @@
+# backend/services/llm_batcher.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+BATCH_ENABLED = os.getenv("LLM_BATCHING", "1") != "0"
+BATCH_MAX = int(os.getenv("LLM_BATCH_MAX", "4"))
+BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "150"))
+# Batches in flight at once; defaults to the upload pool size
+BATCH_IN_FLIGHT = int(os.getenv("LLM_BATCH_IN_FLIGHT", os.getenv("UPLOAD_WORKERS", str(os.cpu_count() or 2))))
+
+
+class _BatchFailed(Exception):
+    pass
+
+
+class MicroBatcher:
+    """
+    Packs concurrent requests into one handler call.
+
+    Callers block on submit(); a background thread collects requests. A
+    request that arrives alone is sent straight away (no added latency).
+    Only when others are already waiting, i.e. the upload queue is busy,
+    does the thread linger up to BATCH_WINDOW_MS to fill a batch of up to
+    BATCH_MAX. handler(items) must return one result per item, in order.
+
+    The collector only forms batches: each one is handed to a pool running
+    at most max_in_flight handler calls, so a slow call doesn't hold up
+    the batches behind it. When a batch of several items fails, every
+    caller retries its own item with fallback(item) on its own thread.
+    """
+
+    def __init__(self, handler, name: str = "llm-batcher",
+                 max_batch: int = BATCH_MAX, window_ms: float = BATCH_WINDOW_MS,
+                 max_in_flight: int = BATCH_IN_FLIGHT, fallback=None):
+        self.handler = handler
+        self.fallback = fallback
+        self.name = name
+        self.max_batch = max(1, max_batch)
+        self.window = window_ms / 1000
+        self.max_in_flight = max(1, max_in_flight)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "calls": 0, "largest_batch": 0}
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight, thread_name_prefix=f"{self.name}-call"
+                )
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        if not BATCH_ENABLED or self.max_batch == 1:
+            self.stats["requests"] += 1
+            self.stats["calls"] += 1
+            return self.handler([item])[0]
+
+        fut = Future()
+        self._queue.put((item, fut))
+        self._ensure_thread()
+        try:
+            return fut.result()
+        except _BatchFailed as e:
+            if self.fallback is None:
+                raise e.__cause__
+            return self.fallback(item)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if len(batch) > 1:
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        return batch
+
+    def _run(self):
+        while True:
+            # Wait for a free slot first: requests arriving meanwhile queue
+            # up and go out together in the next batch
+            self._slots.acquire()
+            batch = self._collect()
+            self.stats["requests"] += len(batch)
+            self.stats["calls"] += 1
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+            try:
+                self._pool.submit(self._dispatch, batch)
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _dispatch(self, batch: list):
+        items = [item for item, _ in batch]
+        try:
+            results = self.handler(items)
+            if len(results) != len(items):
+                raise ValueError(f"handler returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            log(f"{self.name}: batch of {len(items)} failed: {e}")
+            if len(items) > 1:
+                failed, failed.__cause__ = _BatchFailed(str(e)), e
+                e = failed
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
@@ -0,0 +1,207 @@
+# backend/services/llm_client.py
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+env_path = Path(__file__).resolve().parents[1] / ".env"
+load_dotenv(dotenv_path=env_path)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1"
+).rstrip("/")
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") != "0"
+
+_client = None
+_loop = None
+_owner_pid = None
+_sync_client = None
+_sync_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    def __init__(self, message: str, status_code: int | None = None, body: str | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+# =========================================================
+# Lifecycle (started / stopped from FastAPI lifespan)
+# =========================================================
+def _client_kwargs() -> dict:
+    return {
+        "http2": LLM_HTTP2,
+        "timeout": httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+async def start():
+    global _client, _loop, _owner_pid
+    if _client is None:
+        _client = httpx.AsyncClient(**_client_kwargs())
+        _loop = asyncio.get_running_loop()
+        _owner_pid = os.getpid()
+        if not GEMINI_API_KEY:
+            log("⚠️ GEMINI_API_KEY not set; LLM calls will fail")
+        log(f"LLM client started (http2={LLM_HTTP2}, max_connections={LLM_MAX_CONNECTIONS})")
+
+
+async def stop():
+    global _client, _loop, _owner_pid, _sync_client
+    if _client is not None:
+        await _client.aclose()
+    _client = _loop = _owner_pid = None
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    # Outside the app (scripts, tests) the client is started lazily.
+    if _client is None:
+        await start()
+    return _client
+
+
+def _get_sync_client() -> httpx.Client:
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(**_client_kwargs())
+        return _sync_client
+
+
+# =========================================================
+# Requests
+# =========================================================
+def url_for(model: str | None = None, method: str = "generateContent") -> str:
+    return f"{GEMINI_BASE_URL}/models/{model or DEFAULT_MODEL}:{method}"
+
+
+def build_payload(prompt: str) -> dict:
+    return {"contents": [{"parts": [{"text": prompt}]}]}
+
+
+def _auth_headers() -> dict:
+    if not GEMINI_API_KEY:
+        raise LLMError("GEMINI_API_KEY not configured")
+    return {"x-goog-api-key": GEMINI_API_KEY}
+
+
+def parse_text(data: dict) -> str:
+    try:
+        parts = data["candidates"][0]["content"]["parts"]
+    except (KeyError, IndexError, TypeError):
+        raise LLMError("Unexpected Gemini response shape", body=str(data)[:500])
+    return "".join(p.get("text", "") for p in parts)
+
+
+def _check(resp: httpx.Response) -> str:
+    if resp.status_code != 200:
+        raise LLMError(
+            f"Gemini API Error {resp.status_code}",
+            status_code=resp.status_code,
+            body=resp.text,
+        )
+    return parse_text(resp.json())
+
+
+async def generate(prompt: str, model: str | None = None, timeout: float | None = None) -> str:
+    """Single generateContent call on the shared pooled client."""
+    client = await _get_client()
+    resp = await client.post(
+        url_for(model),
+        json=build_payload(prompt),
+        headers=_auth_headers(),
+        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+    )
+    return _check(resp)
+
+
+def generate_sync(prompt: str, model: str | None = None, timeout: float | None = None) -> str:
+    """
+    Blocking variant for code running on worker threads/processes. Inside
+    the app's process the request is handed to the shared async client on
+    the event loop; elsewhere (process pool, scripts) a pooled sync client
+    in this process is used.
+    """
+    if _loop is not None and _owner_pid == os.getpid() and _loop.is_running():
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is _loop:
+            raise RuntimeError("generate_sync() called on the event loop; use await generate()")
+        fut = asyncio.run_coroutine_threadsafe(generate(prompt, model, timeout), _loop)
+        return fut.result()
+
+    resp = _get_sync_client().post(
+        url_for(model),
+        json=build_payload(prompt),
+        headers=_auth_headers(),
+        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+    )
+    return _check(resp)
+
+
+async def stream(prompt: str, model: str | None = None):
+    """
+    Yields text chunks from streamGenerateContent (SSE) as they arrive.
+    Closing the generator early (client gone) closes the upstream
+    response, which cancels generation on Gemini's side.
+    """
+    client = await _get_client()
+    async with client.stream(
+        "POST",
+        url_for(model, "streamGenerateContent"),
+        params={"alt": "sse"},
+        json=build_payload(prompt),
+        headers=_auth_headers(),
+    ) as resp:
+        if resp.status_code != 200:
+            body = (await resp.aread()).decode("utf-8", "replace")
+            raise LLMError(
+                f"Gemini API Error {resp.status_code}",
+                status_code=resp.status_code,
+                body=body,
+            )
+
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if not payload or payload == "[DONE]":
+                continue
+            try:
+                text = parse_text(json.loads(payload))
+            except (LLMError, ValueError):
+                # e.g. a final chunk carrying only finishReason/usage
+                continue
+            if text:
+                yield text
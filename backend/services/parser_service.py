@@ -1,25 +1,22 @@
 # backend/services/parser_service.py
 
-import fitz  # PyMuPDF
-import os
 import json
 import re
-from dotenv import load_dotenv
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-import google.generativeai as genai
 from datetime import datetime
+from services import document_classifier, extraction_cache, llm_batcher, llm_client, schema_registry
+from utils import field_scanner, pdf_utils
 
 # =========================================================
-# 1️⃣ Load Environment & Gemini key
+# 1️⃣ Gemini model (calls go through the shared llm_client)
 # =========================================================
-env_path = Path(__file__).resolve().parents[1] / ".env"
-load_dotenv(dotenv_path=env_path)
+PARSER_MODEL = "gemini-1.5-flash"
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("❌ GEMINI_API_KEY not found in .env file")
-
-genai.configure(api_key=GEMINI_API_KEY)
+# Bump whenever extraction/classification logic changes so cached
+# results from older parser builds are not reused.
+PARSER_VERSION = "5"
 
 # =========================================================
 # Logging
@@ -34,59 +31,95 @@ def log_to_file(message: str):
 
 
 # =========================================================
-# 2️⃣ PDF TEXT EXTRACTION
+# 2️⃣ PARSED DOCUMENT (built once per upload)
 # =========================================================
-def extract_text_from_pdf(pdf_path: str) -> str:
-    try:
-        text = ""
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            text += page.get_text("text") + "\n"
-        doc.close()
-
-        cleaned = text.strip()
-        log_to_file(f"Extracted {len(cleaned)} chars from PDF: {pdf_path}")
-        return cleaned
-    except Exception as e:
-        log_to_file(f"PDF extraction error: {e}")
-        return ""
+@dataclass
+class ParsedDocument:
+    """
+    Everything the pipeline learns about one PDF. The file is opened and
+    read exactly once; classification, regex/AI extraction and merge all
+    work off this object.
+    """
+    path: str
+    pages: list = field(default_factory=list)
+    doc_type: str = "unknown"
+    fields: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    error: str | None = None
+    content_hash: str | None = None
+    cache_hit: bool = False
+    llm_failed: bool = False     # a Gemini call failed; the result is not cached
+    heuristic: object = field(default=None, repr=False, compare=False)   # Classification, if scored while loading
+    on_stage: object = field(default=None, repr=False, compare=False)
+    _text: str | None = field(default=None, repr=False)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = pdf_utils.join_pages(self.pages)
+        return self._text
+
+    def timed(self, stage: str, fn, *args, **kwargs):
+        if self.on_stage:
+            self.on_stage(stage, "running")
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.timings[stage] = round((time.perf_counter() - start) * 1000, 2)
+            if self.on_stage:
+                self.on_stage(stage, "done", self.timings[stage])
 
 
 # =========================================================
-# 3️⃣ DOCUMENT CLASSIFICATION
+# 3️⃣ PDF TEXT EXTRACTION
 # =========================================================
-HEURISTICS = {
-    "structured_note": [
-        "ISIN", "Autocall", "Knock-in", "Barrier", "Underlying",
-        "Calculation Amount", "Reference Index", "Strike Level"
-    ],
-    "startup_equity": [
-        "Pre-Money", "Post-Money", "Equity", "SAFE", "Investment Amount",
-        "Valuation", "Cap Table"
-    ],
-    "venture_debt": ["Warrants", "Loan", "Borrower", "Covenants"],
-    "bank_loan": ["Facility", "Interest Rate", "Borrower"],
-    "m_and_a": ["Buyer", "Seller", "Purchase Price"],
-    "real_estate": ["Property", "Lease", "Possession"],
-}
-
-def classify_doc(text: str) -> str:
+def _read_pages(pdf_path: str, scorer=None) -> list:
+    pages = []
+    for _, text in pdf_utils.iter_pages(pdf_path):
+        pages.append(text)
+        if scorer is not None:
+            scorer.feed(text)
+    return pages
+
+
+def load_document(pdf_path: str, on_stage=None, classify: bool = False) -> ParsedDocument:
+    """
+    Reads every page once. With classify=True the keyword classifier scores
+    each page as pdf_utils.iter_pages hands it over, so it works through
+    the first pages while later shards are still being extracted.
+    """
+    parsed = ParsedDocument(path=pdf_path, on_stage=on_stage)
+    scorer = document_classifier.KeywordScorer() if classify else None
     try:
-        snippet = text[:10000]
-        scores = {t: 0 for t in HEURISTICS}
+        parsed.pages = parsed.timed("extract_text", _read_pages, pdf_path, scorer)
+        if scorer is not None:
+            parsed.heuristic = scorer.result()
+        log_to_file(f"Extracted {len(parsed.text)} chars from PDF: {pdf_path}")
+    except Exception as e:
+        parsed.error = f"PDF extraction error: {e}"
+        log_to_file(parsed.error)
+    return parsed
 
-        for doc_type, patterns in HEURISTICS.items():
-            for p in patterns:
-                if p.lower() in snippet.lower():
-                    scores[doc_type] += 1
 
-        best = max(scores, key=lambda x: scores[x])
-        if scores[best] > 0:
-            log_to_file(f"Document classified (heuristic): {best}")
-            return best
+def extract_text_from_pdf(pdf_path: str) -> str:
+    return load_document(pdf_path).text
 
-        # AI FALLBACK
-        model = genai.GenerativeModel("gemini-1.5-flash")
+
+# =========================================================
+# 4️⃣ DOCUMENT CLASSIFICATION
+# =========================================================
+def classify_doc(text: str) -> str:
+    heuristic = document_classifier.classify(text)
+    try:
+        if not heuristic.ambiguous:
+            log_to_file(
+                f"Document classified (heuristic): {heuristic.doc_type} "
+                f"margin={heuristic.margin} scores={heuristic.scores}"
+            )
+            return heuristic.doc_type
+
+        # AI FALLBACK (no keywords, or a margin below CLASSIFIER_MIN_MARGIN)
         prompt = f"""
 Classify the following term sheet into exactly ONE category:
 startup_equity, structured_note, bank_loan, venture_debt, m_and_a, real_estate, unknown.
@@ -94,83 +127,68 @@ startup_equity, structured_note, bank_loan, venture_debt, m_and_a, real_estate,
 Return ONLY the category.
 
 TEXT:
-{snippet[:6000]}
+{text[:6000]}
 """
 
-        resp = model.generate_content(prompt)
-        text_out = resp.text.strip().lower().replace(" ", "_")
+        resp = llm_client.generate_sync(prompt, model=PARSER_MODEL)
+        text_out = resp.strip().lower().replace(" ", "_")
 
-        if text_out in HEURISTICS or text_out == "unknown":
+        if text_out in document_classifier.DOC_TYPES or text_out == "unknown":
             log_to_file(f"Document classified (AI): {text_out}")
             return text_out
 
-        return "unknown"
+        return heuristic.doc_type
 
     except Exception as e:
         log_to_file(f"Doc classify error: {e}")
-        return "unknown"
+        return heuristic.doc_type
 
 
 # =========================================================
-# 4️⃣ REGEX EXTRACTION
+# 5️⃣ REGEX EXTRACTION
 # =========================================================
 def extract_regex(text: str, doc_type: str) -> dict:
-    extracted = {}
-
-    patterns = {
-        # universal
-        "Company Name": [r"Company Name[:\s-]+(.+)"],
-        "Investor": [r"Investor[:\s-]+(.+)"],
-        "Investment Amount": [r"Investment Amount[:\s-]+(.+)"],
-        "Valuation (Pre-Money)": [r"Pre[- ]?Money[:\s-]+(.+)"],
-        "Valuation (Post-Money)": [r"Post[- ]?Money[:\s-]+(.+)"],
-        "Equity to be Issued": [r"Equity[:\s-]+(.+)"],
-
-        # structured notes
-        "Issuer": [r"Issuer[:\s-]+(.+)"],
-        "ISIN": [r"ISIN[:\s-]+([A-Z0-9]+)"],
-        "Issue Date": [r"Issue Date[:\s-]+(.+)"],
-        "Redemption Date": [r"Redemption Date[:\s-]+(.+)"],
-        "Underlying Asset": [r"Underlying[:\s-]+(.+)"],
-        "Strike Level": [r"Strike[:\s-]+(.+)"],
-        "Autocall Barrier": [r"Autocall[:\s-]+(.+)"],
-        "Knock-in Barrier": [r"Knock[- ]?in[:\s-]+(.+)"],
-        "Calculation Amount": [r"Calculation Amount[:\s-]+(.+)"],
-        "Coupon Rate": [r"Coupon[:\s-]+(.+)"],
-    }
-
-    for key, regs in patterns.items():
-        for reg in regs:
-            m = re.search(reg, text, re.I)
-            if m:
-                extracted[key] = m.group(1).strip()
-                break
+    extracted = field_scanner.scan_labeled(text)
 
     log_to_file(f"Regex extracted fields: {list(extracted.keys())}")
     return extracted
 
 
 # =========================================================
-# 5️⃣ AI EXTRACTION (schema based)
+# 6️⃣ AI EXTRACTION (schema based)
 # =========================================================
-def extract_ai(text: str, doc_type: str) -> dict:
+AI_FIELDS = {
+    "structured_note": [
+        "Issuer", "ISIN", "Issue Date", "Redemption Date",
+        "Underlying Asset", "Strike Level", "Autocall Barrier",
+        "Knock-in Barrier", "Calculation Amount", "Coupon Rate"
+    ],
+    "startup_equity": [
+        "Company Name", "Investor", "Investment Amount",
+        "Valuation (Pre-Money)", "Valuation (Post-Money)",
+        "Equity to be Issued"
+    ]
+}
+
+
+def parse_json_reply(raw: str, pattern: str = r"\{[\s\S]*\}"):
+    raw = raw.strip().replace("```json", "").replace("```", "")
+    match = re.search(pattern, raw)
+    return json.loads(match.group(0)) if match else None
+
+
+def clean_ai_fields(data) -> dict:
+    if not isinstance(data, dict):
+        return {}
+    return {k: v for k, v in data.items() if v not in ["", None, "null"]}
+
+
+def extract_ai(text: str, doc_type: str) -> dict | None:
+    """Fields from Gemini, or None when the call failed."""
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
-        schemas = {
-            "structured_note": [
-                "Issuer", "ISIN", "Issue Date", "Redemption Date",
-                "Underlying Asset", "Strike Level", "Autocall Barrier",
-                "Knock-in Barrier", "Calculation Amount", "Coupon Rate"
-            ],
-            "startup_equity": [
-                "Company Name", "Investor", "Investment Amount",
-                "Valuation (Pre-Money)", "Valuation (Post-Money)",
-                "Equity to be Issued"
-            ]
-        }
-
-        target_fields = schemas.get(doc_type, schemas["startup_equity"] + schemas["structured_note"])
+        target_fields = AI_FIELDS.get(
+            doc_type, AI_FIELDS["startup_equity"] + AI_FIELDS["structured_note"]
+        )
 
         prompt = f"""
 Extract the following fields from the term sheet.
@@ -184,23 +202,120 @@ Text:
 {text[:6000]}
 """
 
-        resp = model.generate_content(prompt)
-        raw = resp.text.strip()
-        raw = raw.replace("```json", "").replace("```", "")
+        resp = llm_client.generate_sync(prompt, model=PARSER_MODEL)
+        return clean_ai_fields(parse_json_reply(resp) or {})
+
+    except Exception as e:
+        log_to_file(f"AI extraction error: {e}")
+        return None
 
-        match = re.search(r"\{[\s\S]*\}", raw)
-        data = json.loads(match.group(0)) if match else {}
 
-        clean = {k: v for k, v in data.items() if v not in ["", None, "null"]}
-        return clean
+# =========================================================
+# 6️⃣b COMBINED CLASSIFY + EXTRACT (one round-trip, batchable)
+# =========================================================
+def _fields_for(doc_type: str) -> list:
+    if doc_type in AI_FIELDS:
+        return AI_FIELDS[doc_type]
+    schema = schema_registry.raw_schemas().get(doc_type, {})
+    return schema.get("required_fields", []) + schema.get("optional_fields", [])
 
+
+_instructions = {"version": None, "text": None}
+
+
+def combined_instructions() -> str:
+    """Prompt header listing each category's fields; rebuilt when the schemas change."""
+    version = schema_registry.version()
+    if _instructions["version"] != version:
+        type_fields = "\n".join(
+            f"- {t}: {_fields_for(t)}" for t in document_classifier.DOC_TYPES
+        )
+        _instructions.update(version=version, text=f"""
+Classify the term sheet into exactly ONE category:
+startup_equity, structured_note, bank_loan, venture_debt, m_and_a, real_estate, unknown.
+Then extract the fields listed for that category (for unknown, extract any of them).
+Missing fields must be null.
+
+Fields per category:
+{type_fields}
+""")
+    return _instructions["text"]
+
+
+def _normalize_combined(item) -> tuple:
+    # (None, None) = no usable reply; run_pipeline falls back to extract_ai
+    if not isinstance(item, dict):
+        return None, None
+    doc_type = str(item.get("document_type", "unknown")).strip().lower().replace(" ", "_")
+    if doc_type not in document_classifier.DOC_TYPES:
+        doc_type = "unknown"
+    return doc_type, clean_ai_fields(item.get("fields"))
+
+
+def _combined_single(text: str) -> tuple:
+    prompt = f"""{combined_instructions()}
+Return ONLY strict JSON:
+{{"document_type": "<category>", "fields": {{"<field>": "<value or null>"}}}}
+
+Text:
+{text}
+"""
+    resp = llm_client.generate_sync(prompt, model=PARSER_MODEL)
+    return _normalize_combined(parse_json_reply(resp))
+
+
+def classify_and_extract_batch(texts: list) -> list:
+    """
+    One Gemini call for one or more documents. Returns [(doc_type, fields)]
+    in input order. Raises when a batch reply cannot be matched up; the
+    batcher then retries each document on its caller's thread.
+    """
+    if len(texts) == 1:
+        return [_combined_single(texts[0])]
+
+    docs = "\n\n".join(
+        f"=== DOCUMENT {i} ===\n{t}" for i, t in enumerate(texts, start=1)
+    )
+    prompt = f"""{combined_instructions()}
+There are {len(texts)} separate documents below. Handle each one independently.
+Return ONLY a strict JSON array with one object per document:
+[{{"id": <document number>, "document_type": "<category>", "fields": {{"<field>": "<value or null>"}}}}]
+
+{docs}
+"""
+    try:
+        resp = llm_client.generate_sync(prompt, model=PARSER_MODEL)
+        data = parse_json_reply(resp, r"\[[\s\S]*\]") or []
+        by_id = {int(d.get("id")): d for d in data if isinstance(d, dict) and "id" in d}
+        if set(by_id) != set(range(1, len(texts) + 1)):
+            raise ValueError(f"batch reply covered ids {sorted(by_id)}")
+        return [_normalize_combined(by_id[i]) for i in range(1, len(texts) + 1)]
     except Exception as e:
-        log_to_file(f"AI extraction error: {e}")
-        return {}
+        log_to_file(f"Batched classify+extract failed ({e}); retrying per document")
+        raise
+
+
+COMBINED_BATCHER = llm_batcher.MicroBatcher(
+    classify_and_extract_batch, name="combined-llm", fallback=_combined_single
+)
+
+
+def classify_and_extract(text: str) -> tuple:
+    """(doc_type, fields), or (None, None) when the combined call failed."""
+    try:
+        doc_type, fields = COMBINED_BATCHER.submit(text[:6000])
+    except Exception as e:
+        log_to_file(f"Combined classify+extract error: {e}")
+        return None, None
+    if fields is None:
+        log_to_file("Combined classify+extract returned no usable JSON")
+        return None, None
+    log_to_file(f"Document classified+extracted (AI): {doc_type}, fields={list(fields)}")
+    return doc_type, fields
 
 
 # =========================================================
-# 6️⃣ MERGE LOGIC
+# 7️⃣ MERGE LOGIC
 # =========================================================
 def merge_fields(regex_fields: dict, ai_fields: dict) -> dict:
     merged = dict(regex_fields)
@@ -211,40 +326,134 @@ def merge_fields(regex_fields: dict, ai_fields: dict) -> dict:
 
 
 # =========================================================
-# 7️⃣ MAIN EXTRACTION (SAFE SIGNATURE)
+# 8️⃣ SINGLE-PASS PIPELINE
 # =========================================================
-def extract_fields(pdf_path: str, doc_type: str = "unknown") -> dict:
-    try:
-        raw_text = extract_text_from_pdf(pdf_path)
-        if not raw_text:
-            return {"error": "No text extracted"}
+def _heuristic(parsed: ParsedDocument):
+    # Already scored page by page in load_document(classify=True)?
+    return parsed.heuristic or document_classifier.classify(parsed.text)
+
+
+def run_pipeline(parsed: ParsedDocument, doc_type: str = "unknown") -> ParsedDocument:
+    """
+    Classify (only if the type is not already known), then regex + AI
+    extraction and merge, all on the already-extracted text. When the
+    keyword heuristic is ambiguous, type and AI fields come from one
+    combined LLM call instead of a classify call plus an extract call.
+    """
+    if parsed.error:
+        return parsed
+    if not parsed.text:
+        parsed.error = "No text extracted"
+        return parsed
 
+    try:
+        ai_fields = None
         if doc_type == "unknown":
-            doc_type = classify_doc(raw_text)
-
-        regex_fields = extract_regex(raw_text, doc_type)
-
-        need_ai = doc_type == "structured_note" or len(regex_fields) < 5
-        ai_fields = extract_ai(raw_text, doc_type) if need_ai else {}
+            heuristic = parsed.timed("classify", _heuristic, parsed)
+            if heuristic.ambiguous:
+                # Type and fields from a single (possibly batched) LLM call;
+                # if it fails, the heuristic type and extract_ai below stand in
+                doc_type, ai_fields = parsed.timed("ai", classify_and_extract, parsed.text)
+                if ai_fields is None:
+                    parsed.llm_failed = True
+                if doc_type in (None, "unknown"):
+                    doc_type = heuristic.doc_type
+            else:
+                doc_type = heuristic.doc_type
+                log_to_file(
+                    f"Document classified (heuristic): {doc_type} "
+                    f"margin={heuristic.margin} scores={heuristic.scores}"
+                )
+        parsed.doc_type = doc_type
+
+        regex_fields = parsed.timed("regex", extract_regex, parsed.text, doc_type)
+
+        if ai_fields is None:
+            need_ai = doc_type == "structured_note" or len(regex_fields) < 5
+            ai_fields = parsed.timed("ai", extract_ai, parsed.text, doc_type) if need_ai else {}
+            if ai_fields is None:
+                parsed.llm_failed = True
+                ai_fields = {}
+
+        parsed.fields = parsed.timed("merge", merge_fields, regex_fields, ai_fields)
+    except Exception as e:
+        parsed.error = str(e)
+
+    log_to_file(f"Pipeline timings for {parsed.path}: {parsed.timings}")
+    return parsed
+
+
+def parse_document(
+    pdf_path: str,
+    doc_type: str = "unknown",
+    content_hash: str | None = None,
+    use_cache: bool = True,
+    on_stage=None,
+) -> ParsedDocument:
+    """
+    Full pipeline with a content-addressed cache in front of it: a PDF whose
+    bytes were parsed before (same parser + schema version) is served from
+    the cache without touching PyMuPDF or Gemini. Results that hit an
+    error or a failed Gemini call are not cached.
+
+    on_stage(stage, state, ms=None) is called as each stage starts/finishes.
+    """
+    if not use_cache:
+        return run_pipeline(load_document(pdf_path, on_stage, doc_type == "unknown"), doc_type)
+
+    start = time.perf_counter()
+    try:
+        content_hash = content_hash or extraction_cache.hash_file(pdf_path)
+    except Exception as e:
+        log_to_file(f"Could not hash {pdf_path}: {e}")
+        return run_pipeline(load_document(pdf_path, on_stage, doc_type == "unknown"), doc_type)
+
+    key = extraction_cache.make_key(content_hash, PARSER_VERSION, doc_type)
+    entry = extraction_cache.get(key)
+    if entry is not None:
+        parsed = ParsedDocument(
+            path=pdf_path,
+            pages=entry["pages"],
+            doc_type=entry["document_type"],
+            fields=entry["fields"],
+            content_hash=content_hash,
+            cache_hit=True,
+        )
+        parsed.timings["cache"] = round((time.perf_counter() - start) * 1000, 2)
+        log_to_file(f"Extraction cache hit for {pdf_path} ({content_hash[:12]})")
+        return parsed
+
+    parsed = run_pipeline(load_document(pdf_path, on_stage, doc_type == "unknown"), doc_type)
+    parsed.content_hash = content_hash
+    if parsed.llm_failed:
+        log_to_file(f"Not caching {pdf_path}: Gemini call failed")
+    elif not parsed.error:
+        extraction_cache.put(key, {
+            "pages": parsed.pages,
+            "document_type": parsed.doc_type,
+            "fields": parsed.fields,
+        })
+    return parsed
 
-        final = merge_fields(regex_fields, ai_fields)
-        return final
 
-    except Exception as e:
-        return {"error": str(e)}
+# =========================================================
+# 9️⃣ MAIN EXTRACTION (SAFE SIGNATURE)
+# =========================================================
+def extract_fields(pdf_path: str, doc_type: str = "unknown") -> dict:
+    parsed = parse_document(pdf_path, doc_type)
+    if parsed.error:
+        return {"error": parsed.error}
+    return parsed.fields
 
 
 # =========================================================
-# 8️⃣ WRAPPER (used in upload route)
+# 🔟 WRAPPER (used in upload route)
 # =========================================================
 def extract_fields_with_type(pdf_path: str) -> dict:
-    raw_text = extract_text_from_pdf(pdf_path)
-
-    doc_type = classify_doc(raw_text)
-    fields = extract_fields(pdf_path, doc_type)
+    parsed = parse_document(pdf_path)
 
     return {
-        "document_type": doc_type,
-        "raw_text": raw_text,
-        "extracted_fields": fields
+        "document_type": parsed.doc_type,
+        "raw_text": parsed.text,
+        "extracted_fields": {"error": parsed.error} if parsed.error else parsed.fields
     }
@@ -1,55 +1,167 @@
 # backend/services/report_service.py
+#
+# Reports are regenerated only when their validation result changes. Each
+# validation document carries a `version` (1 on insert; anything that
+# modifies a result must $inc it), and the reports collection remembers
+# which version and content hash (the ETag) the file on disk holds.
 
-from database.mongodb_config import db
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import aiofiles
 from bson import ObjectId
-import json, os
+
+from database.mongodb_config import db
+from services import s3_service
 from utils.logger import log
 
+# =========================================================
+# Config
+# =========================================================
+REPORTS_DIR = Path(__file__).resolve().parents[1] / "reports"   # what main.py mounts at /reports
+REPORTS = "reports"
+
+# Set on validation results by other services; not part of the report
+EXCLUDED_FIELDS = ("report_s3_url", "report_s3_key", "replicated_at", "s3_error")
+
+
+def report_path(validation_id: str) -> Path:
+    return REPORTS_DIR / f"{validation_id}.json"
+
+
+def report_name(validation_id: str) -> str:
+    return f"{validation_id}.json"
+
+
+def render(result: dict) -> tuple:
+    """Report bytes and their ETag (quoted SHA-256 prefix)."""
+    report_data = {k: v for k, v in result.items() if k not in EXCLUDED_FIELDS}
+    report_data["_id"] = str(report_data["_id"])
+    if "upload_id" in report_data:
+        report_data["upload_id"] = str(report_data["upload_id"])
+    body = json.dumps(report_data, indent=4, default=str).encode("utf-8")
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+async def _write_atomic(path: Path, body: bytes):
+    """
+    Writes to a temp file next to the target, then renames over it. The
+    temp name is unique per call, so overlapping writes of the same report
+    never share a file; the last rename wins with a complete body.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        async with aiofiles.open(tmp, "wb") as f:
+            await f.write(body)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _link(validation_id: str) -> str:
+    return f"/reports/{report_name(validation_id)}"
+
+
+# =========================================================
+# Generate
+# =========================================================
 async def generate_report(validation_id: str):
     try:
-        log(f"Generating report for validation_id: {validation_id}")
-        
-        # Convert string → ObjectId
         try:
             oid = ObjectId(validation_id)
         except Exception as e:
             log(f"Invalid validation_id format: {validation_id} - {str(e)}")
             return {"error": "Invalid validation_id format", "status": 400}
 
-        # Fetch the validation result
-        result = await db["validation_results"].find_one({"_id": oid})
-        
+        result, meta = await asyncio.gather(
+            db["validation_results"].find_one({"_id": oid}),
+            db[REPORTS].find_one({"_id": oid}),
+        )
         if not result:
-            log(f"Validation not found for ID: {validation_id}. Checking database...")
-            # Debug: check what's in the database
-            all_validations = await db["validation_results"].find({}).to_list(length=5)
-            log(f"Database contains {len(all_validations)} validations")
-            for v in all_validations:
-                log(f"  - ID: {v.get('_id')}")
+            log(f"Validation not found for ID: {validation_id}")
             return {"error": "Validation not found", "status": 404}
 
-        # Make sure reports/ folder exists
-        os.makedirs("reports", exist_ok=True)
-
-        # Save JSON report
-        report_path = f"reports/{validation_id}.json"
-        
-        # Create a copy to avoid modifying original
-        report_data = dict(result)
-        
-        # Convert ObjectId to string for JSON serialization
-        if "_id" in report_data:
-            report_data["_id"] = str(report_data["_id"])
-        if "upload_id" in report_data:
-            report_data["upload_id"] = str(report_data["upload_id"])
-            
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report_data, f, indent=4, default=str)
-
-        log(f"Report generated successfully for validation_id: {validation_id}")
-        # Return path the frontend can access
-        return {"success": True, "report_link": f"/reports/{validation_id}.json", "status": 200}
+        path = report_path(validation_id)
+        version = result.get("version")
+        on_disk = path.exists()
+
+        # Same version as the file on disk: nothing to do
+        if meta and on_disk and version is not None and meta.get("version") == version:
+            return {"success": True, "report_link": _link(validation_id), "etag": meta["etag"],
+                    "version": version, "regenerated": False, "status": 200}
+
+        # Otherwise compare content (covers results written before versioning)
+        body, etag = await asyncio.to_thread(render, result)
+        regenerated = not (meta and on_disk and meta.get("etag") == etag)
+        if regenerated:
+            await _write_atomic(path, body)
+
+        await db[REPORTS].update_one(
+            {"_id": oid},
+            {"$set": {
+                "validation_id": validation_id,
+                "version": version,
+                "etag": etag,
+                "size": len(body),
+                "path": str(path),
+                "generated_at": datetime.utcnow() if regenerated else meta.get("generated_at"),
+            }},
+            upsert=True,
+        )
+
+        if regenerated:
+            log(f"Report generated for validation_id: {validation_id} (version {version})")
+            s3_service.schedule(
+                "validation_results", oid, str(path),
+                s3_service.report_key(report_name(validation_id)),
+                content_type="application/json", field="report_s3_url",
+            )
+        return {"success": True, "report_link": _link(validation_id), "etag": etag,
+                "version": version, "regenerated": regenerated, "status": 200}
 
     except Exception as e:
         log(f"Error generating report: {str(e)}")
         return {"error": f"Error generating report: {str(e)}", "status": 500}
+
+
+# =========================================================
+# Serve
+# =========================================================
+def _hash_file(path: Path) -> str:
+    return f'"{hashlib.sha256(path.read_bytes()).hexdigest()[:32]}"'
+
+
+async def get_report(validation_id: str):
+    """
+    (path, etag) of a generated report, or None. Missing local files are
+    read back from S3 when offload is on; reports written before metadata
+    was kept get their ETag computed once and stored.
+    """
+    try:
+        oid = ObjectId(validation_id)
+    except Exception:
+        return None
+
+    path = report_path(validation_id)
+    await s3_service.ensure_local(str(path), s3_service.report_key(report_name(validation_id)))
+    if not path.exists():
+        return None
+
+    meta = await db[REPORTS].find_one({"_id": oid}, {"etag": 1})
+    if meta and meta.get("etag"):
+        return path, meta["etag"]
+
+    etag = await asyncio.to_thread(_hash_file, path)
+    await db[REPORTS].update_one(
+        {"_id": oid},
+        {"$set": {"validation_id": validation_id, "etag": etag, "path": str(path)}},
+        upsert=True,
+    )
+    return path, etag
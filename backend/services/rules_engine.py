@@ -0,0 +1,379 @@
+# backend/services/rules_engine.py
+#
+# Deterministic checks declared per document type in
+# schemas/validation_rules.json ("*" applies to every type). Each rule
+# passes, fails, is skipped (its fields were not extracted) or is left
+# undecided when a value cannot be parsed with confidence; only undecided
+# rules are sent on to Gemini by validator_service. Types with no rules of
+# their own ("*" only) still get Gemini's whole-document check.
+#
+# Rule types:
+#   isin              field                        ISIN format + check digit
+#   date              field                        parses as a calendar date
+#   date_order        before, after                before < after
+#   sum               terms[], total, tolerance    sum(terms) ≈ total (relative)
+#   ratio_percent     numerator, denominator,      numerator / denominator ≈ field %
+#                     field, tolerance_points
+#   percentage_range  field, min, max              min <= field % <= max
+#   positive_amount   field                        amount > 0
+#   not_greater       field, limit                 field <= limit
+
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache, partial
+from pathlib import Path
+
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+RULES_PATH = Path(__file__).resolve().parents[1] / "schemas" / "validation_rules.json"
+ALL_TYPES = "*"
+# Part of every rules version: bump when a check's semantics change so
+# memoized deep-check outcomes (validator_service.fingerprint) expire
+ENGINE_REVISION = 2
+
+PASS, FAIL, UNDECIDED, SKIP = "pass", "fail", "undecided", "skip"
+
+
+# =========================================================
+# Value parsing
+# =========================================================
+MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "lakh": 1e5, "lakhs": 1e5, "lac": 1e5,
+    "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+    "crore": 1e7, "crores": 1e7, "cr": 1e7,
+    "b": 1e9, "bn": 1e9, "billion": 1e9,
+}
+_AMOUNT = re.compile(
+    r"(-?\d[\d,]*(?:\.\d+)?)\s*(" + "|".join(sorted(MULTIPLIERS, key=len, reverse=True)) + r")?\b",
+    re.IGNORECASE,
+)
+_PERCENT = re.compile(r"(-?\d+(?:\.\d+)?)\s*(?:%|percent\b|per cent\b|pct\b)", re.IGNORECASE)
+_BARE_NUMBER = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*$")
+_ISIN = re.compile(r"\b([A-Z]{2}[A-Z0-9]{9}[0-9])\b")
+_CODE12 = re.compile(r"\b(?=[A-Z]*[0-9])[A-Z0-9]{12}\b")   # 12 chars, at least one digit
+_ORDINAL = re.compile(r"(\d{1,2})(st|nd|rd|th)\b", re.IGNORECASE)
+
+DATE_FORMATS = (
+    "%Y-%m-%d", "%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y",
+    "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d", "%d-%b-%Y",
+)
+
+
+def parse_amount(value):
+    """First amount in the text ("Rs. 12,34,00,000", "$5M", "2.5 crore"); None if absent or ambiguous."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    matches = _AMOUNT.findall(str(value))
+    if len(matches) != 1:
+        return None
+    number, unit = matches[0]
+    try:
+        amount = float(number.replace(",", ""))
+    except ValueError:
+        return None
+    return amount * MULTIPLIERS.get(unit.lower(), 1) if unit else amount
+
+
+def parse_percent(value):
+    """"18.5 %", "18.5 percent" or a bare number; None if absent or ambiguous."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value)
+    matches = _PERCENT.findall(text)
+    if len(matches) == 1:
+        return float(matches[0])
+    if not matches:
+        bare = _BARE_NUMBER.match(text)
+        if bare:
+            return float(bare.group(1))
+    return None
+
+
+def parse_date(value):
+    """
+    A date in one of DATE_FORMATS. Day/month orders that both parse to
+    different dates (03/04/2026) are ambiguous and return None.
+    """
+    return _parse_date(str(value))
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str):
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        pass
+    text = _ORDINAL.sub(r"\1", value).replace(",", " ")
+    text = " ".join(text.split())
+    found = set()
+    for fmt in DATE_FORMATS:
+        try:
+            found.add(datetime.strptime(text, fmt).date())
+        except ValueError:
+            continue
+    return found.pop() if len(found) == 1 else None
+
+
+def isin_valid(code: str) -> bool:
+    """ISO 6166 check digit: letters -> 10..35, then Luhn over the digit string."""
+    digits = "".join(str(int(c, 36)) for c in code)
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+# =========================================================
+# Checks: (fields, **params) -> (state, message)
+# =========================================================
+def _get(fields: dict, name: str):
+    value = fields.get(name)
+    return None if value in (None, "", "null") else value
+
+
+def check_isin(fields, field):
+    value = _get(fields, field)
+    if value is None:
+        return SKIP, None
+    compact = re.sub(r"[\s-]", "", str(value).upper())
+    match = _ISIN.search(compact)
+    if not match:
+        code = _CODE12.search(compact)
+        if code:
+            return FAIL, f"{field} '{code.group(0)}' is not a valid ISIN (2-letter country, 9 characters, check digit)"
+        # "TBD", "To be allotted", "see annex": nothing to check
+        return UNDECIDED, f"no ISIN found in '{value}'"
+    if not isin_valid(match.group(1)):
+        return FAIL, f"{field} '{match.group(1)}' has an invalid check digit"
+    return PASS, None
+
+
+def check_date(fields, field):
+    value = _get(fields, field)
+    if value is None:
+        return SKIP, None
+    if parse_date(value) is None:
+        return UNDECIDED, f"could not read '{value}' as a date"
+    return PASS, None
+
+
+def check_date_order(fields, before, after):
+    a, b = _get(fields, before), _get(fields, after)
+    if a is None or b is None:
+        return SKIP, None
+    da, db = parse_date(a), parse_date(b)
+    if da is None or db is None:
+        return UNDECIDED, f"could not read '{a}' / '{b}' as dates"
+    if da >= db:
+        return FAIL, f"{before} ({da}) must be before {after} ({db})"
+    return PASS, None
+
+
+def check_sum(fields, terms, total, tolerance=0.01):
+    values = [_get(fields, t) for t in terms + [total]]
+    if any(v is None for v in values):
+        return SKIP, None
+    amounts = [parse_amount(v) for v in values]
+    if any(a is None for a in amounts):
+        return UNDECIDED, "could not read every amount"
+    *parts, expected = amounts
+    actual = sum(parts)
+    if abs(actual - expected) > tolerance * max(abs(expected), 1):
+        return FAIL, f"{' + '.join(terms)} = {actual:,.0f}, but {total} is {expected:,.0f}"
+    return PASS, None
+
+
+def check_ratio_percent(fields, numerator, denominator, field, tolerance_points=0.5):
+    values = [_get(fields, n) for n in (numerator, denominator, field)]
+    if any(v is None for v in values):
+        return SKIP, None
+    num, den, pct = parse_amount(values[0]), parse_amount(values[1]), parse_percent(values[2])
+    if num is None or not den or pct is None:
+        return UNDECIDED, "could not read the amounts or percentage"
+    implied = num / den * 100
+    if abs(implied - pct) > tolerance_points:
+        return FAIL, f"{field} is {pct:g}%, but {numerator} / {denominator} implies {implied:.2f}%"
+    return PASS, None
+
+
+def check_percentage_range(fields, field, min=0, max=100):
+    value = _get(fields, field)
+    if value is None:
+        return SKIP, None
+    pct = parse_percent(value)
+    if pct is None:
+        return UNDECIDED, f"could not read '{value}' as a percentage"
+    if not min <= pct <= max:
+        return FAIL, f"{field} is {pct:g}%, outside {min}–{max}%"
+    return PASS, None
+
+
+def check_positive_amount(fields, field):
+    value = _get(fields, field)
+    if value is None:
+        return SKIP, None
+    amount = parse_amount(value)
+    if amount is None:
+        return UNDECIDED, f"could not read '{value}' as an amount"
+    if amount <= 0:
+        return FAIL, f"{field} must be positive (got {value})"
+    return PASS, None
+
+
+def check_not_greater(fields, field, limit):
+    a, b = _get(fields, field), _get(fields, limit)
+    if a is None or b is None:
+        return SKIP, None
+    x, y = parse_amount(a), parse_amount(b)
+    if x is None or y is None:
+        return UNDECIDED, "could not read both amounts"
+    if x > y:
+        return FAIL, f"{field} ({x:,.0f}) exceeds {limit} ({y:,.0f})"
+    return PASS, None
+
+
+CHECKS = {
+    "isin": (check_isin, ("field",)),
+    "date": (check_date, ("field",)),
+    "date_order": (check_date_order, ("before", "after")),
+    "sum": (check_sum, ("terms", "total")),
+    "ratio_percent": (check_ratio_percent, ("numerator", "denominator", "field")),
+    "percentage_range": (check_percentage_range, ("field",)),
+    "positive_amount": (check_positive_amount, ("field",)),
+    "not_greater": (check_not_greater, ("field", "limit")),
+}
+
+
+# =========================================================
+# Compile / load (reloaded when the file changes)
+# =========================================================
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    type: str
+    fields: tuple
+    check: object
+
+
+_lock = threading.Lock()
+_state = {"mtime": None, "rules": {}, "specs": {}, "versions": {}}
+
+
+def _compile(spec: dict):
+    rule_type = spec.get("type")
+    if rule_type not in CHECKS:
+        log(f"⚠️ Unknown validation rule type {rule_type!r} in {spec.get('id')}")
+        return None
+    fn, field_keys = CHECKS[rule_type]
+    params = {k: v for k, v in spec.items() if k not in ("id", "type", "description")}
+    names = []
+    for key in field_keys:
+        value = params.get(key)
+        names += value if isinstance(value, list) else [value]
+    return Rule(spec.get("id", rule_type), rule_type, tuple(names), partial(fn, **params))
+
+
+def _refresh():
+    try:
+        mtime = RULES_PATH.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    if _state["mtime"] == mtime and _state["specs"]:
+        return
+    with _lock:
+        if _state["mtime"] == mtime and _state["specs"]:
+            return
+        try:
+            specs = json.loads(RULES_PATH.read_text(encoding="utf-8")) if mtime else {}
+            rules = {t: tuple(r for r in map(_compile, s) if r) for t, s in specs.items()}
+        except (ValueError, TypeError, AttributeError) as e:
+            log(f"⚠️ {RULES_PATH.name} is invalid, keeping previous rules: {e}")
+            _state["mtime"] = mtime
+            return
+        _state.update(mtime=mtime, rules=rules, specs=specs, versions={})
+
+
+def rules_for(doc_type: str) -> tuple:
+    _refresh()
+    rules = _state["rules"]
+    return rules.get(ALL_TYPES, ()) + rules.get(doc_type, ())
+
+
+def has_own_rules(doc_type: str) -> bool:
+    """True when doc_type declares rules of its own ("*" rules do not count)."""
+    _refresh()
+    return bool(_state["rules"].get(doc_type))
+
+
+def version(doc_type: str) -> str:
+    """Hash of the rule declarations that apply to doc_type."""
+    _refresh()
+    versions = _state["versions"]
+    if doc_type not in versions:
+        specs = _state["specs"]
+        payload = [ENGINE_REVISION, specs.get(ALL_TYPES, []), specs.get(doc_type, [])]
+        versions[doc_type] = hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+    return versions[doc_type]
+
+
+# =========================================================
+# Evaluate
+# =========================================================
+@dataclass
+class RulesOutcome:
+    version: str
+    own_rules: bool = False   # doc_type has rules beyond the "*" ones
+    passed: list = field(default_factory=list)
+    failed: list = field(default_factory=list)      # [{rule, fields, message}]
+    undecided: list = field(default_factory=list)   # [{rule, fields, reason}]
+    skipped: list = field(default_factory=list)
+
+    @property
+    def decided(self) -> int:
+        return len(self.passed) + len(self.failed)
+
+    @property
+    def applicable(self) -> int:
+        return self.decided + len(self.undecided)
+
+    def summary(self) -> dict:
+        return {
+            "rules_version": self.version,
+            "passed": self.passed,
+            "failed": [f["rule"] for f in self.failed],
+            "undecided": [u["rule"] for u in self.undecided],
+            "skipped": self.skipped,
+        }
+
+
+def evaluate(fields: dict, doc_type: str) -> RulesOutcome:
+    outcome = RulesOutcome(version=version(doc_type), own_rules=has_own_rules(doc_type))
+    for rule in rules_for(doc_type):
+        try:
+            state, message = rule.check(fields)
+        except Exception as e:
+            state, message = UNDECIDED, f"rule error: {e}"
+        if state == PASS:
+            outcome.passed.append(rule.id)
+        elif state == FAIL:
+            outcome.failed.append({"rule": rule.id, "fields": list(rule.fields), "message": message})
+        elif state == UNDECIDED:
+            outcome.undecided.append({"rule": rule.id, "fields": list(rule.fields), "reason": message})
+        else:
+            outcome.skipped.append(rule.id)
+    return outcome
@@ -1,15 +1,275 @@
-import boto3, os
+# backend/services/s3_service.py
+#
+# Background replication of uploads and reports to S3 (or any S3-compatible
+# store: set S3_ENDPOINT_URL for MinIO / moto_server). Local disk stays the
+# primary copy; ensure_local() reads missing files back through from S3.
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
 from dotenv import load_dotenv
 
+from database.mongodb_config import db
+from utils.logger import log
+
 load_dotenv()
 
-s3 = boto3.client(
-    "s3",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-)
+# =========================================================
+# Config
+# =========================================================
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION", os.getenv("AWS_DEFAULT_REGION", "us-east-1"))
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_OFFLOAD = os.getenv("S3_OFFLOAD", "1") != "0"
+
+S3_WORKERS = int(os.getenv("S3_WORKERS", "4"))                 # concurrent transfers
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * 1024 * 1024
+S3_MULTIPART_CHUNK = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8")) * 1024 * 1024
+S3_PART_CONCURRENCY = int(os.getenv("S3_PART_CONCURRENCY", "8"))  # parts in flight per transfer
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "5"))          # per request (botocore)
+S3_TRANSFER_RETRIES = int(os.getenv("S3_TRANSFER_RETRIES", "3"))  # whole-transfer retries
+S3_RETRY_DELAY = float(os.getenv("S3_RETRY_DELAY", "1.0"))
+S3_RESUME_LIMIT = int(os.getenv("S3_RESUME_LIMIT", "1000"))
+
+_client = None
+_client_lock = threading.Lock()
+_executor = None
+_tasks = set()
+
+
+def enabled() -> bool:
+    return bool(S3_BUCKET) and S3_OFFLOAD
+
+
+# =========================================================
+# Client (created on first use, shared by all transfers)
+# =========================================================
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            import boto3
+            from botocore.config import Config
+
+            _client = boto3.client(
+                "s3",
+                endpoint_url=S3_ENDPOINT_URL,
+                region_name=S3_REGION,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                config=Config(
+                    retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": "adaptive"},
+                    max_pool_connections=S3_WORKERS * S3_PART_CONCURRENCY,
+                ),
+            )
+        return _client
+
+
+def transfer_config():
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(
+        multipart_threshold=S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=S3_MULTIPART_CHUNK,
+        max_concurrency=S3_PART_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=S3_WORKERS, thread_name_prefix="s3-transfer")
+    return _executor
+
+
+# =========================================================
+# Keys / URLs
+# =========================================================
+def upload_key(content_hash: str) -> str:
+    return f"{S3_PREFIX}uploads/{content_hash}.pdf"
+
+
+def report_key(name: str) -> str:
+    return f"{S3_PREFIX}reports/{name}"
+
+
+def object_url(key: str) -> str:
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{S3_BUCKET}/{key}"
+    return f"https://{S3_BUCKET}.s3.amazonaws.com/{key}"
+
+
+# =========================================================
+# Blocking transfers (run on the s3-transfer pool)
+# =========================================================
+def _with_retries(action: str, fn, *args, **kwargs):
+    from boto3.exceptions import S3UploadFailedError
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    for attempt in range(1, S3_TRANSFER_RETRIES + 1):
+        try:
+            return fn(*args, **kwargs)
+        except (BotoCoreError, ClientError, S3UploadFailedError) as e:
+            if attempt == S3_TRANSFER_RETRIES or _is_not_found(e):
+                raise
+            delay = S3_RETRY_DELAY * 2 ** (attempt - 1)
+            log(f"S3 {action} failed (attempt {attempt}): {e}; retrying in {delay}s")
+            time.sleep(delay)
+
+
+def _is_not_found(e) -> bool:
+    code = getattr(e, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+def exists(key: str) -> bool:
+    from botocore.exceptions import ClientError
+
+    try:
+        get_client().head_object(Bucket=S3_BUCKET, Key=key)
+        return True
+    except ClientError as e:
+        if _is_not_found(e):
+            return False
+        raise
+
+
+def upload_file(file_path: str, key: str, content_type: str | None = None,
+                skip_existing: bool = False) -> str:
+    """
+    Multipart upload (parts sent concurrently above the threshold) with
+    retries. Content-addressed keys can pass skip_existing to avoid
+    re-sending bytes already in the bucket.
+    """
+    if skip_existing and _with_retries("head", exists, key):
+        return object_url(key)
+    extra = {"ContentType": content_type} if content_type else None
+    _with_retries(
+        "upload", get_client().upload_file, file_path, S3_BUCKET, key,
+        ExtraArgs=extra, Config=transfer_config(),
+    )
+    return object_url(key)
+
+
+def download_file(key: str, file_path: str):
+    """Multipart download to a temp name, then an atomic rename."""
+    tmp = f"{file_path}.s3part"
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    try:
+        _with_retries("download", get_client().download_file, S3_BUCKET, key, tmp,
+                      Config=transfer_config())
+        os.replace(tmp, file_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
 
 def upload_to_s3(file_path, filename):
-    bucket = os.getenv("S3_BUCKET")
-    s3.upload_file(file_path, bucket, filename)
-    return f"https://{bucket}.s3.amazonaws.com/{filename}"
+    """Kept for existing callers: synchronous upload of one file."""
+    return upload_file(file_path, filename)
+
+
+# =========================================================
+# Async API
+# =========================================================
+async def _run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), lambda: fn(*args, **kwargs))
+
+
+async def replicate(collection: str, doc_id, file_path: str, key: str,
+                    content_type: str | None = None, field: str = "s3_url",
+                    skip_existing: bool = False):
+    """
+    Uploads one file and records the object URL on the document under
+    `field` (the key goes next to it, s3_url -> s3_key), or s3_error.
+    """
+    try:
+        url = await _run(upload_file, file_path, key, content_type, skip_existing)
+        await db[collection].update_one(
+            {"_id": doc_id},
+            {"$set": {field: url, field.replace("_url", "_key"): key,
+                      "replicated_at": datetime.utcnow()},
+             "$unset": {"s3_error": ""}},
+        )
+        return url
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        log(f"S3 replication of {file_path} -> {key} failed: {e}")
+        try:
+            await db[collection].update_one({"_id": doc_id}, {"$set": {"s3_error": str(e)}})
+        except Exception:
+            pass
+        return None
+
+
+def schedule(collection: str, doc_id, file_path: str, key: str, **kwargs):
+    """Fire-and-forget replicate(); a no-op when offload is not configured."""
+    if not enabled():
+        return None
+    task = asyncio.create_task(replicate(collection, doc_id, file_path, key, **kwargs))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def schedule_upload(upload_id, file_path: str, content_hash: str):
+    return schedule("uploads", upload_id, file_path, upload_key(content_hash),
+                    content_type="application/pdf", skip_existing=True)
+
+
+async def ensure_local(file_path: str, key: str) -> str:
+    """
+    Read-through cache: returns file_path, downloading it from S3 first if
+    the local copy is gone (new host, cleaned disk). Without S3 the path is
+    returned as is and the caller's usual not-found handling applies.
+    """
+    if os.path.exists(file_path) or not enabled():
+        return file_path
+    try:
+        await _run(download_file, key, file_path)
+        log(f"Restored {file_path} from S3 ({key})")
+    except Exception as e:
+        log(f"S3 read-through for {key} failed: {e}")
+    return file_path
+
+
+async def resume_pending():
+    """Queue uploads stored before offload was enabled, or whose copy failed."""
+    if not enabled():
+        return
+    cursor = db["uploads"].find(
+        {"s3_url": None, "content_hash": {"$exists": True}, "path": {"$exists": True}},
+        {"path": 1, "content_hash": 1},
+    ).limit(S3_RESUME_LIMIT)
+    queued = 0
+    async for upload in cursor:
+        if os.path.exists(upload["path"]):
+            schedule_upload(upload["_id"], upload["path"], upload["content_hash"])
+            queued += 1
+    if queued:
+        log(f"Queued {queued} uploads for S3 replication")
+
+
+def stats() -> dict:
+    return {"enabled": enabled(), "bucket": S3_BUCKET, "in_flight": len(_tasks)}
+
+
+async def shutdown(timeout: float = 10.0):
+    """Gives in-flight transfers a moment to finish, then stops the pool."""
+    global _executor
+    if _tasks:
+        await asyncio.wait(list(_tasks), timeout=timeout)
+        for task in list(_tasks):
+            task.cancel()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,123 @@
+# backend/services/schema_registry.py
+#
+# master_schemas.json compiled once into lookup structures and reloaded
+# when the file changes on disk, so editing a schema needs no restart.
+# Every compiled schema carries a version tag (hash of its own compiled
+# content) that validation results record; changing one document type
+# only invalidates results of that type.
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schemas" / "master_schemas.json"
+FALLBACK_TYPE = "unknown"
+
+# Used when a schema lists no required fields at all
+FALLBACK_REQUIRED = (
+    "Company Name", "Date", "Investor", "Investment Amount",
+    "Valuation (Pre-Money)", "Valuation (Post-Money)",
+    "Equity to be Issued", "Issuer", "ISIN",
+    "Issue Date", "Redemption Date",
+)
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    doc_type: str
+    required: tuple
+    optional: tuple
+    required_set: frozenset
+    fields: frozenset          # required + optional
+    version: str
+    generic_required: bool     # FALLBACK_REQUIRED stood in for an empty list
+
+
+_lock = threading.Lock()
+_state = {"mtime": None, "file_version": None, "schemas": {}, "raw": {}}
+
+
+# =========================================================
+# Compile / load
+# =========================================================
+def _compile(doc_type: str, schema: dict) -> CompiledSchema:
+    required = tuple(schema.get("required_fields") or ())
+    optional = tuple(schema.get("optional_fields") or ())
+    generic = not required
+    if generic:
+        required = FALLBACK_REQUIRED
+    digest = hashlib.sha256(
+        json.dumps([doc_type, required, optional]).encode("utf-8")
+    ).hexdigest()[:12]
+    return CompiledSchema(
+        doc_type=doc_type,
+        required=required,
+        optional=optional,
+        required_set=frozenset(required),
+        fields=frozenset(required + optional),
+        version=digest,
+        generic_required=generic,
+    )
+
+
+def _refresh():
+    """Recompiles if the file's mtime moved; a broken edit keeps the last good set."""
+    mtime = SCHEMA_PATH.stat().st_mtime
+    if _state["mtime"] == mtime:
+        return
+    with _lock:
+        if _state["mtime"] == mtime:
+            return
+        data = SCHEMA_PATH.read_bytes()
+        try:
+            raw = json.loads(data)
+            schemas = {t: _compile(t, s) for t, s in raw.items()}
+        except (ValueError, AttributeError) as e:
+            if _state["schemas"]:
+                log(f"⚠️ {SCHEMA_PATH.name} is invalid, keeping previous schemas: {e}")
+                _state["mtime"] = mtime
+                return
+            raise
+        if _state["mtime"] is not None:
+            log(f"Reloaded {SCHEMA_PATH.name} ({len(schemas)} document types)")
+        _state.update(
+            mtime=mtime,
+            file_version=hashlib.sha256(data).hexdigest()[:12],
+            schemas=schemas,
+            raw=raw,
+        )
+
+
+# =========================================================
+# Lookups
+# =========================================================
+def get(doc_type: str) -> CompiledSchema:
+    """Compiled schema for doc_type, falling back to the "unknown" schema."""
+    _refresh()
+    schemas = _state["schemas"]
+    schema = schemas.get(doc_type) or schemas.get(FALLBACK_TYPE)
+    return schema or _compile(FALLBACK_TYPE, {})
+
+
+def doc_types() -> list:
+    _refresh()
+    return list(_state["schemas"])
+
+
+def raw_schemas() -> dict:
+    """The file as last loaded (treat as read-only)."""
+    _refresh()
+    return _state["raw"]
+
+
+def version() -> str:
+    """Short hash of the whole file: changes whenever any schema does."""
+    _refresh()
+    return _state["file_version"]
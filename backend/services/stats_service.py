@@ -0,0 +1,342 @@
+# backend/services/stats_service.py
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from database.mongodb_config import db
+from pymongo.errors import DuplicateKeyError
+from utils import query_utils
+from utils.logger import log
+
+# =========================================================
+# Config
+# =========================================================
+STATS_COLLECTION = "stats"
+COUNTERS_ID = "validation_counters"
+PENDING_COLLECTION = "stats_pending"   # increments held while a rebuild runs
+STATS_RETENTION_DAYS = int(os.getenv("STATS_RETENTION_DAYS", "400"))   # by_day buckets kept
+
+_pruned_through = None   # day bucket this process last pruned on
+
+# Validator output ("Validated ✅", "Needs Review ⚠️", "Failed ❌") -> key
+STATUS_KEYS = {
+    "validated": "validated",
+    "needs review": "needs_review",
+    "failed": "failed",
+}
+
+
+def status_key(status) -> str:
+    text = str(status or "").lower()
+    for prefix, key in STATUS_KEYS.items():
+        if text.startswith(prefix):
+            return key
+    return "other"
+
+
+def _safe(key) -> str:
+    # Counter keys end up in field paths; "." and "$" are not allowed there
+    return str(key or "unknown").replace(".", "_").replace("$", "_")
+
+
+def day_bucket(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d")
+
+
+def _oldest_kept_day(today: datetime | None = None) -> str:
+    today = today or datetime.utcnow()
+    return day_bucket(today - timedelta(days=STATS_RETENTION_DAYS - 1))
+
+
+# =========================================================
+# Incremental update (one atomic $inc per validation)
+# =========================================================
+def _increments(doc_type: str, status: str, issues: int, score, day: str, count: int = 1) -> dict:
+    status = status_key(status)
+    doc_type = _safe(doc_type)
+    score = score or 0
+    inc = {}
+    for prefix in ("", f"by_type.{doc_type}.", f"by_day.{day}."):
+        inc[f"{prefix}total"] = count
+        inc[f"{prefix}issues"] = issues
+        inc[f"{prefix}score_sum"] = score
+        inc[f"{prefix}by_status.{status}"] = count
+    return inc
+
+
+def _result_increments(vdoc: dict, sign: int = 1) -> dict:
+    created = vdoc.get("created_at") or datetime.utcnow()
+    return _increments(
+        vdoc.get("document_type"),
+        vdoc.get("status"),
+        sign * len(vdoc.get("issues") or []),
+        sign * (vdoc.get("score") or 0),
+        day_bucket(created),
+        sign,
+    )
+
+
+async def record_validation(vdoc: dict):
+    """
+    Folds one freshly inserted validation result into the counters
+    document. Called right after the insert in /api/validate.
+    """
+    await _apply(_result_increments(vdoc), vdoc.get("created_at"))
+
+
+async def replace_validation(old: dict, new: dict):
+    """
+    Moves a result updated in place (force=true) from its old outcome to
+    the new one. The move counts as written now: if it lands during a
+    rebuild it is replayed on top of the rebuilt counters.
+    """
+    inc = _result_increments(old, -1)
+    for path, value in _result_increments(new).items():
+        inc[path] = inc.get(path, 0) + value
+    inc = {k: v for k, v in inc.items() if v}
+    if inc:
+        await _apply(inc)
+
+
+async def _inc_counters(inc: dict) -> bool:
+    """One atomic $inc on the counters; False while a rebuild holds them."""
+    try:
+        await db[STATS_COLLECTION].update_one(
+            {"_id": COUNTERS_ID, "rebuilding": {"$exists": False}},
+            {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False   # the document exists, with a rebuild in progress
+
+
+async def _hold(inc: dict, written_at: datetime) -> bool:
+    """
+    Parks an increment for the running rebuild to replay. False if that
+    rebuild finished before it could see the entry (the caller then
+    applies it directly).
+    """
+    held = await db[PENDING_COLLECTION].insert_one({"inc": inc, "written_at": written_at})
+    if await db[STATS_COLLECTION].count_documents(
+        {"_id": COUNTERS_ID, "rebuilding": {"$exists": True}}, limit=1
+    ):
+        return True
+    # Whoever deletes the entry owns it: the rebuild's replay or us
+    return not (await db[PENDING_COLLECTION].delete_one({"_id": held.inserted_id})).deleted_count
+
+
+async def _route(inc: dict, written_at: datetime | None = None) -> bool:
+    """Applies an increment, or holds it for a running rebuild (False)."""
+    written_at = written_at or datetime.utcnow()
+    while not await _inc_counters(inc):
+        if await _hold(inc, written_at):
+            return False
+    return True
+
+
+async def _apply(inc: dict, written_at: datetime | None = None):
+    # Every change is one atomic upsert. While rebuild() recomputes the
+    # counters the change is held in PENDING_COLLECTION instead and
+    # replayed once the rebuilt document is in place.
+    try:
+        await _route(inc, written_at)
+        await _prune_daily()
+    except Exception as e:
+        # Counters drift until the next rebuild; the validation itself stands
+        log(f"Stats counter update failed: {e}")
+
+
+async def _prune_daily():
+    """Drops by_day buckets past STATS_RETENTION_DAYS, once per day per process."""
+    global _pruned_through
+    today = day_bucket(datetime.utcnow())
+    if _pruned_through == today:
+        return
+    _pruned_through = today
+    await prune_days()
+
+
+async def prune_days() -> int:
+    oldest = _oldest_kept_day()
+    doc = await db[STATS_COLLECTION].find_one({"_id": COUNTERS_ID}, {"by_day": 1}) or {}
+    expired = [d for d in doc.get("by_day", {}) if d < oldest]
+    if expired:
+        await db[STATS_COLLECTION].update_one(
+            {"_id": COUNTERS_ID}, {"$unset": {f"by_day.{d}": "" for d in expired}}
+        )
+        log(f"Pruned {len(expired)} stats day buckets older than {oldest}")
+    return len(expired)
+
+
+# =========================================================
+# Full recomputation (aggregation pipeline)
+# =========================================================
+def _pipeline(cutoff: datetime | None = None) -> list:
+    created = {"$ifNull": ["$created_at", {"$toDate": "$_id"}]}
+    match = query_utils.results_filter()
+    if cutoff is not None:
+        # Results written from cutoff on are replayed by rebuild() instead
+        match["$or"] = [{"created_at": {"$lt": cutoff}}, {"created_at": None}]
+    sums = {
+        "total": {"$sum": 1},
+        "issues": {"$sum": {"$size": {"$ifNull": ["$issues", []]}}},
+        "score_sum": {"$sum": {"$ifNull": ["$score", 0]}},
+    }
+    return [
+        # Revalidation snapshots duplicate uploads already counted
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "doc_type": "$document_type",
+                "status": "$status",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": created}},
+            },
+            **sums,
+        }},
+    ]
+
+
+async def aggregate_counters(cutoff: datetime | None = None) -> dict:
+    """
+    Recomputes the counters from validation_results in Mongo (results
+    created before cutoff, if given). The pipeline groups by (type, raw
+    status, day); those few rows are folded into the same shape
+    record_validation() maintains.
+    """
+    counters = {}
+    oldest = _oldest_kept_day()
+
+    def add(path: str, value):
+        node = counters
+        *parents, leaf = path.split(".")
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = node.get(leaf, 0) + value
+
+    async for row in db["validation_results"].aggregate(_pipeline(cutoff)):
+        key = row["_id"]
+        inc = _increments(key.get("doc_type"), key.get("status"), row["issues"],
+                          row["score_sum"], key.get("day") or "unknown", row["total"])
+        # count = documents in the group; issues/score_sum are already group sums
+        expired = (key.get("day") or "unknown") < oldest
+        for path, value in inc.items():
+            if expired and path.startswith("by_day."):
+                continue
+            add(path, value)
+    return counters
+
+
+async def ensure_counters():
+    """
+    Startup: seeds the counters from validation_results if they do not
+    exist yet, or finishes a rebuild a previous run was killed in.
+    """
+    doc = await db[STATS_COLLECTION].find_one({"_id": COUNTERS_ID}, {"rebuilding": 1})
+    if doc is None or "rebuilding" in doc:
+        await rebuild()
+
+
+async def _replay(cutoff: datetime | None):
+    """Applies held increments; those written before cutoff are already in the aggregate."""
+    while (held := await db[PENDING_COLLECTION].find_one_and_delete({}, sort=[("_id", 1)])) is not None:
+        if cutoff is None or held["written_at"] >= cutoff:
+            if not await _route(held["inc"], held["written_at"]):
+                return   # held again: a newer rebuild replays the rest
+
+
+async def rebuild() -> dict:
+    """
+    Recomputes the counters without losing concurrent updates: the
+    counters document is marked as rebuilding (increments are held from
+    then on), results created before that moment are aggregated, the
+    rebuilt document replaces the old one, and the held increments for
+    newer results are replayed on top. A newer rebuild takes over the
+    mark; only the last one writes its result.
+    """
+    token = uuid.uuid4().hex
+    await db[STATS_COLLECTION].update_one(
+        {"_id": COUNTERS_ID}, {"$set": {"rebuilding": token}}, upsert=True
+    )
+    # Mongo keeps dates to the millisecond: align the cutoff to the next
+    # one and let it pass, so no result is written in the cutoff's own tick
+    now = datetime.utcnow()
+    cutoff = now.replace(microsecond=now.microsecond // 1000 * 1000) + timedelta(milliseconds=1)
+    await asyncio.sleep((cutoff - now).total_seconds())
+    try:
+        counters = await aggregate_counters(cutoff)
+    except BaseException:
+        # Keep the old counters; every held increment still applies to them
+        released = await db[STATS_COLLECTION].update_one(
+            {"_id": COUNTERS_ID, "rebuilding": token}, {"$unset": {"rebuilding": ""}}
+        )
+        if released.matched_count:
+            await _replay(None)
+        raise
+
+    now = datetime.utcnow()
+    swapped = await db[STATS_COLLECTION].replace_one(
+        {"_id": COUNTERS_ID, "rebuilding": token},
+        {**counters, "updated_at": now, "rebuilt_at": now},
+    )
+    if swapped.matched_count:
+        await _replay(cutoff)
+        log(f"Stats counters rebuilt: {counters.get('total', 0)} validations")
+    return counters
+
+
+# =========================================================
+# Read
+# =========================================================
+def _summary(node: dict) -> dict:
+    total = node.get("total", 0)
+    by_status = node.get("by_status", {})
+    return {
+        "total": total,
+        "issues": node.get("issues", 0),
+        "averageScore": round(node.get("score_sum", 0) / total, 1) if total else 0,
+        "successRate": round(by_status.get("validated", 0) / total * 100) if total else 0,
+        "byStatus": by_status,
+    }
+
+
+async def _upload_count() -> int:
+    try:
+        return await db["uploads"].estimated_document_count()
+    except Exception:
+        return await db["uploads"].count_documents({})
+
+
+async def get_stats(days: int | None = 30) -> dict:
+    """
+    Dashboard numbers from the counters document (one read). Rebuilt from
+    validation_results the first time, or if the document was dropped.
+    byDay covers the last `days` calendar days (today included; days
+    without validations are zero), or every kept bucket when days is None.
+    """
+    counters = await db[STATS_COLLECTION].find_one({"_id": COUNTERS_ID})
+    if counters is None:
+        counters = await rebuild()
+
+    overall = _summary(counters)
+    by_day = counters.get("by_day", {})
+    if days:
+        today = datetime.utcnow()
+        day_keys = [day_bucket(today - timedelta(days=i)) for i in range(days - 1, -1, -1)]
+    else:
+        day_keys = sorted(by_day)
+
+    return {
+        # shape the dashboard already reads
+        "totalUploads": await _upload_count(),
+        "totalValidations": overall["total"],
+        "successRate": overall["successRate"],
+        "totalIssues": overall["issues"],
+        "averageScore": overall["averageScore"],
+        "byStatus": overall["byStatus"],
+        "byType": {t: _summary(n) for t, n in counters.get("by_type", {}).items()},
+        "byDay": {d: _summary(by_day.get(d, {})) for d in day_keys},
+        "updatedAt": counters.get("updated_at"),
+    }
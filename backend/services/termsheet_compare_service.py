@@ -1,118 +1,170 @@
-import io
-import re
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import aiofiles
 from fastapi import UploadFile
-import pdfplumber
+from bson import ObjectId
+
+from database.mongodb_config import db
+from services import blob_store, extraction_cache, parser_service, s3_service
+from utils import field_scanner, pdf_utils
 
 # --------------------------
-# READ PDF TEXT
+# CONFIG
 # --------------------------
-def extract_text_from_pdf(file: UploadFile):
-    pdf_bytes = file.file.read()
-    pdf_stream = io.BytesIO(pdf_bytes)
+COMPARE_MAX_BYTES = int(os.getenv("COMPARE_MAX_MB", str(blob_store.MAX_UPLOAD_BYTES // (1024 * 1024)))) * 1024 * 1024
+# Text kept per document; pages past the cap are not extracted at all
+COMPARE_MAX_TEXT_CHARS = int(os.getenv("COMPARE_MAX_TEXT_MB", "8")) * 1024 * 1024
+COMPARE_CACHE_SIZE = int(os.getenv("COMPARE_CACHE_SIZE", "128"))
 
-    text = ""
-    with pdfplumber.open(pdf_stream) as pdf:
-        for page in pdf.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
-    return text
+# content hash -> scanned side (fields are tiny; the text is not kept)
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
 
 
-# -----------------------------------
-# STRICT PATTERNS FOR FIELDS
-# -----------------------------------
+class UploadNotFoundError(Exception):
+    pass
+
+
+def _cache_get(content_hash: str):
+    with _cache_lock:
+        side = _cache.get(content_hash)
+        if side is not None:
+            _cache.move_to_end(content_hash)
+        return side
 
-DATE_REGEXES = [
-    r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b",            # 10/12/2024
-    r"\b\w+\s\d{1,2},\s\d{4}\b",                      # December 15, 2025
-    r"\b\d{1,2}\s\w+\s\d{4}\b",                       # 12 December 2025
-]
 
-AMOUNT_REGEXES = [
-    r"(rs\.?\s?\d[\d,\.]*)",
-    r"(₹\s?\d[\d,\.]*)",
-    r"(inr\s?\d[\d,\.]*)"
-]
+def _cache_put(content_hash: str, side: dict):
+    with _cache_lock:
+        _cache[content_hash] = side
+        _cache.move_to_end(content_hash)
+        while len(_cache) > COMPARE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# --------------------------
+# READ PDF TEXT
+# --------------------------
+def extract_text_from_pdf(pdf_path: str, max_chars: int | None = None) -> tuple:
+    """
+    Streams pages through PyMuPDF (large documents are sharded across the
+    PDF pool) and stops once max_chars of text are held.
+    Returns (text, pages_read, truncated).
+    """
+    max_chars = COMPARE_MAX_TEXT_CHARS if max_chars is None else max_chars
+    pages, size, truncated = [], 0, False
+    for _, text in pdf_utils.iter_pages(pdf_path):
+        pages.append(text)
+        size += len(text)
+        if size >= max_chars:
+            truncated = True
+            break   # closing the generator cancels outstanding shards
+    return pdf_utils.join_pages(pages), len(pages), truncated
+
+
+def _stored_pages(content_hash: str):
+    """
+    Pages the upload pipeline already extracted for these bytes, if cached.
+    peek() keeps these lookups out of the upload cache's hit rate.
+    """
+    entry = extraction_cache.peek(
+        extraction_cache.make_key(content_hash, parser_service.PARSER_VERSION)
+    )
+    return entry["pages"] if entry else None
+
+
+def scan_document(pdf_path: str, content_hash: str) -> dict:
+    """Fields for one side, reusing the compare cache and the extraction cache."""
+    side = _cache_get(content_hash)
+    if side is not None:
+        return {**side, "cached": True}
+
+    pages = _stored_pages(content_hash)
+    if pages is not None:
+        text = pdf_utils.join_pages(pages)
+        side = {"pages": len(pages), "truncated": False, "source": "extraction_cache"}
+    else:
+        text, count, truncated = extract_text_from_pdf(pdf_path)
+        side = {"pages": count, "truncated": truncated, "source": "pdf"}
+
+    side["fields"] = extract_fields(text)
+    _cache_put(content_hash, side)
+    return {**side, "cached": False}
 
-INTEREST_REGEX = r"(\d+(\.\d+)?\s?%)"
 
-TENURE_REGEX = r"(\b\d+\s?(months?|years?)\b)"
+# --------------------------
+# INPUTS
+# --------------------------
+async def _spool(file: UploadFile) -> tuple:
+    """Copies the upload to a temp file in chunks, hashing as it goes."""
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="compare_")
+    os.close(fd)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out:
+            while chunk := await file.read(blob_store.CHUNK_BYTES):
+                size += len(chunk)
+                if size > COMPARE_MAX_BYTES:
+                    raise blob_store.BlobTooLargeError(
+                        f"{file.filename} exceeds {COMPARE_MAX_BYTES // (1024 * 1024)} MB limit"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+async def _side_from_file(file: UploadFile) -> dict:
+    path, content_hash = await _spool(file)
+    try:
+        return await asyncio.to_thread(scan_document, path, content_hash)
+    finally:
+        os.remove(path)
+
+
+async def _side_from_upload(upload_id: str) -> dict:
+    try:
+        upload = await db["uploads"].find_one(
+            {"_id": ObjectId(upload_id)}, {"path": 1, "content_hash": 1}
+        )
+    except Exception:
+        upload = None
+    if not upload or not upload.get("path"):
+        raise UploadNotFoundError(f"Upload {upload_id} not found")
+
+    path = upload["path"]
+    content_hash = upload.get("content_hash")
+    if content_hash:
+        path = await s3_service.ensure_local(path, s3_service.upload_key(content_hash))
+    else:
+        content_hash = await asyncio.to_thread(extraction_cache.hash_file, path)
+    return await asyncio.to_thread(scan_document, path, content_hash)
+
+
+def _side(file: UploadFile | None, upload_id: str | None):
+    if upload_id:
+        return _side_from_upload(upload_id)
+    return _side_from_file(file)
 
 
 # -----------------------------------
 # CLEAN FIELD EXTRACTOR
 # -----------------------------------
-def pick_first_match(text, patterns):
-    for p in patterns:
-        match = re.search(p, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    return None
-
-
 def extract_fields(text: str):
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    fields = {
-        "company_name": None,
-        "amount": None,
-        "date": None,
-        "tenure": None,
-        "interest_rate": None
-    }
-
-    # --------------------------
-    # COMPANY NAME — strict rule
-    # --------------------------
-    for line in lines:
-        if line.lower().startswith("company"):
-            fields["company_name"] = line
-            break
-        if "company name" in line.lower():
-            fields["company_name"] = line
-            break
-
-    # --------------------------
-    # AMOUNT — strict numeric value
-    # --------------------------
-    for line in lines:
-        amt = pick_first_match(line, AMOUNT_REGEXES)
-        if amt:
-            fields["amount"] = amt
-            break
-
-    # --------------------------
-    # DATE — strict patterns only
-    # --------------------------
-    for line in lines:
-        for pattern in DATE_REGEXES:
-            match = re.search(pattern, line, re.IGNORECASE)
-            if match:
-                fields["date"] = match.group(0)
-                break
-        if fields["date"]:
-            break
-
-    # --------------------------
-    # TENURE — “XX months/years”
-    # --------------------------
-    for line in lines:
-        tn = re.search(TENURE_REGEX, line, re.IGNORECASE)
-        if tn:
-            fields["tenure"] = tn.group(0)
-            break
-
-    # --------------------------
-    # INTEREST RATE — “XX%”
-    # --------------------------
-    for line in lines:
-        ir = re.search(INTEREST_REGEX, line)
-        if ir:
-            fields["interest_rate"] = ir.group(0)
-            break
-
-    return fields
+    # Single pass over the lines with precompiled patterns
+    return field_scanner.scan_lines(text)
 
 
 # -----------------------------------
@@ -147,18 +199,29 @@ def compare_fields(ideal_fields, input_fields):
 # -----------------------------------
 # MAIN FUNCTION
 # -----------------------------------
-async def compare_termsheets(ideal_file: UploadFile, input_file: UploadFile):
-
-    ideal_text = extract_text_from_pdf(ideal_file)
-    input_text = extract_text_from_pdf(input_file)
-
-    ideal_fields = extract_fields(ideal_text)
-    input_fields = extract_fields(input_text)
-
-    final_comparison = compare_fields(ideal_fields, input_fields)
+async def compare_termsheets(ideal_file: UploadFile | None = None, input_file: UploadFile | None = None,
+                             ideal_upload_id: str | None = None, input_upload_id: str | None = None):
+    """
+    Each side is an uploaded file or the upload_id of a stored upload.
+    Both are extracted concurrently on worker threads.
+    """
+    for file, upload_id in ((ideal_file, ideal_upload_id), (input_file, input_upload_id)):
+        if file is None and not upload_id:
+            raise ValueError("Provide a file or an upload_id for each side")
+
+    ideal, given = await asyncio.gather(
+        _side(ideal_file, ideal_upload_id),
+        _side(input_file, input_upload_id),
+    )
+
+    final_comparison = compare_fields(ideal["fields"], given["fields"])
 
     return {
-        "ideal_fields": ideal_fields,
-        "input_fields": input_fields,
-        "differences": final_comparison
+        "ideal_fields": ideal["fields"],
+        "input_fields": given["fields"],
+        "differences": final_comparison,
+        "sources": {
+            side: {k: v for k, v in doc.items() if k != "fields"}
+            for side, doc in (("ideal", ideal), ("input", given))
+        },
     }
@@ -1,34 +1,13 @@
-import os
+import asyncio
+import hashlib
 import json
 import re
-import requests
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-
-# =========================================================
-# Load .env and Gemini key
-# =========================================================
-env_path = Path(__file__).resolve().parents[1] / ".env"
-load_dotenv(dotenv_path=env_path)
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("❌ Missing GEMINI_API_KEY")
+from services import llm_client, rules_engine, schema_registry
 
 MODEL_NAME = "gemini-2.5-flash"
-GEMINI_URL = (
-    f"https://generativelanguage.googleapis.com/v1/models/"
-    f"{MODEL_NAME}:generateContent?key={GEMINI_API_KEY}"
-)
-
-# =========================================================
-# Load Master Schemas
-# =========================================================
-SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schemas" / "master_schemas.json"
-
-with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-    MASTER_SCHEMAS = json.load(f)
+DEEP_CHECK_TIMEOUT = 60
 
 # =========================================================
 # Logger
@@ -43,6 +22,49 @@ def log(msg: str):
         f.write(f"{datetime.now().isoformat()} - {msg}\n")
 
 
+# =========================================================
+# Result memoization
+# =========================================================
+_inflight = {}
+
+
+def fingerprint(extracted_fields: dict, document_type: str, deep_check: bool) -> str:
+    """
+    Canonical hash of everything a validation outcome depends on: the
+    fields, the document type, that type's compiled schema and, for deep
+    checks, its rules and the model.
+    """
+    payload = {
+        "fields": extracted_fields,
+        "document_type": document_type,
+        "schema_version": schema_registry.get(document_type).version,
+        "deep_check": bool(deep_check),
+    }
+    if deep_check:
+        payload["rules_version"] = rules_engine.version(document_type)
+        payload["model"] = MODEL_NAME
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def validate_fields_once(fingerprint: str, **kwargs):
+    """validate_fields(), with concurrent calls for the same fingerprint sharing one run."""
+    task = _inflight.get(fingerprint)
+    if task is None:
+        task = asyncio.ensure_future(validate_fields(**kwargs))
+        _inflight[fingerprint] = task
+        task.add_done_callback(lambda _: _inflight.pop(fingerprint, None))
+    return await asyncio.shield(task)
+
+
+# =========================================================
+# Helpers
+# =========================================================
+def is_present(value) -> bool:
+    """A required field counts as present when its extracted value is truthy."""
+    return bool(value)
+
+
 # =========================================================
 # Helper: extract JSON safely
 # =========================================================
@@ -74,45 +96,25 @@ def extract_json(text: str):
 # =========================================================
 # 🧠 Main Validator (UPDATED)
 # =========================================================
-def validate_fields(extracted_fields: dict, document_type: str = "unknown", deep_check=False):
+async def validate_fields(extracted_fields: dict, document_type: str = "unknown", deep_check=False):
     """
     Universal validator supporting all financial document types.
     """
 
     # ---------------------------------------------------------
-    # 🔥 FIXED: Always use correct schema — fallback improved
+    # 1. Compiled schema (unknown types fall back to "unknown";
+    #    empty required lists to the generic field set)
     # ---------------------------------------------------------
-    if document_type in MASTER_SCHEMAS:
-        schema = MASTER_SCHEMAS[document_type]
-    else:
-        # fallback if unknown
-        schema = MASTER_SCHEMAS.get("unknown", {})
+    schema = schema_registry.get(document_type)
+    required_fields = schema.required
 
-    required_fields = schema.get("required_fields", [])
-    optional_fields = schema.get("optional_fields", [])
-
-    # 🔥 CRITICAL FIX — if schema had empty required fields, fallback to generic fields
-    if not required_fields:
-        required_fields = [
-            "Company Name", "Date", "Investor", "Investment Amount",
-            "Valuation (Pre-Money)", "Valuation (Post-Money)",
-            "Equity to be Issued", "Issuer", "ISIN",
-            "Issue Date", "Redemption Date"
-        ]
-
-    log(f"Validating doc_type={document_type}, required={required_fields}")
+    log(f"Validating doc_type={document_type}, schema={schema.version}, required={len(required_fields)}")
 
     # ---------------------------------------------------------
     # 2. Check presence
     # ---------------------------------------------------------
-    missing = []
-    present = {}
-
-    for field in required_fields:
-        if field in extracted_fields and extracted_fields[field]:
-            present[field] = extracted_fields[field]
-        else:
-            missing.append(field)
+    present = {f: extracted_fields[f] for f in required_fields if is_present(extracted_fields.get(f))}
+    missing = [f for f in required_fields if f not in present]
 
     # ---------------------------------------------------------
     # BASE SCORE
@@ -130,12 +132,113 @@ def validate_fields(extracted_fields: dict, document_type: str = "unknown", deep
             "score": round(completeness_score),
             "summary": f"{len(present)}/{len(required_fields)} required fields present.",
             "status": "Failed ❌" if completeness_score < 60 else "Needs Review ⚠️",
+            "schema_version": schema.version,
         }
 
     # ---------------------------------------------------------
-    # 3. Deep validation using Gemini
+    # 3. Local rules first (schemas/validation_rules.json)
+    # ---------------------------------------------------------
+    rules = rules_engine.evaluate(extracted_fields, document_type)
+    base = {
+        "document_type": document_type,
+        "validated_fields": present,
+        "schema_version": schema.version,
+        "rules_version": rules.version,
+        "checks": rules.summary(),
+    }
+    issues = [f"Missing required fields: {missing}"] if missing else []
+    issues += [f["message"] for f in rules.failed]
+
+    # "*" rules alone (e.g. the ISIN check on an unknown type) do not make
+    # a type rule-checked: such documents still go to Gemini whole
+    if rules.own_rules and rules.applicable and not rules.undecided:
+        log(f"Deep check decided locally: {len(rules.passed)} passed, {len(rules.failed)} failed")
+        checks_score = len(rules.passed) / rules.applicable * 100
+        summary = (f"{len(present)}/{len(required_fields)} required fields present; "
+                   f"{len(rules.passed)}/{rules.applicable} rule checks passed.")
+        return _finish(base, issues, checks_score, completeness_score, summary)
+
+    # ---------------------------------------------------------
+    # 4. Gemini for what the rules could not decide (or, for types
+    #    without rules, the whole document)
     # ---------------------------------------------------------
-    prompt = f"""
+    ask_undecided = rules.own_rules and bool(rules.undecided)
+    if ask_undecided:
+        prompt = _undecided_prompt(document_type, extracted_fields, rules.undecided)
+    else:
+        prompt = _full_prompt(document_type, extracted_fields, required_fields)
+
+    log(f"Sending deep validation request to Gemini ({len(rules.undecided)} undecided rules)...")
+
+    try:
+        ai_text = await llm_client.generate(
+            prompt, model=MODEL_NAME, timeout=DEEP_CHECK_TIMEOUT
+        )
+        parsed = extract_json(ai_text)
+        error = None if parsed else "Could not parse AI deep validation."
+    except Exception as e:
+        parsed, error = None, f"Gemini API error: {getattr(e, 'status_code', None) or e}"
+
+    if not parsed:
+        if not ask_undecided or not rules.decided:
+            return {
+                **base,
+                "issues": issues + [error],
+                "score": round(completeness_score),
+                "summary": "Base validation only.",
+                "status": "Needs Review ⚠️",
+                "llm_error": error,
+            }
+        # Keep what the rules decided; the rest stays unverified
+        issues.append(error)
+        issues.append(f"Not verified: {[u['rule'] for u in rules.undecided]}")
+        checks_score = len(rules.passed) / rules.decided * 100
+        result = _finish(base, issues, checks_score, completeness_score,
+                         f"{len(rules.passed)}/{rules.decided} decidable rule checks passed.")
+        if result["status"].startswith("Validated"):
+            result["status"] = "Needs Review ⚠️"
+        result["llm_error"] = error
+        return result
+
+    ai_score = _as_number(parsed.get("score"))
+    issues += [i for i in parsed.get("issues", []) if i]
+
+    if not ask_undecided:
+        # No rules for this type: Gemini judged the whole document
+        base["validated_fields"] = parsed.get("validated_fields") or present
+        return _finish(base, issues, ai_score, completeness_score, parsed.get("summary", ""))
+
+    # Gemini's score stands in for the undecided rules only
+    checks_score = (len(rules.passed) * 100 + ai_score * len(rules.undecided)) / rules.applicable
+    summary = (f"{len(present)}/{len(required_fields)} required fields present; "
+               f"{len(rules.passed)}/{rules.decided} rule checks passed, "
+               f"{len(rules.undecided)} checked by AI. {parsed.get('summary', '')}").strip()
+    return _finish(base, issues, checks_score, completeness_score, summary)
+
+
+# =========================================================
+# Deep check helpers
+# =========================================================
+def _as_number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _finish(base: dict, issues: list, checks_score: float, completeness_score: float, summary: str) -> dict:
+    score = round((checks_score + completeness_score) / 2)
+    if score >= 85:
+        status = "Validated ✅"
+    elif score >= 60:
+        status = "Needs Review ⚠️"
+    else:
+        status = "Failed ❌"
+    return {**base, "issues": issues, "score": score, "summary": summary, "status": status}
+
+
+def _full_prompt(document_type: str, extracted_fields: dict, required_fields) -> str:
+    return f"""
 You are validating a financial term sheet.
 
 Document Type: {document_type}
@@ -144,7 +247,7 @@ Extracted Fields:
 {json.dumps(extracted_fields, indent=2)}
 
 Required Fields:
-{json.dumps(required_fields, indent=2)}
+{json.dumps(list(required_fields), indent=2)}
 
 Perform:
 - Format checking
@@ -161,47 +264,24 @@ Return ONLY valid JSON:
 }}
 """
 
-    headers = {"Content-Type": "application/json"}
-    payload = {"contents": [{"parts": [{"text": prompt}]}]}
-
-    log("Sending deep validation request to Gemini...")
-
-    resp = requests.post(GEMINI_URL, headers=headers, json=payload, timeout=60)
-
-    if resp.status_code != 200:
-        return {
-            "document_type": document_type,
-            "validated_fields": present,
-            "issues": [f"Gemini API error: {resp.status_code}"],
-            "score": round(completeness_score),
-            "summary": "Base validation only.",
-            "status": "Needs Review ⚠️",
-        }
-
-    ai_text = resp.json()["candidates"][0]["content"]["parts"][0]["text"]
-
-    parsed = extract_json(ai_text)
-    if not parsed:
-        return {
-            "document_type": document_type,
-            "validated_fields": present,
-            "issues": ["Could not parse AI deep validation."],
-            "score": round(completeness_score),
-            "summary": "Base validation only.",
-            "status": "Needs Review ⚠️",
-        }
 
-    # ---------------------------------------------------------
-    # Final scoring
-    # ---------------------------------------------------------
-    parsed["score"] = round((parsed.get("score", 0) + completeness_score) / 2)
-    parsed["document_type"] = document_type
+def _undecided_prompt(document_type: str, extracted_fields: dict, undecided: list) -> str:
+    names = {f for u in undecided for f in u["fields"]}
+    values = {f: extracted_fields.get(f) for f in names}
+    checks = "\n".join(f"- {u['rule']} on {u['fields']}: {u['reason']}" for u in undecided)
+    return f"""
+You are validating a financial term sheet ({document_type}).
+Automated checks could not interpret some values. Decide only these checks:
+{checks}
 
-    if parsed["score"] >= 85:
-        parsed["status"] = "Validated ✅"
-    elif parsed["score"] >= 60:
-        parsed["status"] = "Needs Review ⚠️"
-    else:
-        parsed["status"] = "Failed ❌"
+Field values:
+{json.dumps(values, indent=2)}
 
-    return parsed
+Return ONLY valid JSON:
+{{
+  "issues": [],
+  "score": 0,
+  "summary": ""
+}}
+where score (0-100) is the share of these checks that pass.
+"""
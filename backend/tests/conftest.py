@@ -0,0 +1,59 @@
+# backend/tests/conftest.py
+#
+# Tests run against the in-memory Mongo stand-in and import the services
+# the same way main.py does (backend/ on sys.path).
+#
+#   cd backend && pip install -r requirements-dev.txt
+#   cd backend && python -m pytest -q tests
+
+import os
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGODB_URI", "mongomock://tests")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from database.mongodb_config import db  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="session")
+def out_of_tree(tmp_path_factory):
+    """Logs, reports, blobs and cached extractions go under a temp dir, not into the checkout."""
+    from services import blob_store, extraction_cache, parser_service, report_service, validator_service
+    from utils import logger
+
+    out = tmp_path_factory.mktemp("out")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(logger, "LOG_FILE", str(out / "logs.txt"))
+        mp.setattr(parser_service, "LOG_FILE", out / "parser.log")
+        mp.setattr(validator_service, "LOG_FILE", out / "ai_validation.log")
+        mp.setattr(report_service, "REPORTS_DIR", out / "reports")
+        mp.setattr(blob_store, "UPLOAD_ROOT", out / "uploads")
+        mp.setattr(blob_store, "BLOB_DIR", out / "uploads" / "blobs")
+        mp.setattr(blob_store, "TMP_DIR", out / "uploads" / "blobs" / "tmp")
+        mp.setattr(extraction_cache, "CACHE_DIR", out / "cache")
+        yield out
+
+
+@pytest.fixture
+def mongo():
+    """The test database, emptied before each test."""
+    for name in db.delegate.list_collection_names():
+        db.delegate.drop_collection(name)
+    return db
+
+
+@pytest.fixture
+def fresh_extraction_cache(tmp_path, monkeypatch):
+    """services.extraction_cache with empty tiers and counters, on disk under tmp_path."""
+    from services import extraction_cache
+
+    monkeypatch.setattr(extraction_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(extraction_cache, "DISK_ENABLED", True)
+    monkeypatch.setattr(extraction_cache, "_memory", OrderedDict())
+    monkeypatch.setattr(extraction_cache, "_stats", dict.fromkeys(extraction_cache._stats, 0))
+    return extraction_cache
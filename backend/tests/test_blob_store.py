@@ -0,0 +1,131 @@
+# backend/tests/test_blob_store.py
+
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services import blob_store
+
+
+@pytest.fixture
+def store(mongo, tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "UPLOAD_ROOT", tmp_path)
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(blob_store, "TMP_DIR", tmp_path / "blobs" / "tmp")
+    return tmp_path
+
+
+def _blob(data: bytes) -> blob_store.Blob:
+    return blob_store.store_stream(io.BytesIO(data))
+
+
+def _record(mongo, blob, **doc):
+    async def insert():
+        result = await mongo["uploads"].insert_one(
+            {"path": blob.path, "content_hash": blob.sha256, "status": "parsed", **doc}
+        )
+        await blob_store.add_ref(blob)
+        return str(result.inserted_id)
+    return asyncio.run(insert())
+
+
+def _refs(mongo, sha) -> int:
+    return (asyncio.run(mongo[blob_store.REFS].find_one({"_id": sha})) or {}).get("refs", 0)
+
+
+def test_deleting_uploads_releases_the_shared_blob(store, mongo):
+    from main import app
+
+    client = TestClient(app)
+    blob = _blob(b"%PDF-1.4 shared")
+    first, second = _record(mongo, blob), _record(mongo, blob)
+    assert _refs(mongo, blob.sha256) == 2
+
+    assert client.delete(f"/api/uploads/{first}").json() == {"deleted": first}
+    assert _refs(mongo, blob.sha256) == 1
+    assert asyncio.run(blob_store.gc(delete=True, grace_seconds=0))["orphans"] == []
+
+    assert client.delete(f"/api/uploads/{second}").status_code == 200
+    assert client.delete(f"/api/uploads/{second}").status_code == 404
+    assert _refs(mongo, blob.sha256) == 0
+    report = asyncio.run(blob_store.gc(delete=True, grace_seconds=0))
+    assert report["orphans"] == [blob.path] and report["deleted"] == 1
+
+
+def test_uploads_being_parsed_cannot_be_deleted(store, mongo):
+    from main import app
+
+    blob = _blob(b"%PDF-1.4 busy")
+    upload_id = _record(mongo, blob, status="processing")
+    assert TestClient(app).delete(f"/api/uploads/{upload_id}").status_code == 409
+    assert _refs(mongo, blob.sha256) == 1
+
+
+def test_gc_checks_candidates_in_batches(store, mongo, monkeypatch):
+    monkeypatch.setattr(blob_store, "GC_BATCH", 2)
+    live = [_blob(b"live %d" % i) for i in range(3)]
+    orphans = [_blob(b"orphan %d" % i) for i in range(2)]
+    for blob in live:
+        _record(mongo, blob)
+    # Counter lost: the record still points at the blob
+    drifted = _blob(b"drifted")
+    asyncio.run(mongo["uploads"].insert_one({"path": drifted.path, "content_hash": drifted.sha256}))
+    # Pre-blob_store uploads: referenced by an un-normalized path, or not at all
+    legacy = store / "uploaded_live.pdf"
+    legacy.write_bytes(b"legacy")
+    asyncio.run(mongo["uploads"].insert_one({"path": str(store / "routes" / ".." / legacy.name)}))
+    (store / "uploaded_gone.pdf").write_bytes(b"gone")
+
+    report = asyncio.run(blob_store.gc(grace_seconds=0))
+
+    assert report["scanned"] == 8
+    assert sorted(report["orphans"]) == sorted([b.path for b in orphans] + [str(store / "uploaded_gone.pdf")])
+    assert report["recounted"] == 1 and _refs(mongo, drifted.sha256) == 1
+
+
+def test_gc_spares_a_blob_deduplicated_while_it_runs(store, mongo, monkeypatch):
+    data = b"%PDF-1.4 racing"
+    blob = _blob(data)
+    real_live_references = blob_store._live_references
+
+    async def upload_meanwhile(batch):
+        result = await real_live_references(batch)
+        # A dedup upload of the same bytes lands after gc read the refcounts
+        again = _blob(data)
+        await mongo["uploads"].insert_one({"path": again.path, "content_hash": again.sha256})
+        await blob_store.add_ref(again)
+        return result
+
+    monkeypatch.setattr(blob_store, "_live_references", upload_meanwhile)
+    report = asyncio.run(blob_store.gc(delete=True, grace_seconds=0))
+
+    assert report["deleted"] == 0 and report["orphans"] == []
+    assert open(blob.path, "rb").read() == data
+    assert not list((store / "blobs").rglob("*" + blob_store.TOMBSTONE))
+    assert _refs(mongo, blob.sha256) == 1
+
+
+def test_upload_after_the_tombstone_writes_a_fresh_copy(store, mongo):
+    data = b"%PDF-1.4 tombstoned"
+    blob = _blob(data)
+    os.replace(blob.path, blob.path + ".0000" + blob_store.TOMBSTONE)
+
+    again = _blob(data)
+    assert again.path == blob.path and not again.deduplicated
+    assert open(again.path, "rb").read() == data
+
+
+def test_leftover_tombstones_are_restored_or_removed(store, mongo):
+    kept, dropped = _blob(b"%PDF-1.4 kept"), _blob(b"%PDF-1.4 dropped")
+    _record(mongo, kept)
+    for blob in (kept, dropped):
+        os.replace(blob.path, blob.path + ".dead" + blob_store.TOMBSTONE)
+
+    report = asyncio.run(blob_store.gc(delete=True, grace_seconds=0))
+
+    assert os.path.exists(kept.path) and not os.path.exists(dropped.path)
+    assert report["deleted"] == 1
+    assert not list((store / "blobs").rglob("*" + blob_store.TOMBSTONE))
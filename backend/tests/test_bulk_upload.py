@@ -0,0 +1,71 @@
+# backend/tests/test_bulk_upload.py
+
+import asyncio
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from services import blob_store, bulk_upload_service, s3_service
+
+
+def _batch(n: int) -> list:
+    batch = []
+    for i in range(n):
+        sha = f"{i}" * 64
+        blob = blob_store.Blob(sha, f"/blobs/{sha}.pdf", 10, deduplicated=False)
+        batch.append({"_id": ObjectId(), "filename": f"f{i}.pdf", "status": "parsed",
+                      "path": blob.path, "content_hash": sha, "blob": blob})
+    # A file that failed before it was stored has no record to write
+    batch.append({"_id": ObjectId(), "filename": "bad.pdf", "status": "failed", "error": "bad zip"})
+    return batch
+
+
+def test_partial_bulk_write_fails_only_the_rejected_records(mongo, monkeypatch):
+    collection = type(mongo["uploads"])
+    real_insert_many = collection.insert_many
+
+    async def partial(self, records, ordered=True, **kwargs):
+        await real_insert_many(self, [r for i, r in enumerate(records) if i != 1], ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}],
+                              "nInserted": len(records) - 1})
+
+    refs, replicated = [], []
+
+    async def add_refs(blobs):
+        refs.extend(b.sha256 for b in blobs)
+
+    monkeypatch.setattr(collection, "insert_many", partial)
+    monkeypatch.setattr(blob_store, "add_refs", add_refs)
+    monkeypatch.setattr(s3_service, "schedule_upload", lambda oid, path, sha: replicated.append(sha))
+
+    batch = _batch(3)
+    asyncio.run(bulk_upload_service._save_batch(batch, "bulk"))
+
+    assert [d["status"] for d in batch] == ["parsed", "failed", "parsed", "failed"]
+    assert "E11000" in batch[1]["error"]
+    assert [bool(d.get("stored")) for d in batch] == [True, False, True, False]
+    assert refs == replicated == ["0" * 64, "2" * 64]
+    assert asyncio.run(mongo["uploads"].count_documents({})) == 2
+
+
+def test_unknown_insert_outcome_is_checked_against_mongo(mongo, monkeypatch):
+    collection = type(mongo["uploads"])
+    real_insert_many = collection.insert_many
+
+    async def dropped(self, records, ordered=True, **kwargs):
+        await real_insert_many(self, records[:1], ordered=ordered)
+        raise ConnectionError("connection reset")
+
+    refs = []
+
+    async def add_refs(blobs):
+        refs.extend(b.sha256 for b in blobs)
+
+    monkeypatch.setattr(collection, "insert_many", dropped)
+    monkeypatch.setattr(blob_store, "add_refs", add_refs)
+
+    batch = _batch(2)
+    asyncio.run(bulk_upload_service._save_batch(batch, "bulk"))
+
+    assert [d["status"] for d in batch] == ["parsed", "failed", "failed"]
+    assert refs == ["0" * 64]
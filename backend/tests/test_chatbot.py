@@ -0,0 +1,146 @@
+# backend/tests/test_chatbot.py
+#
+# /api/chatbot/stream end to end: the backend and loadtest.fake_gemini each
+# run under uvicorn on an ephemeral port, so SSE framing and client
+# disconnects go over real sockets.
+
+import json
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from loadtest import fake_gemini
+from services import chatbot_cache, llm_client
+
+
+class _Server:
+    def __init__(self, app):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.url = "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.sock]}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("server did not start")
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+        self.sock.close()
+
+
+@pytest.fixture(scope="module")
+def fake():
+    config = fake_gemini.FakeConfig(latency_ms=0, jitter_ms=0, chunk_delay_ms=30, chunk_words=2, seed=1)
+    app = fake_gemini.create_app(config)
+    with _Server(app) as server:
+        server.stats = app.state.stats
+        yield server
+
+
+@pytest.fixture
+def backend(fake, mongo, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(llm_client, "GEMINI_BASE_URL", fake.url + "/v1")
+    monkeypatch.setattr(llm_client, "GEMINI_API_KEY", "test")
+    monkeypatch.setattr(llm_client, "LLM_HTTP2", False)
+    chatbot_cache._memory.clear()
+    with _Server(app) as server:
+        yield server
+
+
+def _events(lines) -> list:
+    """Parses an SSE line stream into [(event, data)]."""
+    events, event, data = [], "message", []
+    for line in lines:
+        if line == "":
+            if data:
+                events.append((event, json.loads("\n".join(data))))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+    return events
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_stream_frames_chunks_then_done(backend, fake):
+    with httpx.stream("POST", backend.url + "/api/chatbot/stream",
+                      json={"query": "What is a knock-in barrier?"}, timeout=10) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.headers["cache-control"] == "no-cache"
+        events = _events(resp.iter_lines())
+
+    *chunks, (last_event, _) = events
+    assert last_event == "done"
+    assert len(chunks) > 1
+    assert all(event == "message" and set(data) == {"text"} for event, data in chunks)
+    answer = "".join(data["text"] for _, data in chunks)
+    assert answer.startswith("This is a simulated answer")
+
+
+def test_completed_answer_is_cached(backend, fake):
+    query = {"query": "Explain the autocall barrier"}
+    with httpx.stream("POST", backend.url + "/api/chatbot/stream", json=query, timeout=10) as resp:
+        streamed = "".join(d["text"] for e, d in _events(resp.iter_lines()) if e == "message")
+    streams = fake.stats["streams"]
+
+    # Same (normalized) question again: one chunk from the cache, no upstream call
+    with httpx.stream("POST", backend.url + "/api/chatbot/stream",
+                      json={"query": "  explain the AUTOCALL barrier?? "}, timeout=10) as resp:
+        events = _events(resp.iter_lines())
+
+    assert events == [("message", {"text": streamed.strip()}), ("done", {})]
+    assert fake.stats["streams"] == streams
+    assert chatbot_cache.stats()["memory_hits"] >= 1
+
+
+def test_client_disconnect_cancels_upstream_and_skips_cache(backend, fake):
+    query = "Describe the coupon schedule in detail"
+    cancelled = fake.stats["streams_cancelled"]
+    completed = fake.stats["streams_completed"]
+
+    with httpx.stream("POST", backend.url + "/api/chatbot/stream",
+                      json={"query": query}, timeout=10) as resp:
+        for line in resp.iter_lines():
+            if line.startswith("data:"):
+                break   # leave after the first chunk
+
+    assert _wait_for(lambda: fake.stats["streams_cancelled"] > cancelled)
+    assert fake.stats["streams_completed"] == completed
+    assert chatbot_cache.normalize(query) not in chatbot_cache._memory
+
+
+def test_clients_cannot_set_the_cache_ttl(backend, fake):
+    query = "What is the strike price?"
+    with httpx.stream("POST", backend.url + "/api/chatbot/stream",
+                      json={"query": query, "ttl": 10 ** 9}, timeout=10) as resp:
+        assert resp.status_code == 200
+        list(resp.iter_lines())
+
+    key = chatbot_cache.normalize(query)
+    assert _wait_for(lambda: key in chatbot_cache._memory)
+    _, expires = chatbot_cache._memory[key]
+    assert expires <= time.time() + chatbot_cache.DEFAULT_TTL
@@ -0,0 +1,116 @@
+# backend/tests/test_compare.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from benchmarks.corpus import write_pdf
+from services import extraction_cache, parser_service, termsheet_compare_service
+from utils import pdf_utils
+
+IDEAL = ["Company Name: Acme Robotics", "Amount: Rs. 5,00,000", "Tenure: 36 months", "Interest: 11 %"]
+INPUT = ["Company Name: Acme Robotics", "Amount: Rs. 6,00,000", "Tenure: 36 months"]
+
+
+@pytest.fixture
+def client(mongo, fresh_extraction_cache):
+    from main import app
+
+    termsheet_compare_service.clear_cache()
+    return TestClient(app)
+
+
+def _pdf(tmp_path, name, lines):
+    path = tmp_path / name
+    write_pdf(path, [lines])
+    return path
+
+
+def _files(ideal, given):
+    return {"ideal_file": ("ideal.pdf", ideal.read_bytes(), "application/pdf"),
+            "input_file": ("input.pdf", given.read_bytes(), "application/pdf")}
+
+
+def _compare(client, files=None, data=None):
+    return client.post("/api/compare/termsheets", files=files, data=data)
+
+
+def test_compare_files_then_hit_the_compare_cache(client, tmp_path):
+    ideal, given = _pdf(tmp_path, "ideal.pdf", IDEAL), _pdf(tmp_path, "input.pdf", INPUT)
+
+    first = _compare(client, _files(ideal, given)).json()["comparison"]
+    diff = first["differences"]
+    assert diff["amount"]["status"] == "changed"
+    assert diff["tenure"]["status"] == "same"
+    assert diff["interest_rate"]["status"] == "missing_in_input"
+    assert first["sources"]["ideal"] == {"pages": 1, "truncated": False, "source": "pdf", "cached": False}
+
+    second = _compare(client, _files(ideal, given)).json()["comparison"]
+    assert second["differences"] == diff
+    assert second["sources"]["ideal"]["cached"] and second["sources"]["input"]["cached"]
+
+
+def test_pages_from_the_extraction_cache_are_reused(client, tmp_path, monkeypatch):
+    ideal, given = _pdf(tmp_path, "ideal.pdf", IDEAL), _pdf(tmp_path, "input.pdf", INPUT)
+    key = extraction_cache.make_key(extraction_cache.hash_file(str(ideal)), parser_service.PARSER_VERSION)
+    extraction_cache.put(key, {"pages": ["\n".join(IDEAL)], "document_type": "bank_loan", "fields": {}})
+
+    real_iter_pages = pdf_utils.iter_pages
+    read = []
+    monkeypatch.setattr(pdf_utils, "iter_pages", lambda path, *a: read.append(path) or real_iter_pages(path, *a))
+    result = _compare(client, _files(ideal, given)).json()["comparison"]
+
+    assert result["sources"]["ideal"]["source"] == "extraction_cache"
+    assert result["sources"]["input"]["source"] == "pdf"
+    assert len(read) == 1
+    assert result["ideal_fields"]["interest_rate"] == "11 %"
+
+
+def test_upload_ids_as_inputs(client, mongo, tmp_path):
+    ideal, given = _pdf(tmp_path, "ideal.pdf", IDEAL), _pdf(tmp_path, "input.pdf", INPUT)
+    upload_id = asyncio.run(mongo["uploads"].insert_one({
+        "path": str(ideal), "content_hash": extraction_cache.hash_file(str(ideal)),
+    })).inserted_id
+    legacy_id = asyncio.run(mongo["uploads"].insert_one({"path": str(given)})).inserted_id
+
+    result = _compare(client, data={"ideal_upload_id": str(upload_id),
+                                    "input_upload_id": str(legacy_id)}).json()["comparison"]
+    assert result["ideal_fields"]["amount"] == "Rs. 5,00,000"
+    assert result["input_fields"]["amount"] == "Rs. 6,00,000"
+
+    # The same bytes sent as a file hit the compare cache filled above
+    mixed = _compare(client, files={"input_file": ("x.pdf", ideal.read_bytes(), "application/pdf")},
+                     data={"ideal_upload_id": str(upload_id)}).json()["comparison"]
+    assert mixed["sources"]["input"]["cached"]
+    assert all(d["status"] in ("same", "not_found_in_both") for d in mixed["differences"].values())
+
+
+@pytest.mark.parametrize("upload_id", [str(ObjectId()), "not-an-id"])
+def test_unknown_upload_id_is_a_404(client, tmp_path, upload_id):
+    given = _pdf(tmp_path, "input.pdf", INPUT)
+    response = _compare(client, files={"input_file": ("input.pdf", given.read_bytes(), "application/pdf")},
+                        data={"ideal_upload_id": upload_id})
+    assert response.status_code == 404
+    assert upload_id in response.json()["detail"]
+
+
+def test_each_side_needs_a_file_or_an_upload_id(client, tmp_path):
+    given = _pdf(tmp_path, "input.pdf", INPUT)
+    response = _compare(client, files={"input_file": ("input.pdf", given.read_bytes(), "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_compare_lookups_leave_the_upload_cache_stats_alone(client, tmp_path):
+    ideal, given = _pdf(tmp_path, "ideal.pdf", IDEAL), _pdf(tmp_path, "input.pdf", INPUT)
+    key = extraction_cache.make_key(extraction_cache.hash_file(str(ideal)), parser_service.PARSER_VERSION)
+    extraction_cache.put(key, {"pages": ["\n".join(IDEAL)], "document_type": "bank_loan", "fields": {}})
+    before = client.get("/api/upload/cache/stats").json()
+
+    result = _compare(client, _files(ideal, given)).json()["comparison"]
+
+    assert result["sources"]["ideal"]["source"] == "extraction_cache"
+    after = client.get("/api/upload/cache/stats").json()
+    assert {k: after[k] for k in ("memory_hits", "disk_hits", "misses", "hit_rate")} == \
+        {k: before[k] for k in ("memory_hits", "disk_hits", "misses", "hit_rate")}
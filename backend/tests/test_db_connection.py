@@ -0,0 +1,38 @@
+# backend/tests/test_db_connection.py
+
+import asyncio
+
+from pymongo.errors import CollectionInvalid
+
+from database.collections_init import COLLECTIONS, INDEXES, QUERY_PATTERNS, init_collections
+
+
+def test_init_collections_creates_collections_and_indexes(mongo):
+    timings = asyncio.run(init_collections(mongo))
+    assert set(COLLECTIONS) <= set(asyncio.run(mongo.list_collection_names()))
+    assert "validation_results.fingerprint_upload_unique" in timings
+
+
+def test_every_query_pattern_has_an_index_to_use():
+    # mongomock cannot explain(); check that each filter (every $or branch)
+    # or sort leads with _id or with the first key of one of the indexes
+    for name, collection, query, sort in QUERY_PATTERNS:
+        leading = {keys[0][0] for keys, _ in INDEXES.get(collection, [])} | {"_id"}
+        branches = query.get("$or", [{}])
+        for branch in branches:
+            fields = {k for k in {**query, **branch} if k != "$or"}
+            fields |= {field for field, _ in sort or []}
+            assert fields & leading, f"{name}: no index leads with any of {sorted(fields)}"
+
+
+def test_init_collections_tolerates_a_concurrent_create(mongo, monkeypatch):
+    real_create = type(mongo).create_collection
+
+    async def racing_create(self, name, **kwargs):
+        # Another worker wins the race for every collection
+        await real_create(self, name, **kwargs)
+        raise CollectionInvalid(f"collection {name} already exists")
+
+    monkeypatch.setattr(type(mongo), "create_collection", racing_create)
+    timings = asyncio.run(init_collections(mongo))
+    assert "validation_results.fingerprint_upload_unique" in timings
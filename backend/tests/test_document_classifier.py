@@ -0,0 +1,99 @@
+# backend/tests/test_document_classifier.py
+
+import pytest
+
+from services import document_classifier, llm_client, parser_service
+
+
+@pytest.fixture
+def no_gemini(monkeypatch):
+    def unexpected(prompt, **kwargs):
+        raise AssertionError("Gemini should not be called")
+
+    monkeypatch.setattr(llm_client, "generate_sync", unexpected)
+
+
+def test_exact_tie_goes_to_the_first_type_in_the_keyword_file(no_gemini):
+    # Underlying (structured_note, 1.0) vs Buyer (m_and_a, 1.0)
+    text = "Buyer: Acme. Underlying: Euro Stoxx 50"
+    result = document_classifier.classify(text)
+
+    assert result.scores["structured_note"] == result.scores["m_and_a"] == 1.0
+    assert result.doc_type == "structured_note"
+    assert result.margin == 0.0 and not result.ambiguous
+    assert parser_service.classify_doc(text) == "structured_note"
+
+
+def test_ties_are_ambiguous_only_below_a_configured_margin():
+    text = "Buyer: Acme. Underlying: Euro Stoxx 50"
+    assert document_classifier.classify(text, min_margin=0.2).ambiguous
+    assert not document_classifier.classify("ISIN Autocall Buyer", min_margin=0.2).ambiguous
+
+
+def test_weighted_scores_count_each_keyword_once():
+    text = "ISIN: XS123. Autocall barrier. Autocall again. Loans from the Buyer"
+    result = document_classifier.classify(text)
+
+    assert result.scores["structured_note"] == 5.0     # ISIN 2 + Autocall 2 + Barrier 1
+    assert result.scores["venture_debt"] == 1.0        # "Loans" folds to "Loan"
+    assert result.scores["m_and_a"] == 1.0
+    assert result.doc_type == "structured_note"
+    assert result.margin == 0.8                         # (5 - 1) / 5
+    assert result.matched["structured_note"] == ["Autocall", "Barrier", "ISIN"]
+
+
+def test_keywords_match_whole_tokens_and_phrases():
+    assert document_classifier.classify("Safety covenants apply").scores["startup_equity"] == 0
+    assert document_classifier.classify("purchase\nprice").scores["m_and_a"] == 2.0
+    assert document_classifier.classify("price purchase").scores["m_and_a"] == 0
+
+
+def test_no_keywords_is_ambiguous_and_asks_gemini(monkeypatch):
+    prompts = []
+
+    def gemini(prompt, **kwargs):
+        prompts.append(prompt)
+        return " Bank Loan \n"
+
+    monkeypatch.setattr(llm_client, "generate_sync", gemini)
+    result = document_classifier.classify("Memorandum of understanding")
+
+    assert result.ambiguous and result.doc_type == "unknown" and result.margin == 0.0
+    assert parser_service.classify_doc("Memorandum of understanding") == "bank_loan"
+    assert len(prompts) == 1
+
+
+@pytest.mark.parametrize("reply", ["not a category", TimeoutError("Gemini timed out")])
+def test_unusable_gemini_reply_keeps_the_heuristic_guess(monkeypatch, reply):
+    calls = []
+
+    def gemini(prompt, **kwargs):
+        calls.append(prompt)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(llm_client, "generate_sync", gemini)
+    text = "Buyer: Acme. Underlying: Euro Stoxx 50"
+    monkeypatch.setattr(document_classifier, "MIN_MARGIN", 0.2)
+    heuristic = document_classifier.classify(text)
+
+    assert heuristic.ambiguous
+    assert parser_service.classify_doc(text) == heuristic.doc_type == "structured_note"
+    assert len(calls) == 1
+
+
+def test_below_margin_upload_uses_the_combined_call(monkeypatch):
+    calls = []
+
+    def combined(text):
+        calls.append(text)
+        return "m_and_a", {"Buyer": "Acme"}
+
+    monkeypatch.setattr(document_classifier, "MIN_MARGIN", 0.2)
+    monkeypatch.setattr(parser_service, "classify_and_extract", combined)
+    parsed = parser_service.ParsedDocument(path="x.pdf", pages=["Buyer: Acme. Underlying: Euro Stoxx 50"])
+    parser_service.run_pipeline(parsed)
+
+    assert len(calls) == 1
+    assert parsed.doc_type == "m_and_a" and parsed.fields["Buyer"] == "Acme"
@@ -0,0 +1,113 @@
+# backend/tests/test_export_service.py
+
+import asyncio
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from services import export_service
+
+START = datetime(2024, 3, 1)
+
+
+@pytest.fixture
+def client(mongo, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 4)
+    monkeypatch.setattr(export_service, "ZIP_FLUSH_DOCS", 3)
+    return TestClient(app)
+
+
+def _seed(mongo, n=10):
+    docs = [{
+        "_id": ObjectId.from_datetime(START + timedelta(hours=i)),
+        "upload_id": str(ObjectId()),
+        "document_type": "bank_loan",
+        "status": "Failed ❌" if i % 2 else "Needs Review ⚠️",
+        "score": 10 * i,
+        "issues": [f"Missing required fields: ['Borrower']", {"field": "Rate", "note": "x, y"}] if i % 2 else [],
+        "summary": f"summary, {i}",
+        "validated_fields": {"Borrower": "Acme"},
+        "created_at": START + timedelta(hours=i),
+        "version": 1,
+    } for i in range(n)]
+    # Bulk revalidation snapshots are left out unless asked for
+    docs.append({"_id": ObjectId(), "upload_id": "r", "status": "Failed ❌", "revalidation": True,
+                 "created_at": START})
+    asyncio.run(mongo["validation_results"].insert_many(docs))
+    return docs[:n]
+
+
+def test_csv_export(client, mongo):
+    docs = _seed(mongo)
+    response = client.get("/api/export/batch", params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="validations_')
+    assert response.headers["content-disposition"].endswith('.csv"')
+
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header == export_service.CSV_COLUMNS
+    assert [r[0] for r in rows] == [str(d["_id"]) for d in reversed(docs)]
+    newest = dict(zip(header, rows[0]))
+    assert newest["status"] == "Failed ❌" and newest["score"] == "90"
+    assert newest["issue_count"] == "2"
+    assert newest["issues"] == 'Missing required fields: [\'Borrower\'] | {"field": "Rate", "note": "x, y"}'
+    assert newest["summary"] == "summary, 9"
+    assert newest["created_at"] == "2024-03-01T09:00:00"
+
+
+def test_csv_is_streamed_in_batches(mongo, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 4)
+    _seed(mongo)
+
+    async def chunks():
+        return [c async for c in export_service.stream_csv({"revalidation": {"$ne": True}})]
+
+    parts = asyncio.run(chunks())
+    assert len(parts) == 1 + 3          # header, then 4 + 4 + 2 rows
+    assert [p.count("\r\n") for p in parts[1:]] == [4, 4, 2]
+
+
+def test_zip_export(client, mongo):
+    docs = _seed(mongo, 7)
+    response = client.get("/api/export/batch", params={"format": "zip", "status": "Failed ❌"})
+
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["content-disposition"].endswith('.zip"')
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        report = json.loads(zf.read(names[0]))
+
+    failed = [d for d in reversed(docs) if d["status"] == "Failed ❌"]
+    assert names == [f"{d['_id']}.json" for d in failed]
+    assert report["_id"] == str(failed[0]["_id"]) and report["score"] == 50
+
+
+def test_revalidation_snapshots_export_separately(client, mongo):
+    _seed(mongo, 2)
+    lines = client.get("/api/export/batch", params={"revalidation": "true"}).text.splitlines()
+    assert [json.loads(line)["upload_id"] for line in lines] == ["r"]
+
+
+def test_zip_is_flushed_every_few_reports(mongo, monkeypatch):
+    monkeypatch.setattr(export_service, "ZIP_FLUSH_DOCS", 3)
+    _seed(mongo, 7)
+
+    async def chunks():
+        return [c async for c in export_service.stream_zip({"revalidation": {"$ne": True}})]
+
+    parts = asyncio.run(chunks())
+    assert len(parts) == 3 + 1          # 3 + 3 + 1 reports, then the central directory
+    assert all(parts)
+    with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zf:
+        assert len(zf.namelist()) == 7
@@ -0,0 +1,84 @@
+# backend/tests/test_extraction_cache.py
+
+import copy
+
+import pytest
+
+from benchmarks.corpus import write_pdf
+from services import extraction_cache, llm_client, parser_service, schema_registry
+
+ENTRY = {"pages": ["Borrower: Acme"], "document_type": "bank_loan", "fields": {"Borrower": "Acme"}}
+REPLY = '{"document_type": "bank_loan", "fields": {"Borrower": "Acme Corp", "Lender": "First Bank"}}'
+
+
+@pytest.fixture
+def cache(fresh_extraction_cache):
+    return fresh_extraction_cache
+
+
+def _key(cache, content_hash="a" * 64):
+    return cache.make_key(content_hash, parser_service.PARSER_VERSION)
+
+
+def test_memory_hit_returns_a_private_copy(cache):
+    key = _key(cache)
+    stored = copy.deepcopy(ENTRY)
+    cache.put(key, stored)
+    stored["fields"]["Lender"] = "added after put"
+
+    first = cache.get(key)
+    first["fields"]["Borrower"] = "changed"
+    first["pages"].append("extra page")
+
+    assert cache.get(key) == ENTRY
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_disk_hit_after_memory_is_cleared(cache):
+    key = _key(cache)
+    cache.put(key, ENTRY)
+    cache.clear_memory()
+
+    assert cache.get(key) == ENTRY
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.get(key) == ENTRY
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_schema_change_misses(cache, monkeypatch):
+    cache.put(_key(cache), ENTRY)
+    monkeypatch.setattr(schema_registry, "version", lambda: "next-schema")
+
+    assert cache.get(_key(cache)) is None
+    assert cache.stats()["misses"] == 1
+
+
+def _pdf(tmp_path):
+    path = tmp_path / "memo.pdf"
+    write_pdf(path, [["Memorandum", "Counterparty: Acme Corp"]])   # no classifier keywords
+    return str(path)
+
+
+def test_failed_llm_call_is_not_cached(cache, tmp_path, monkeypatch):
+    path = _pdf(tmp_path)
+    calls = []
+
+    def down(prompt, **kwargs):
+        calls.append(prompt)
+        raise TimeoutError("Gemini timed out")
+
+    monkeypatch.setattr(llm_client, "generate_sync", down)
+    parsed = parser_service.parse_document(path)
+
+    assert parsed.llm_failed and not parsed.error
+    assert cache.stats()["stores"] == 0
+    assert not list(cache.CACHE_DIR.rglob("*.json"))
+
+    # Gemini is back: the same bytes are parsed again and cached
+    monkeypatch.setattr(llm_client, "generate_sync", lambda prompt, **kwargs: REPLY)
+    parsed = parser_service.parse_document(path)
+
+    assert not parsed.llm_failed and not parsed.cache_hit
+    assert parsed.fields["Lender"] == "First Bank"
+    assert cache.stats()["stores"] == 1
+    assert parser_service.parse_document(path).cache_hit
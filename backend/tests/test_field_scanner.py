@@ -0,0 +1,62 @@
+# backend/tests/test_field_scanner.py
+#
+# The shared scanner against the per-field regex loops it replaced
+# (kept in benchmarks.bench_field_scanner as the reference).
+
+import random
+
+import pytest
+
+from benchmarks.bench_field_scanner import FILLER, SAMPLE, legacy_extract_regex, legacy_scan_lines
+from utils import field_scanner
+
+EXTRA = [
+    "",
+    "   ",
+    "Company overview: no figures here",
+    "Loan of ₹ 2,50,000 at 9% for 2 years",
+    "Signed on December 15, 2025 by INR 10 holders",
+    "Coupon: 7.25 % p.a. payable 10/12/2024",
+    "ISIN - US0378331005",
+    "Knock in barrier 60%",
+    "İstanbul Issuer: Delta Bank",     # lower-casing changes the length
+    "Tenure 18 month",
+    "Strike level",
+    "COMPANY NAME: SHOUTY LTD",
+]
+
+CASES = [
+    "",
+    SAMPLE,
+    FILLER * 50 + SAMPLE,
+    SAMPLE.upper(),
+    "\n".join(EXTRA),
+    "Equity\nEquity: 10%",            # first label hit has no value on its line
+]
+
+
+def _shuffled(seed: int) -> str:
+    rnd = random.Random(seed)
+    lines = SAMPLE.splitlines() + EXTRA + [FILLER.strip()] * 5
+    rnd.shuffle(lines)
+    return "\n".join(lines)
+
+
+@pytest.mark.parametrize("text", CASES + [_shuffled(seed) for seed in range(25)])
+def test_scan_lines_matches_the_old_line_loops(text):
+    assert field_scanner.scan_lines(text) == legacy_scan_lines(text)
+
+
+@pytest.mark.parametrize("text", CASES + [_shuffled(seed) for seed in range(25)])
+def test_scan_labeled_matches_re_search_per_field(text):
+    assert field_scanner.scan_labeled(text) == legacy_extract_regex(text)
+
+
+def test_scan_lines_fields():
+    assert field_scanner.scan_lines(SAMPLE) == {
+        "company_name": "Company Name: Acme Robotics Pvt Ltd",
+        "amount": "Rs. 5,00,00,000",
+        "date": "12 December 2025",
+        "tenure": "36 months",
+        "interest_rate": "11.5 %",
+    }
@@ -0,0 +1,84 @@
+# backend/tests/test_llm_batcher.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services import llm_batcher
+
+
+class SlowHandler:
+    """Stub for the combined Gemini call: sleeps, records overlap."""
+
+    def __init__(self, delay=0.2, fail_batches=False):
+        self.delay = delay
+        self.fail_batches = fail_batches
+        self.active = self.peak = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls.append(list(items))
+        try:
+            time.sleep(self.delay)
+            if self.fail_batches and len(items) > 1:
+                raise ValueError("batch reply covered ids []")
+            return [f"ok:{item}" for item in items]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _submit_all(batcher, items):
+    with ThreadPoolExecutor(max_workers=len(items)) as pool:
+        return list(pool.map(batcher.submit, items))
+
+
+def test_batches_run_concurrently(monkeypatch):
+    monkeypatch.setattr(llm_batcher, "BATCH_ENABLED", True)
+    handler = SlowHandler()
+    batcher = llm_batcher.MicroBatcher(handler, name="test", max_batch=2, window_ms=20, max_in_flight=2)
+
+    start = time.monotonic()
+    results = _submit_all(batcher, list(range(4)))
+    elapsed = time.monotonic() - start
+
+    assert results == [f"ok:{i}" for i in range(4)]
+    assert len(handler.calls) >= 2
+    assert handler.peak == 2
+    assert elapsed < handler.delay * len(handler.calls)
+
+
+def test_in_flight_calls_are_bounded(monkeypatch):
+    monkeypatch.setattr(llm_batcher, "BATCH_ENABLED", True)
+    handler = SlowHandler(delay=0.05)
+    batcher = llm_batcher.MicroBatcher(handler, name="test", max_batch=2, window_ms=0, max_in_flight=2)
+
+    assert _submit_all(batcher, list(range(12))) == [f"ok:{i}" for i in range(12)]
+    assert handler.peak <= 2
+
+
+def test_failed_batch_falls_back_per_item_on_the_callers_thread(monkeypatch):
+    monkeypatch.setattr(llm_batcher, "BATCH_ENABLED", True)
+    handler = SlowHandler(delay=0.1, fail_batches=True)
+    threads = []
+
+    def fallback(item):
+        threads.append(threading.current_thread().name)
+        return f"single:{item}"
+
+    batcher = llm_batcher.MicroBatcher(handler, name="test", max_batch=4, window_ms=100,
+                                       max_in_flight=1, fallback=fallback)
+    # Occupy the only slot so the next three requests queue up into one batch
+    first = threading.Thread(target=batcher.submit, args=("warmup",))
+    first.start()
+    time.sleep(0.02)
+    results = _submit_all(batcher, ["a", "b", "c"])
+    first.join()
+
+    assert ["a", "b", "c"] in [sorted(c) for c in handler.calls]
+    assert results == ["single:a", "single:b", "single:c"]
+    assert not any(name.startswith("test") for name in threads)
@@ -0,0 +1,98 @@
+# backend/tests/test_pdf_utils.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.corpus import write_pdf
+from services import document_classifier, parser_service
+from utils import pdf_utils
+
+PAGES = [
+    ["Share Purchase - Heads of Terms", "Buyer: Acme Holdings", "Purchase"],
+    ["Price: USD 40m", "Seller: Beta Ltd"],
+    ["The parties shall negotiate in good faith."],
+    ["Knock-in events are not relevant here."],
+]
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "heads.pdf"
+    write_pdf(path, PAGES)
+    return str(path)
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(pdf_utils, "PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(pdf_utils, "SHARD_PAGES", 1)
+    monkeypatch.setattr(pdf_utils, "PDF_WORKERS", 2)
+    yield
+    pdf_utils.shutdown()
+
+
+def test_streamed_pages_match_extract_pages(pdf, sharded):
+    streamed = [text for _, text in pdf_utils.iter_pages(pdf)]
+    assert streamed == pdf_utils.extract_pages(pdf, parallel=False)
+    assert len(streamed) == len(PAGES)
+
+
+def test_scoring_page_by_page_equals_classify_on_the_joined_text(pdf, sharded):
+    parsed = parser_service.load_document(pdf, classify=True)
+    expected = document_classifier.classify(parsed.text)
+
+    # "Purchase" / "Price" straddle a page break and still match
+    assert "Purchase Price" in parsed.heuristic.matched["m_and_a"]
+    assert parsed.heuristic == expected
+    assert parser_service.load_document(pdf).heuristic is None
+
+
+def test_classifier_sees_the_first_page_before_the_last_is_extracted(pdf, monkeypatch):
+    events = []
+    real_iter_pages = pdf_utils.iter_pages
+
+    def recording(path, parallel=None):
+        for page_no, text in real_iter_pages(path, parallel):
+            events.append(("extracted", page_no))
+            yield page_no, text
+
+    real_feed = document_classifier.KeywordScorer.feed
+
+    def feed(self, text):
+        events.append(("scored", len([e for e in events if e[0] == "scored"])))
+        return real_feed(self, text)
+
+    monkeypatch.setattr(pdf_utils, "iter_pages", recording)
+    monkeypatch.setattr(document_classifier.KeywordScorer, "feed", feed)
+    parser_service.load_document(pdf, classify=True)
+
+    assert events.index(("scored", 0)) < events.index(("extracted", len(PAGES) - 1))
+
+
+def test_pool_is_created_once_under_concurrent_first_use(monkeypatch):
+    created = []
+
+    class SlowPool:
+        def __init__(self, max_workers):
+            time.sleep(0.05)
+            created.append(self)
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(pdf_utils, "ProcessPoolExecutor", SlowPool)
+    monkeypatch.setattr(pdf_utils, "_pool", None)
+    start = threading.Barrier(8)
+
+    def first_use(_):
+        start.wait()
+        return pdf_utils._get_pool()
+
+    with ThreadPoolExecutor(max_workers=8) as workers:
+        pools = set(map(id, workers.map(first_use, range(8))))
+
+    assert len(created) == 1 and len(pools) == 1
+    pdf_utils.shutdown()
@@ -0,0 +1,87 @@
+# backend/tests/test_query_utils.py
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def client(mongo):
+    from main import app
+
+    return TestClient(app)
+
+
+def _seed(mongo, n=7):
+    """n uploads, one a day from START; returns their ids oldest first."""
+    docs = [{
+        "_id": ObjectId.from_datetime(START + timedelta(days=i)),
+        "filename": f"sheet{i}.pdf",
+        "status": "parsed" if i % 2 else "failed",
+        "document_type": "bank_loan",
+        "extracted_fields": {"Borrower": f"Acme {i}"},
+    } for i in range(n)]
+    asyncio.run(mongo["uploads"].insert_many(docs))
+    return [str(d["_id"]) for d in docs]
+
+
+def test_cursor_walks_every_page_newest_first(client, mongo):
+    ids = _seed(mongo)
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/uploads", params=params).json()
+        seen += [item["_id"] for item in page["items"]]
+        pages += 1
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == ids[::-1]
+    assert pages == 3
+
+
+def test_cursor_combines_with_filters_and_date_range(client, mongo):
+    ids = _seed(mongo)
+    params = {"status": "parsed", "since": (START + timedelta(days=2)).isoformat(), "limit": 1}
+    first = client.get("/api/uploads", params=params).json()
+    second = client.get("/api/uploads", params={**params, "cursor": first["next_cursor"]}).json()
+
+    assert [i["_id"] for i in first["items"] + second["items"]] == [ids[5], ids[3]]
+    assert second["has_more"] is False
+
+
+def test_bad_cursor_is_a_400(client, mongo):
+    response = client.get("/api/uploads", params={"cursor": "not-an-object-id"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_default_projection_drops_heavy_fields(client, mongo):
+    _seed(mongo, 1)
+    [item] = client.get("/api/uploads").json()["items"]
+    assert "extracted_fields" not in item
+    assert item["filename"] == "sheet0.pdf"
+    assert item["created_at"].startswith("2024-01-01T00:00:00")
+
+
+def test_fields_param_selects_the_projection(client, mongo):
+    _seed(mongo, 1)
+    [item] = client.get("/api/uploads", params={"fields": "extracted_fields, status"}).json()["items"]
+    assert set(item) == {"_id", "extracted_fields", "status", "created_at"}
+
+
+def test_ndjson_streams_every_match(client, mongo):
+    ids = _seed(mongo)
+    response = client.get("/api/uploads", params={"format": "ndjson", "status": "failed"})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["_id"] for r in rows] == [ids[6], ids[4], ids[2], ids[0]]
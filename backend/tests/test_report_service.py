@@ -0,0 +1,18 @@
+# backend/tests/test_report_service.py
+
+import asyncio
+
+from services import report_service
+
+
+def test_overlapping_writes_publish_one_complete_report(tmp_path):
+    path = tmp_path / "reports" / "abc.json"
+    bodies = [bytes([65 + i]) * 200_000 for i in range(20)]
+
+    async def write_all():
+        await asyncio.gather(*(report_service._write_atomic(path, b) for b in bodies))
+
+    asyncio.run(write_all())
+
+    assert path.read_bytes() in bodies
+    assert [p.name for p in path.parent.iterdir()] == ["abc.json"]
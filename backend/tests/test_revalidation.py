@@ -0,0 +1,131 @@
+# backend/tests/test_revalidation.py
+
+import asyncio
+
+from bson import ObjectId
+
+from services import revalidation_service, validator_service
+
+EDGE_FIELDS = {
+    "Company Name": "Acme Ltd",
+    "Investor": 0,
+    "Investment Amount": [],
+    "Valuation (Pre-Money)": " ",
+    "Valuation (Post-Money)": False,
+    "Equity to be Issued": None,
+    "Date": "",
+}
+
+
+def _upload(fields: dict, doc_type: str = "startup_equity") -> dict:
+    return {"_id": ObjectId(), "document_type": doc_type, "extracted_fields": fields}
+
+
+def _expected(fields: dict, doc_type: str) -> dict:
+    result = asyncio.run(validator_service.validate_fields(fields, doc_type, deep_check=False))
+    return {k: result[k] for k in ("validated_fields", "issues", "score", "summary", "status")}
+
+
+def test_batch_scores_match_validate_fields_on_edge_values():
+    uploads = [
+        _upload(EDGE_FIELDS),
+        _upload({}),
+        _upload({"Company Name": "Acme", "Investor": "Fund I", "Investment Amount": "$2M",
+                 "Valuation (Pre-Money)": "$8M", "Valuation (Post-Money)": "$10M",
+                 "Equity to be Issued": "20%", "Date": "2024-01-05"}),
+        _upload({"ISIN": "US0378331005", "Issuer": 0, "Date": "5 Jan 2024"}, "unknown"),
+        _upload('{"Investor": "Fund I", "Investment Amount": 0}'),
+    ]
+    results = {r["upload_id"]: r for r in revalidation_service.score_uploads(uploads)}
+    assert len(results) == len(uploads)
+    for upload in uploads:
+        result = results[str(upload["_id"])]
+        expected = _expected(revalidation_service._fields(upload), upload["document_type"])
+        assert {k: result[k] for k in expected} == expected
+
+
+def test_edge_values_count_as_missing():
+    [result] = revalidation_service.score_batch("startup_equity", [_upload(EDGE_FIELDS)])
+    assert result["score"] == 29
+    assert result["summary"] == "2/7 required fields present."
+    assert result["validated_fields"] == {"Company Name": "Acme Ltd", "Valuation (Pre-Money)": " "}
+
+
+def test_presence_matrix_shape():
+    required = ("a", "b", "c")
+    mask = revalidation_service.presence_matrix([{"a": 1, "b": 0}, {"c": "x"}], required)
+    assert mask.dtype == bool
+    assert mask.tolist() == [[True, False, False], [False, False, True]]
+    assert revalidation_service.presence_matrix([], required).shape == (0, 3)
+
+
+def test_snapshots_stay_out_of_stats_and_listings(mongo):
+    from datetime import datetime
+
+    from routes.data_routes import get_all_validations
+    from services import stats_service
+
+    async def scenario():
+        upload_id = str(ObjectId())
+        now = datetime.utcnow()
+        await mongo["validation_results"].insert_one(
+            {"upload_id": upload_id, "document_type": "bank_loan", "status": "Failed ❌",
+             "score": 40, "issues": ["x"], "created_at": now})
+        await mongo["validation_results"].insert_one(
+            {"upload_id": upload_id, "document_type": "bank_loan", "status": "Needs Review ⚠️",
+             "score": 70, "issues": [], "created_at": now, "revalidation": True})
+        counters = await stats_service.rebuild()
+        listed = await get_all_validations(limit=10, format="json", revalidation=False)
+        snapshots = await get_all_validations(limit=10, format="json", revalidation=True)
+        return counters, listed, snapshots
+
+    counters, listed, snapshots = asyncio.run(scenario())
+    assert counters["total"] == 1
+    assert counters["by_status"] == {"failed": 1}
+    assert [v["status"] for v in listed["items"]] == ["Failed ❌"]
+    assert [v["status"] for v in snapshots["items"]] == ["Needs Review ⚠️"]
+
+
+def test_only_one_worker_claims_a_job(mongo):
+    async def scenario():
+        job = await revalidation_service.create_job()
+        first, second = await asyncio.gather(
+            revalidation_service.claim(job["_id"]), revalidation_service.claim(job["_id"])
+        )
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert (first is None) != (second is None)
+    claimed = first or second
+    assert claimed["state"] == "running"
+    assert claimed["owner"] == revalidation_service.WORKER_ID
+
+
+def test_stale_lease_can_be_taken_over(mongo):
+    from datetime import datetime, timedelta
+
+    async def scenario():
+        job = await revalidation_service.create_job()
+        fresh = datetime.utcnow()
+        await mongo["revalidation_jobs"].update_one(
+            {"_id": job["_id"]}, {"$set": {"state": "running", "owner": "other", "heartbeat": fresh}})
+        live = await revalidation_service.claim(job["_id"])
+        resumed = await revalidation_service._requeue(job["_id"])
+
+        stale = fresh - timedelta(seconds=revalidation_service.REVALIDATE_LEASE_S + 1)
+        await mongo["revalidation_jobs"].update_one(
+            {"_id": job["_id"]}, {"$set": {"heartbeat": stale}})
+        taken = await revalidation_service.claim(job["_id"])
+        return live, resumed, taken
+
+    live, resumed, taken = asyncio.run(scenario())
+    assert live is None
+    assert resumed is False
+    assert taken["owner"] == revalidation_service.WORKER_ID
+
+
+def test_presence_matrix_agrees_with_is_present():
+    values = ["", " ", "0", 0, 0.0, float("nan"), None, False, True, [], [0], {}, {"a": 1}, (), "x"]
+    rows = [{"v": value} for value in values] + [{}]
+    mask = revalidation_service.presence_matrix(rows, ("v",))
+    assert mask[:, 0].tolist() == [validator_service.is_present(row.get("v")) for row in rows]
@@ -0,0 +1,61 @@
+# backend/tests/test_rules_engine.py
+
+import asyncio
+
+import pytest
+
+from services import llm_client, rules_engine, validator_service
+
+
+@pytest.mark.parametrize("value, state", [
+    ("US0378331005", rules_engine.PASS),
+    ("ISIN: US 0378 3310 05", rules_engine.PASS),
+    ("US0378331006", rules_engine.FAIL),     # bad check digit
+    ("0S0378331005", rules_engine.FAIL),     # malformed 12-character code
+    ("US03783310X5", rules_engine.FAIL),
+    ("TBD", rules_engine.UNDECIDED),
+    ("To be allotted", rules_engine.UNDECIDED),
+    ("see annex", rules_engine.UNDECIDED),
+    ("US037833100", rules_engine.UNDECIDED),  # too short to judge
+    ("", rules_engine.SKIP),
+])
+def test_check_isin(value, state):
+    assert rules_engine.check_isin({"ISIN": value}, "ISIN")[0] == state
+
+
+def test_wildcard_rules_do_not_count_as_own_rules():
+    assert rules_engine.has_own_rules("structured_note")
+    assert not rules_engine.has_own_rules("unknown")
+    outcome = rules_engine.evaluate({"ISIN": "US0378331005"}, "unknown")
+    assert outcome.passed == ["isin_check_digit"] and not outcome.own_rules
+
+
+def _deep_check(monkeypatch, fields, doc_type):
+    prompts = []
+
+    async def generate(prompt, **kwargs):
+        prompts.append(prompt)
+        return '{"validated_fields": {}, "issues": [], "score": 90, "summary": "ok"}'
+
+    monkeypatch.setattr(llm_client, "generate", generate)
+    result = asyncio.run(validator_service.validate_fields(fields, doc_type, deep_check=True))
+    return result, prompts
+
+
+def test_unknown_type_with_valid_isin_still_goes_to_gemini(monkeypatch):
+    fields = {"Company Name": "Acme", "Date": "2024-01-05", "Investor": "Fund I",
+              "Issuer": "Acme Bank", "ISIN": "US0378331005", "Issue Date": "2024-01-05"}
+    result, prompts = _deep_check(monkeypatch, fields, "unknown")
+
+    assert len(prompts) == 1 and "Required Fields" in prompts[0]
+    assert result["checks"]["passed"] == ["isin_check_digit"]
+
+
+def test_placeholder_isin_is_left_to_gemini(monkeypatch):
+    fields = {"Issue Date": "2024-01-05", "Redemption Date": "2027-01-05",
+              "Autocall Barrier": "100%", "ISIN": "To be allotted"}
+    result, prompts = _deep_check(monkeypatch, fields, "structured_note")
+
+    assert len(prompts) == 1 and "isin_check_digit" in prompts[0]
+    assert result["checks"]["undecided"] == ["isin_check_digit"]
+    assert not any("ISIN" in issue for issue in result["issues"])
@@ -0,0 +1,163 @@
+# backend/tests/test_s3_service.py
+#
+# S3 offload against moto's in-process S3 (mock_aws); transfers still run
+# on the s3-transfer thread pool.
+
+import asyncio
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from services import s3_service
+
+BUCKET = "termsheets-test"
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3(mongo, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(s3_service, "S3_BUCKET", BUCKET)
+    monkeypatch.setattr(s3_service, "S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(s3_service, "S3_OFFLOAD", True)
+    monkeypatch.setattr(s3_service, "S3_RETRY_DELAY", 0)
+    monkeypatch.setattr(s3_service, "_client", None)
+    with mock_aws():
+        client = s3_service.get_client()
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+        asyncio.run(s3_service.shutdown())
+    s3_service._client = None
+
+
+def _pdf(tmp_path, name="sheet.pdf", size=1024) -> str:
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def _insert(mongo, **doc):
+    return asyncio.run(mongo["uploads"].insert_one(doc)).inserted_id
+
+
+def _find(mongo, doc_id) -> dict:
+    return asyncio.run(mongo["uploads"].find_one({"_id": doc_id}))
+
+
+def test_replicate_records_url_and_key(s3, mongo, tmp_path):
+    path = _pdf(tmp_path)
+    doc_id = _insert(mongo, path=path, s3_error="earlier failure")
+    key = s3_service.upload_key("ab" * 32)
+
+    url = asyncio.run(s3_service.replicate("uploads", doc_id, path, key, content_type="application/pdf"))
+
+    doc = _find(mongo, doc_id)
+    assert url == f"https://{BUCKET}.s3.amazonaws.com/{key}"
+    assert doc["s3_url"] == url and doc["s3_key"] == key
+    assert "s3_error" not in doc
+    head = s3.head_object(Bucket=BUCKET, Key=key)
+    assert head["ContentType"] == "application/pdf"
+    assert head["ContentLength"] == os.path.getsize(path)
+
+
+def test_large_files_go_up_in_concurrent_parts(s3, mongo, tmp_path, monkeypatch):
+    monkeypatch.setattr(s3_service, "S3_MULTIPART_THRESHOLD", 5 * MB)
+    monkeypatch.setattr(s3_service, "S3_MULTIPART_CHUNK", 5 * MB)
+    path = _pdf(tmp_path, size=11 * MB)
+    doc_id = _insert(mongo, path=path)
+
+    asyncio.run(s3_service.replicate("uploads", doc_id, path, "uploads/big.pdf"))
+
+    head = s3.head_object(Bucket=BUCKET, Key="uploads/big.pdf")
+    assert head["ETag"].strip('"').endswith("-3")
+    assert head["ContentLength"] == 11 * MB
+
+
+def test_transient_errors_are_retried(s3, mongo, tmp_path, monkeypatch):
+    path = _pdf(tmp_path)
+    doc_id = _insert(mongo, path=path)
+    real_upload = s3.upload_file
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) < 3:
+            raise ClientError({"Error": {"Code": "SlowDown", "Message": "Reduce your request rate"}},
+                              "PutObject")
+        return real_upload(*args, **kwargs)
+
+    monkeypatch.setattr(s3, "upload_file", flaky)
+    url = asyncio.run(s3_service.replicate("uploads", doc_id, path, "uploads/flaky.pdf"))
+
+    assert len(calls) == 3
+    assert url is not None and _find(mongo, doc_id)["s3_url"] == url
+
+
+def test_exhausted_retries_record_the_error(s3, mongo, tmp_path, monkeypatch):
+    path = _pdf(tmp_path)
+    doc_id = _insert(mongo, path=path)
+    calls = []
+
+    def down(*args, **kwargs):
+        calls.append(1)
+        raise ClientError({"Error": {"Code": "InternalError", "Message": "boom"}}, "PutObject")
+
+    monkeypatch.setattr(s3, "upload_file", down)
+    url = asyncio.run(s3_service.replicate("uploads", doc_id, path, "uploads/down.pdf"))
+
+    doc = _find(mongo, doc_id)
+    assert url is None
+    assert len(calls) == s3_service.S3_TRANSFER_RETRIES
+    assert "InternalError" in doc["s3_error"] and "s3_url" not in doc
+
+
+def test_ensure_local_reads_missing_files_back_from_s3(s3, tmp_path):
+    path = _pdf(tmp_path, size=2 * MB)
+    original = open(path, "rb").read()
+    key = s3_service.upload_key("cd" * 32)
+    s3_service.upload_file(path, key)
+    os.remove(path)
+
+    restored = asyncio.run(s3_service.ensure_local(path, key))
+
+    assert restored == path
+    assert open(path, "rb").read() == original
+    assert not os.path.exists(path + ".s3part")
+
+
+def test_ensure_local_missing_object_is_not_retried(s3, tmp_path, monkeypatch):
+    path = str(tmp_path / "gone.pdf")
+    calls = []
+    real_download = s3.download_file
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return real_download(*args, **kwargs)
+
+    monkeypatch.setattr(s3, "download_file", counted)
+    assert asyncio.run(s3_service.ensure_local(path, "uploads/missing.pdf")) == path
+    assert len(calls) == 1
+    assert not os.path.exists(path) and not os.path.exists(path + ".s3part")
+
+
+def test_resume_pending_replicates_uploads_without_a_copy(s3, mongo, tmp_path):
+    pending = _pdf(tmp_path, "pending.pdf")
+    done = _pdf(tmp_path, "done.pdf")
+    pending_id = _insert(mongo, path=pending, content_hash="1" * 64)
+    done_id = _insert(mongo, path=done, content_hash="2" * 64, s3_url="https://already/there")
+    missing_id = _insert(mongo, path=str(tmp_path / "evicted.pdf"), content_hash="3" * 64)
+
+    async def resume():
+        await s3_service.resume_pending()
+        await asyncio.gather(*s3_service._tasks)
+
+    asyncio.run(resume())
+
+    assert _find(mongo, pending_id)["s3_key"] == s3_service.upload_key("1" * 64)
+    assert _find(mongo, done_id)["s3_url"] == "https://already/there"
+    assert "s3_url" not in _find(mongo, missing_id)
+    keys = [o["Key"] for o in s3.list_objects_v2(Bucket=BUCKET).get("Contents", [])]
+    assert keys == [s3_service.upload_key("1" * 64)]
@@ -0,0 +1,70 @@
+# backend/tests/test_schema_registry.py
+
+import json
+import os
+import shutil
+
+import pytest
+
+from services import extraction_cache, schema_registry
+
+
+@pytest.fixture
+def schemas(tmp_path, monkeypatch):
+    path = tmp_path / "master_schemas.json"
+    shutil.copy(schema_registry.SCHEMA_PATH, path)
+    monkeypatch.setattr(schema_registry, "SCHEMA_PATH", path)
+    monkeypatch.setattr(schema_registry, "_state",
+                        {"mtime": None, "file_version": None, "schemas": {}, "raw": {}})
+    return path
+
+
+def _edit(path, change, bump=1):
+    """Rewrites the file and moves its mtime forward (coarse mtime clocks)."""
+    data = json.loads(path.read_text())
+    change(data)
+    mtime = path.stat().st_mtime
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime + bump, mtime + bump))
+
+
+def test_edit_reloads_and_bumps_only_that_types_version(schemas):
+    loan, note = schema_registry.get("bank_loan"), schema_registry.get("structured_note")
+    file_version = schema_registry.version()
+
+    _edit(schemas, lambda d: d["bank_loan"]["required_fields"].append("Arranger"))
+
+    assert "Arranger" in schema_registry.get("bank_loan").required_set
+    assert schema_registry.get("bank_loan").version != loan.version
+    assert schema_registry.get("structured_note").version == note.version
+    assert schema_registry.version() != file_version
+
+
+def test_schema_change_moves_the_extraction_cache_key(schemas):
+    before = extraction_cache.make_key("a" * 64, "5")
+    _edit(schemas, lambda d: d["bank_loan"]["optional_fields"].append("Agent"))
+    assert extraction_cache.make_key("a" * 64, "5") != before
+
+
+def test_unchanged_mtime_is_not_reread(schemas, monkeypatch):
+    schema_registry.get("bank_loan")
+    reads = []
+    real_read = type(schemas).read_bytes
+    monkeypatch.setattr(type(schemas), "read_bytes", lambda self: reads.append(self) or real_read(self))
+
+    for _ in range(5):
+        schema_registry.get("bank_loan")
+    assert reads == []
+
+
+def test_broken_edit_keeps_the_last_good_schemas(schemas):
+    good = schema_registry.get("bank_loan")
+    mtime = schemas.stat().st_mtime
+    schemas.write_text("{ not json")
+    os.utime(schemas, (mtime + 1, mtime + 1))
+
+    assert schema_registry.get("bank_loan") == good
+
+
+def test_unknown_types_fall_back(schemas):
+    assert schema_registry.get("no_such_type").doc_type == schema_registry.FALLBACK_TYPE
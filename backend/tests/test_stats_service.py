@@ -0,0 +1,130 @@
+# backend/tests/test_stats_service.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+from services import stats_service
+
+
+def _vdoc(status="Failed ❌", score=40, created_at=None) -> dict:
+    return {"document_type": "bank_loan", "status": status, "score": score,
+            "issues": ["x"], "created_at": created_at or datetime.utcnow()}
+
+
+def test_concurrent_first_records_lose_no_increments(mongo):
+    async def scenario():
+        await asyncio.gather(*(stats_service.record_validation(_vdoc()) for _ in range(50)))
+        return await mongo[stats_service.STATS_COLLECTION].find_one({"_id": stats_service.COUNTERS_ID})
+
+    counters = asyncio.run(scenario())
+    assert counters["total"] == 50
+    assert counters["by_type"]["bank_loan"]["by_status"]["failed"] == 50
+
+
+def test_ensure_counters_seeds_from_stored_results_once(mongo):
+    async def scenario():
+        await mongo["validation_results"].insert_many([_vdoc(), _vdoc("Validated ✅", 90)])
+        await stats_service.ensure_counters()
+        await stats_service.record_validation(_vdoc())
+        await stats_service.ensure_counters()   # already seeded: no rebuild
+        return await stats_service.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["totalValidations"] == 3
+
+
+def test_old_day_buckets_are_pruned(mongo, monkeypatch):
+    monkeypatch.setattr(stats_service, "_pruned_through", None)
+    old = datetime.utcnow() - timedelta(days=stats_service.STATS_RETENTION_DAYS + 5)
+
+    async def scenario():
+        await mongo[stats_service.STATS_COLLECTION].insert_one({
+            "_id": stats_service.COUNTERS_ID, "total": 1,
+            "by_day": {stats_service.day_bucket(old): {"total": 1}},
+        })
+        await stats_service.record_validation(_vdoc())
+        return await mongo[stats_service.STATS_COLLECTION].find_one({"_id": stats_service.COUNTERS_ID})
+
+    counters = asyncio.run(scenario())
+    assert list(counters["by_day"]) == [stats_service.day_bucket(datetime.utcnow())]
+    assert counters["total"] == 2
+
+
+def test_by_day_covers_the_last_calendar_days(mongo):
+    now = datetime.utcnow()
+
+    async def scenario():
+        await stats_service.record_validation(_vdoc(created_at=now - timedelta(days=10)))
+        await stats_service.record_validation(_vdoc(created_at=now))
+        return await stats_service.get_stats(days=3)
+
+    by_day = asyncio.run(scenario())["byDay"]
+    assert list(by_day) == [stats_service.day_bucket(now - timedelta(days=i)) for i in (2, 1, 0)]
+    assert [d["total"] for d in by_day.values()] == [0, 0, 1]
+
+
+def _counters(mongo):
+    return mongo[stats_service.STATS_COLLECTION].find_one({"_id": stats_service.COUNTERS_ID})
+
+
+def test_records_during_a_rebuild_are_replayed_once(mongo, monkeypatch):
+    aggregate = stats_service.aggregate_counters
+
+    async def racing_aggregate(cutoff=None):
+        # One result stored before the rebuild began, recorded while it
+        # runs (already in the aggregate), and one stored mid-rebuild
+        counters = await aggregate(cutoff)
+        await stats_service.record_validation(early)
+        late = _vdoc("Validated ✅", 90)
+        await mongo["validation_results"].insert_one(late)
+        await stats_service.record_validation(late)
+        return counters
+
+    early = _vdoc()
+
+    async def scenario():
+        await mongo["validation_results"].insert_one(_vdoc())
+        await stats_service.record_validation(_vdoc())
+        await mongo["validation_results"].insert_one(early)
+        monkeypatch.setattr(stats_service, "aggregate_counters", racing_aggregate)
+        await stats_service.rebuild()
+        return await _counters(mongo), await mongo[stats_service.PENDING_COLLECTION].count_documents({})
+
+    counters, pending = asyncio.run(scenario())
+    assert counters["total"] == 3
+    assert counters["by_status"] == {"failed": 2, "validated": 1}
+    assert "rebuilding" not in counters
+    assert pending == 0
+
+
+def test_failed_rebuild_keeps_the_counters_and_held_records(mongo, monkeypatch):
+    async def failing_aggregate(cutoff=None):
+        await stats_service.record_validation(_vdoc())
+        raise RuntimeError("aggregation failed")
+
+    async def scenario():
+        await stats_service.record_validation(_vdoc())
+        monkeypatch.setattr(stats_service, "aggregate_counters", failing_aggregate)
+        try:
+            await stats_service.rebuild()
+        except RuntimeError:
+            pass
+        return await _counters(mongo)
+
+    counters = asyncio.run(scenario())
+    assert counters["total"] == 2
+    assert "rebuilding" not in counters
+
+
+def test_ensure_counters_finishes_an_interrupted_rebuild(mongo):
+    async def scenario():
+        await mongo["validation_results"].insert_many([_vdoc(), _vdoc()])
+        await mongo[stats_service.STATS_COLLECTION].insert_one(
+            {"_id": stats_service.COUNTERS_ID, "total": 7, "rebuilding": "dead"}
+        )
+        await stats_service.ensure_counters()
+        return await _counters(mongo)
+
+    counters = asyncio.run(scenario())
+    assert counters["total"] == 2
+    assert "rebuilding" not in counters
@@ -0,0 +1,55 @@
+# backend/tests/test_upload.py
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services import blob_store, job_service
+
+PDF = b"%PDF-1.4\n%test\n"
+
+
+@pytest.fixture
+def client(mongo, tmp_path, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(blob_store, "TMP_DIR", tmp_path / "blobs" / "tmp")
+    return TestClient(app)
+
+
+def _post(client):
+    return client.post("/api/upload", files={"file": ("sheet.pdf", PDF, "application/pdf")})
+
+
+def _state(mongo):
+    async def read():
+        uploads = await mongo["uploads"].count_documents({})
+        refs = await mongo[blob_store.REFS].find_one({}) or {}
+        return uploads, refs.get("refs", 0)
+    return asyncio.run(read())
+
+
+def test_full_queue_leaves_no_upload_behind(client, mongo, monkeypatch):
+    # Slot taken between the early check and create_job (another request)
+    def full(job_id, filename):
+        raise job_service.QueueFullError("Upload queue is full (0 pending jobs)")
+
+    monkeypatch.setattr(job_service, "create_job", full)
+    response = _post(client)
+
+    assert response.status_code == 503
+    assert _state(mongo) == (0, 0)
+
+
+def test_failed_submit_rolls_back_record_and_blob_ref(client, mongo, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("executor gone")
+
+    monkeypatch.setattr(job_service, "submit", broken)
+    response = _post(client)
+
+    assert response.status_code == 500
+    assert _state(mongo) == (0, 0)
+    assert job_service.pending_count() == 0
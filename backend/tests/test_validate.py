@@ -0,0 +1,76 @@
+# backend/tests/test_validate.py
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+
+from database.collections_init import init_collections
+from services import stats_service
+
+FIELDS = {"Facility Amount": "USD 10,000,000", "Interest Rate": "5%", "Borrower": "Acme"}
+
+
+@pytest.fixture
+def client(mongo):
+    from main import app
+
+    asyncio.run(init_collections(mongo))
+    return TestClient(app)
+
+
+def _upload(mongo, fields=FIELDS) -> str:
+    result = asyncio.run(mongo["uploads"].insert_one(
+        {"status": "parsed", "document_type": "bank_loan", "extracted_fields": fields}
+    ))
+    return str(result.inserted_id)
+
+
+def _results(mongo, **query) -> list:
+    return asyncio.run(mongo["validation_results"].find(query).to_list(length=None))
+
+
+def test_repeat_validation_returns_the_stored_result(client, mongo):
+    upload_id = _upload(mongo)
+    first = client.post(f"/api/validate/{upload_id}").json()
+    second = client.post(f"/api/validate/{upload_id}").json()
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["validation_id"] == first["validation_id"]
+    assert len(_results(mongo, upload_id=upload_id)) == 1
+
+
+def test_outcome_reused_from_another_upload_is_reported_cached(client, mongo):
+    first = client.post(f"/api/validate/{_upload(mongo)}").json()
+    twin_id = _upload(mongo)
+    twin = client.post(f"/api/validate/{twin_id}").json()
+
+    assert twin["cached"] is True
+    assert twin["validation_id"] != first["validation_id"]
+    assert twin["score"] == first["score"]
+    assert len(_results(mongo, upload_id=twin_id)) == 1
+
+
+def test_force_replaces_the_outcome_in_place(client, mongo):
+    upload_id = _upload(mongo)
+    first = client.post(f"/api/validate/{upload_id}").json()
+    forced = client.post(f"/api/validate/{upload_id}?force=true").json()
+
+    assert forced["cached"] is False
+    assert forced["validation_id"] == first["validation_id"]
+    [doc] = _results(mongo, upload_id=upload_id)
+    assert doc["version"] == 2
+
+    counters = asyncio.run(stats_service.get_stats())
+    assert counters["totalValidations"] == 1
+
+
+def test_one_result_per_fingerprint_and_upload(client, mongo):
+    doc = {"fingerprint": "f" * 64, "upload_id": "0" * 24, "status": "Failed ❌"}
+    asyncio.run(mongo["validation_results"].insert_one(dict(doc)))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(mongo["validation_results"].insert_one(dict(doc)))
+    # Results without a fingerprint (stored after a Gemini failure) are not constrained
+    asyncio.run(mongo["validation_results"].insert_many([{"upload_id": "0" * 24}, {"upload_id": "0" * 24}]))
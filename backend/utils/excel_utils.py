@@ -1,5 +1,43 @@
+import os
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 
-def read_master_sheet(path: str):
-    df = pd.read_excel(path)
-    return df.to_dict(orient="records")
+# Parsed sheets keyed by (path, sheet); an entry is reused while the file's
+# mtime and size are unchanged.
+EXCEL_CACHE_SIZE = int(os.getenv("EXCEL_CACHE_SIZE", "16"))
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def read_master_sheet(path: str, sheet_name=0):
+    key = (os.path.abspath(path), sheet_name)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _cache.move_to_end(key)
+            records = entry[1]
+        else:
+            records = None
+
+    if records is None:
+        df = pd.read_excel(path, sheet_name=sheet_name)
+        records = df.to_dict(orient="records")
+        with _lock:
+            _cache[key] = (stamp, records)
+            _cache.move_to_end(key)
+            while len(_cache) > EXCEL_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    # Callers get their own row dicts; the cached ones stay untouched
+    return [dict(r) for r in records]
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
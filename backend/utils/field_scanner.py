@@ -0,0 +1,172 @@
+# backend/utils/field_scanner.py
+
+import re
+
+# =========================================================
+# Labelled fields ("Label: value") — used by parser_service
+# =========================================================
+# (field, label pattern, value pattern applied right after the label)
+LABELED_FIELDS = [
+    # universal
+    ("Company Name", r"Company Name", r"[:\s-]+(.+)"),
+    ("Investor", r"Investor", r"[:\s-]+(.+)"),
+    ("Investment Amount", r"Investment Amount", r"[:\s-]+(.+)"),
+    ("Valuation (Pre-Money)", r"Pre[- ]?Money", r"[:\s-]+(.+)"),
+    ("Valuation (Post-Money)", r"Post[- ]?Money", r"[:\s-]+(.+)"),
+    ("Equity to be Issued", r"Equity", r"[:\s-]+(.+)"),
+
+    # structured notes
+    ("Issuer", r"Issuer", r"[:\s-]+(.+)"),
+    ("ISIN", r"ISIN", r"[:\s-]+([A-Z0-9]+)"),
+    ("Issue Date", r"Issue Date", r"[:\s-]+(.+)"),
+    ("Redemption Date", r"Redemption Date", r"[:\s-]+(.+)"),
+    ("Underlying Asset", r"Underlying", r"[:\s-]+(.+)"),
+    ("Strike Level", r"Strike", r"[:\s-]+(.+)"),
+    ("Autocall Barrier", r"Autocall", r"[:\s-]+(.+)"),
+    ("Knock-in Barrier", r"Knock[- ]?in", r"[:\s-]+(.+)"),
+    ("Calculation Amount", r"Calculation Amount", r"[:\s-]+(.+)"),
+    ("Coupon Rate", r"Coupon", r"[:\s-]+(.+)"),
+]
+
+
+class FieldScanner:
+    """
+    Finds the first "Label: value" occurrence of every field.
+
+    The text is lower-cased once; each label is then located with a
+    case-sensitive search on that copy (CPython's re engine skips ahead on
+    literal prefixes, which a re.I search or a 16-way alternation cannot),
+    and every hit is confirmed against the field's value pattern on the
+    original text. Results match re.search(label + value, text, re.I).
+    """
+
+    def __init__(self, specs):
+        self.fields = [name for name, _, _ in specs]
+        # Labels are plain ASCII patterns, so lower-casing them is safe.
+        self.labels = [re.compile(label.lower()) for _, label, _ in specs]
+        self.values = [re.compile(value, re.I) for _, _, value in specs]
+        self.fallback = [re.compile(label + value, re.I) for _, label, value in specs]
+
+    def _find(self, idx: int, text: str, low: str):
+        label, value = self.labels[idx], self.values[idx]
+        pos = 0
+        while True:
+            m = label.search(low, pos)
+            if not m:
+                return None
+            v = value.match(text, m.end())
+            if v:
+                return v.group(1).strip()
+            pos = m.start() + 1
+
+    def scan(self, text: str) -> dict:
+        low = text.lower()
+        found = {}
+
+        if len(low) != len(text):
+            # Some characters change length when lower-cased, so offsets
+            # would not line up; use the case-insensitive patterns directly.
+            for name, rx in zip(self.fields, self.fallback):
+                m = rx.search(text)
+                if m:
+                    found[name] = m.group(1).strip()
+            return found
+
+        for idx, name in enumerate(self.fields):
+            value = self._find(idx, text, low)
+            if value is not None:
+                found[name] = value
+        return found
+
+
+LABELED_SCANNER = FieldScanner(LABELED_FIELDS)
+
+
+def scan_labeled(text: str) -> dict:
+    return LABELED_SCANNER.scan(text)
+
+
+# =========================================================
+# Line fields (compare service)
+# =========================================================
+DATE_PATTERNS = [
+    re.compile(r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b", re.I),   # 10/12/2024
+    re.compile(r"\b\w+\s\d{1,2},\s\d{4}\b", re.I),             # December 15, 2025
+    re.compile(r"\b\d{1,2}\s\w+\s\d{4}\b", re.I),              # 12 December 2025
+]
+
+AMOUNT_PATTERNS = [
+    re.compile(r"(rs\.?\s?\d[\d,\.]*)", re.I),
+    re.compile(r"(₹\s?\d[\d,\.]*)", re.I),
+    re.compile(r"(inr\s?\d[\d,\.]*)", re.I),
+]
+
+INTEREST_PATTERN = re.compile(r"(\d+(\.\d+)?\s?%)")
+
+TENURE_PATTERN = re.compile(r"(\b\d+\s?(months?|years?)\b)", re.I)
+
+# Every amount/date/tenure/rate pattern needs a digit, so lines without
+# one only have to be checked for the company name.
+DIGIT = re.compile(r"\d")
+
+LINE_FIELDS = ["company_name", "amount", "date", "tenure", "interest_rate"]
+
+
+def _first_match(line: str, patterns):
+    for p in patterns:
+        m = p.search(line)
+        if m:
+            return m.group(0)
+    return None
+
+
+def scan_lines(text: str) -> dict:
+    """
+    First company line, amount, date, tenure and interest rate, found in a
+    single walk over the non-empty lines. Stops once every field is filled.
+    """
+    fields = dict.fromkeys(LINE_FIELDS)
+    remaining = len(LINE_FIELDS)
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        if fields["company_name"] is None:
+            low = line.lower()
+            if low.startswith("company") or "company name" in low:
+                fields["company_name"] = line
+                remaining -= 1
+
+        if not DIGIT.search(line):
+            continue
+
+        if fields["amount"] is None:
+            amt = _first_match(line, AMOUNT_PATTERNS)
+            if amt:
+                fields["amount"] = amt
+                remaining -= 1
+
+        if fields["date"] is None:
+            date = _first_match(line, DATE_PATTERNS)
+            if date:
+                fields["date"] = date
+                remaining -= 1
+
+        if fields["tenure"] is None:
+            tn = TENURE_PATTERN.search(line)
+            if tn:
+                fields["tenure"] = tn.group(0)
+                remaining -= 1
+
+        if fields["interest_rate"] is None:
+            ir = INTEREST_PATTERN.search(line)
+            if ir:
+                fields["interest_rate"] = ir.group(0)
+                remaining -= 1
+
+        if not remaining:
+            break
+
+    return fields
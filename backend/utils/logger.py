@@ -1,5 +1,8 @@
 import datetime
+import os
+
+LOG_FILE = os.getenv("LOG_FILE", "logs.txt")
 
 def log(msg: str):
-    with open("logs.txt", "a") as f:
+    with open(LOG_FILE, "a") as f:
         f.write(f"[{datetime.datetime.now()}] {msg}\n")
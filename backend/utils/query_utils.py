@@ -0,0 +1,116 @@
+# backend/utils/query_utils.py
+
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_BATCH_SIZE = 500
+
+
+# =========================================================
+# Filters (keyset on _id, newest first)
+# =========================================================
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_filter(cursor: str | None = None, document_type: str | None = None,
+                 status: str | None = None, since: datetime | None = None,
+                 until: datetime | None = None) -> dict:
+    """
+    Listing filter on indexed fields. _id carries the insert time, so the
+    date range and the page cursor are both ranges on _id:
+    since <= created < until, and _id < cursor for the next page.
+    `status` may be a comma-separated list.
+    """
+    query = {}
+    id_range = {}
+
+    if since:
+        id_range["$gte"] = ObjectId.from_datetime(since)
+    upper = []
+    if until:
+        upper.append(ObjectId.from_datetime(until))
+    if cursor:
+        upper.append(decode_cursor(cursor))
+    if upper:
+        id_range["$lt"] = min(upper)
+    if id_range:
+        query["_id"] = id_range
+
+    if document_type:
+        query["document_type"] = document_type
+    if status:
+        values = [s.strip() for s in status.split(",") if s.strip()]
+        query["status"] = values[0] if len(values) == 1 else {"$in": values}
+    return query
+
+
+def results_filter(revalidation: bool = False) -> dict:
+    """
+    validation_results holds /api/validate results and, separately, one
+    bulk revalidation snapshot per upload (revalidation: true). Listings,
+    exports and stats look at one kind at a time.
+    """
+    return {"revalidation": True} if revalidation else {"revalidation": {"$ne": True}}
+
+
+def build_projection(fields: str | None, default: dict) -> dict:
+    """
+    ?fields=a,b,c -> {"a": 1, "b": 1, "c": 1}; without it the listing's
+    default projection (which leaves out heavy payloads) is used.
+    """
+    if not fields:
+        return default
+    return {f.strip(): 1 for f in fields.split(",") if f.strip()}
+
+
+# =========================================================
+# Serialization
+# =========================================================
+def serialize(doc: dict) -> dict:
+    for key, value in doc.items():
+        if isinstance(value, ObjectId):
+            doc[key] = str(value)
+        elif isinstance(value, datetime):
+            doc[key] = value.isoformat()
+    if "_id" in doc and "created_at" not in doc:
+        # ObjectId() above already turned _id into a string
+        doc["created_at"] = ObjectId(doc["_id"]).generation_time.astimezone(timezone.utc).isoformat()
+    return doc
+
+
+# =========================================================
+# Page / stream
+# =========================================================
+async def paginate(collection, query: dict, projection: dict, limit: int = DEFAULT_LIMIT) -> dict:
+    """One page, newest first, plus the cursor for the next one."""
+    limit = max(1, min(limit, MAX_LIMIT))
+    cursor = collection.find(query, projection).sort("_id", -1).limit(limit + 1)
+    docs = await cursor.to_list(length=limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = str(docs[-1]["_id"]) if has_more else None
+    return {
+        "items": [serialize(d) for d in docs],
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+    }
+
+
+async def stream_ndjson(collection, query: dict, projection: dict, limit: int | None = None):
+    """Yields one JSON line per document; only one batch is held in memory."""
+    cursor = collection.find(query, projection).sort("_id", -1).batch_size(STREAM_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    async for doc in cursor:
+        yield json.dumps(serialize(doc), default=str) + "\n"
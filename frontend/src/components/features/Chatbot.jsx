@@ -34,21 +34,28 @@ const Chatbot = () => {
     setLoading(true);
     setError(null);
 
+    // Show the answer as it streams in, replacing the last assistant message
+    const showAnswer = (content) =>
+      setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        if (last?.role === 'assistant' && last.streaming) {
+          return [...prev.slice(0, -1), { ...last, content }];
+        }
+        return [...prev, { role: 'assistant', content, streaming: true }];
+      });
+
     try {
-      const response = await chatbotService.sendQuery(input);
-      const assistantMessage = {
-        role: 'assistant',
-        content: response.answer || response.error || 'No response received',
-      };
-      setMessages((prev) => [...prev, assistantMessage]);
+      const answer = await chatbotService.streamQuery(input, showAnswer);
+      showAnswer(answer || 'No response received');
     } catch (err) {
-      setError(err.response?.data?.error || 'Failed to get response. Please try again.');
+      setError(err.response?.data?.error || err.message || 'Failed to get response. Please try again.');
       const errorMessage = {
         role: 'assistant',
         content: 'Sorry, I encountered an error. Please try again.',
       };
-      setMessages((prev) => [...prev, errorMessage]);
+      setMessages((prev) => [...prev.filter((m) => !m.streaming), errorMessage]);
     } finally {
+      setMessages((prev) => prev.map(({ streaming, ...m }) => m));
       setLoading(false);
     }
   };
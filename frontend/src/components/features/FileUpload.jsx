@@ -64,7 +64,7 @@ const FileUpload = ({ onUploadSuccess }) => {
       }
       setFile(null);
     } catch (err) {
-      setError(err.response?.data?.detail || 'Upload failed. Please try again.');
+      setError(err.response?.data?.detail || err.message || 'Upload failed. Please try again.');
     } finally {
       setUploading(false);
     }
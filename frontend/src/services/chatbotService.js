@@ -1,9 +1,56 @@
 import api from './api';
 
+// Parses one SSE event block ("event: x\ndata: {...}")
+const parseEvent = (block) => {
+  let event = 'message';
+  let data = '';
+  for (const line of block.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) data += line.slice(5).trim();
+  }
+  return { event, data: data ? JSON.parse(data) : {} };
+};
+
 export const chatbotService = {
   async sendQuery(query) {
     const response = await api.post('/api/chatbot', { query });
     return response.data;
   },
-};
 
+  // Streams the answer over SSE; onChunk receives the text so far
+  async streamQuery(query, onChunk) {
+    const response = await fetch(`${api.defaults.baseURL}/api/chatbot/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ query }),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Chatbot stream failed (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let idx;
+      while ((idx = buffer.indexOf('\n\n')) !== -1) {
+        const { event, data } = parseEvent(buffer.slice(0, idx));
+        buffer = buffer.slice(idx + 2);
+
+        if (event === 'error') throw new Error(data.error || 'Chatbot stream failed');
+        if (event === 'done') return answer;
+        if (data.text) {
+          answer += data.text;
+          onChunk?.(answer);
+        }
+      }
+    }
+    return answer;
+  },
+};
@@ -1,20 +1,32 @@
 import api from './api';
 
 export const dataService = {
-  async getAllUploads() {
+  // One page of uploads, newest first: { items, next_cursor, has_more }.
+  // Params: cursor, limit, fields, document_type, status, since, until
+  async listUploads(params = {}) {
+    const response = await api.get('/api/uploads', { params });
+    return response.data;
+  },
+
+  async listValidations(params = {}) {
+    const response = await api.get('/api/validations', { params });
+    return response.data;
+  },
+
+  async getAllUploads(params = {}) {
     try {
-      const response = await api.get('/api/uploads');
-      return response.data;
+      const page = await this.listUploads(params);
+      return page.items || [];
     } catch (error) {
       console.error('Failed to fetch uploads:', error);
       return [];
     }
   },
 
-  async getAllValidations() {
+  async getAllValidations(params = {}) {
     try {
-      const response = await api.get('/api/validations');
-      return response.data;
+      const page = await this.listValidations(params);
+      return page.items || [];
     } catch (error) {
       console.error('Failed to fetch validations:', error);
       return [];
@@ -23,31 +35,10 @@ export const dataService = {
 
   async getStats() {
     try {
-      const uploads = await this.getAllUploads();
-      const validations = await this.getAllValidations();
-      
-      const totalUploads = uploads.length || 0;
-      const totalValidations = validations.length || 0;
-      
-      // Calculate success rate
-      const successfulValidations = validations.filter(v => 
-        v.status === 'Valid' || v.status === 'Approved'
-      ).length;
-      const successRate = totalValidations > 0 
-        ? Math.round((successfulValidations / totalValidations) * 100)
-        : 0;
-      
-      // Count total issues
-      const totalIssues = validations.reduce((sum, v) => {
-        return sum + (v.issues?.length || 0);
-      }, 0);
-
-      return {
-        totalUploads,
-        totalValidations,
-        successRate,
-        totalIssues,
-      };
+      // Computed server-side; listings are paginated so counting them here
+      // would only see the first page.
+      const response = await api.get('/api/stats');
+      return response.data;
     } catch (error) {
       console.error('Failed to get stats:', error);
       return {
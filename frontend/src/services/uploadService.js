@@ -1,16 +1,44 @@
 import api from './api';
 
+const POLL_INTERVAL_MS = 1000;
+// Give up waiting after this long; the job keeps running on the server
+const JOB_TIMEOUT_MS = 10 * 60 * 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export const uploadService = {
   async uploadFile(file) {
     const formData = new FormData();
     formData.append('file', file);
-    
+
     const response = await api.post('/api/upload', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
+
+    // Parsing runs in the background; wait for the job to finish
+    const job = await this.waitForJob(response.data.job_id);
+    return { ...response.data, status: job.state, job };
+  },
+
+  async getJob(jobId) {
+    const response = await api.get(`/api/jobs/${jobId}`);
     return response.data;
   },
-};
 
+  async waitForJob(jobId) {
+    if (!jobId) return { state: 'completed' };
+
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+      const job = await this.getJob(jobId);
+      if (job.state === 'completed') return job;
+      if (job.state === 'failed') {
+        throw new Error(job.error || 'Processing failed');
+      }
+      await sleep(POLL_INTERVAL_MS);
+    }
+    throw new Error('Processing is taking longer than expected; check the upload later');
+  },
+};